@@ -12,7 +12,7 @@ from .models import (
     OutilFichePoste, AmeliorationProposee, EquipementInstance, CreneauTravail,
     HoraireSalarie, DocumentSalarie, DemandeConge, SoldeConge, TravauxExceptionnels,
     TypeApplicationAcces, AccesApplication, FicheParametresUser, Role,
-    DemandeAcompte, DemandeSortie, ImportLog
+    DemandeAcompte, DemandeSortie, ImportLog, ImportLogErreur
 )
 
 # ============================================================================
@@ -63,9 +63,20 @@ class BatchImportExportMixin:
 # IMPORT LOG ADMIN
 # ============================================================================
 
+class ImportLogErreurInline(admin.TabularInline):
+    """Classes d'erreurs d'un import (message + plages de lignes)"""
+    model = ImportLogErreur
+    fields = ('premiere_ligne', 'nombre', 'message', 'lignes')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    max_num = 0
+
+
 @admin.register(ImportLog)
 class ImportLogAdmin(admin.ModelAdmin):
     """Configuration admin pour les logs d'import en masse"""
+    inlines = [ImportLogErreurInline]
     list_display = ('api_name', 'get_statut_badge', 'total_lignes', 'lignes_succes', 'lignes_erreur', 'get_taux_badge', 'date_creation', 'cree_par')
     list_filter = ('statut', 'api_name', 'date_creation')
     search_fields = ('api_name', 'fichier_nom')
@@ -73,10 +84,10 @@ class ImportLogAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('📋 Infos Import', {
-            'fields': ('api_name', 'fichier_nom', 'cree_par')
+            'fields': ('api_name', 'fichier_nom', 'empreinte_fichier', 'cree_par')
         }),
         ('📊 Résultats', {
-            'fields': ('total_lignes', 'lignes_succes', 'lignes_erreur', 'statut', 'formatted_taux_succes')
+            'fields': ('total_lignes', 'lignes_succes', 'lignes_inchangees', 'lignes_erreur', 'statut', 'formatted_taux_succes')
         }),
         ('⚠️ Détails Erreurs', {
             'fields': ('details_erreurs',),
@@ -125,6 +136,13 @@ class ImportLogAdmin(admin.ModelAdmin):
         )
     get_taux_badge.short_description = "Taux ✅"
 
+    def get_queryset(self, request):
+        """Liste sans la colonne lourde details_erreurs"""
+        queryset = super().get_queryset(request).select_related('cree_par')
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            queryset = queryset.defer('details_erreurs')
+        return queryset
+
 
 # ============================================================================
 # ADMIN CONFIGS - Avec support Import/Export
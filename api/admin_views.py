@@ -3,10 +3,15 @@
 from django.shortcuts import render
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.views.decorators.http import require_http_methods
-import requests
 import logging
+import os
+
+from . import profiling
+
+# requests est importé dans les vues qui l'utilisent : inutile au démarrage des workers
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +37,8 @@ def admin_import_page(request):
     
     Utilise la NOUVELLE API REST: /api/import/
     """
+    import requests
+
     result = None
     error = None
     models_list = []
@@ -81,7 +88,7 @@ def admin_import_page(request):
                     # 📊 Afficher les résultats
                     inserted = result.get('inserted', 0)
                     updated = result.get('updated', 0)
-                    errors = len(result.get('errors', []))
+                    errors = result.get('error_count', len(result.get('errors', [])))
                     
                     if errors == 0:
                         messages.success(
@@ -129,6 +136,8 @@ def admin_download_template(request):
     
     Query param: ?model=departement
     """
+    import requests
+
     model_name = request.GET.get('model', '')
     
     if not model_name:
@@ -176,6 +185,8 @@ def get_model_structure_ajax(request):
     Query param: ?model=departement
     Returns: JSON avec structure du modèle
     """
+    import requests
+
     model_name = request.GET.get('model', '')
     
     if not model_name:
@@ -211,6 +222,8 @@ def admin_import_history(request):
     """
     Affiche l'historique des imports récents
     """
+    import requests
+
     history = []
     
     try:
@@ -237,3 +250,36 @@ def admin_import_history(request):
     }
     
     return render(request, 'admin/import_history.html', context)
+
+
+# ============================================================================
+# PROFILS DE REQUÊTES (api/profiling.py)
+# ============================================================================
+
+@staff_member_required
+def admin_profiles(request):
+    """
+    Profils enregistrés (?_profile=1 / X-Profile: 1), du plus récent au plus ancien
+    Accessible à /admin/profiles/
+    """
+    context = {
+        'profiles': profiling.list_profiles(),
+        'enabled': settings.PROFILER_ENABLED,
+        'max_profiles': profiling.PROFILER_MAX_PROFILES,
+        'title': '⏱️ Profils de requêtes',
+    }
+    return render(request, 'admin/profiles.html', context)
+
+
+@staff_member_required
+def admin_profile_download(request, profile_id, kind):
+    """
+    Télécharge un profil : .json (requête, SQL et origines, fonctions) ou .prof (pstats)
+    """
+    path = profiling.profile_file(profile_id, kind)
+    if path is None:
+        raise Http404("Profil introuvable")
+    return FileResponse(
+        open(path, 'rb'), as_attachment=True, filename=os.path.basename(path),
+        content_type=profiling.KINDS[kind],
+    )
@@ -0,0 +1,185 @@
+# api/cache_backends.py - CACHE PARTAGÉ SUR FICHIER SQLITE
+#
+# Backend Django pour un seul hôte sans Redis (poste de dev, tests, petit
+# déploiement) : tous les workers gunicorn de la machine lisent et écrivent
+# le même fichier (WAL), contrairement à LocMemCache qui est propre à chaque
+# processus. incr / add sont atomiques (transaction IMMEDIATE).
+#
+#   CACHES = {'default': {'BACKEND': 'api.cache_backends.SQLiteCache',
+#                         'LOCATION': '/var/tmp/msi-cache/default.sqlite3'}}
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Nombre d'écritures entre deux vérifications de la taille du cache
+CULL_EVERY = 100
+
+
+class SQLiteCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        self._local = threading.local()
+        self._writes = 0
+
+    # ========================================================================
+    # CONNEXION (une par thread, rouverte après un fork)
+    # ========================================================================
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+        conn = sqlite3.connect(self._path, timeout=10, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL) WITHOUT ROWID'
+        )
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _write(self):
+        """Transaction d'écriture : verrou pris dès BEGIN, pas à la première écriture"""
+        return _Transaction(self._conn())
+
+    # ========================================================================
+    # SÉRIALISATION / EXPIRATION
+    # ========================================================================
+
+    def _dumps(self, value):
+        return pickle.dumps(value, self.pickle_protocol)
+
+    def _expires(self, timeout):
+        # None = jamais ; timeout=0 donne une date passée (entrée aussitôt expirée)
+        return self.get_backend_timeout(timeout)
+
+    def _set(self, conn, key, value, timeout):
+        conn.execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+            (key, self._dumps(value), self._expires(timeout)),
+        )
+
+    def _maybe_cull(self, conn):
+        self._writes += 1
+        if self._writes % CULL_EVERY:
+            return
+        conn.execute('DELETE FROM cache WHERE expires <= ?', (time.time(),))
+        count = conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if self._cull_frequency and count > self._max_entries:
+            # Les entrées sans expiration (versions de tables...) partent en dernier
+            conn.execute(
+                'DELETE FROM cache WHERE key IN ('
+                'SELECT key FROM cache ORDER BY expires IS NULL, expires LIMIT ?)',
+                (count // self._cull_frequency,),
+            )
+
+    # ========================================================================
+    # API DJANGO
+    # ========================================================================
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        if not keys:
+            return {}
+        by_key = {self.make_and_validate_key(key, version=version): key for key in keys}
+        placeholders = ','.join('?' * len(by_key))
+        rows = self._conn().execute(
+            f'SELECT key, value FROM cache WHERE key IN ({placeholders}) AND (expires IS NULL OR expires > ?)',
+            (*by_key, time.time()),
+        ).fetchall()
+        return {by_key[key]: pickle.loads(value) for key, value in rows}
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._conn().execute(
+            'SELECT 1 FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)', (key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._write() as conn:
+            self._set(conn, key, value, timeout)
+            self._maybe_cull(conn)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._write() as conn:
+            for key, value in data.items():
+                self._set(conn, self.make_and_validate_key(key, version=version), value, timeout)
+            self._maybe_cull(conn)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._write() as conn:
+            conn.execute('DELETE FROM cache WHERE key = ? AND expires <= ?', (key, time.time()))
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+                (key, self._dumps(value), self._expires(timeout)),
+            )
+            return cursor.rowcount == 1
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._write() as conn:
+            cursor = conn.execute(
+                'UPDATE cache SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (self._expires(timeout), key, time.time()),
+            )
+            return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._write() as conn:
+            row = conn.execute(
+                'SELECT value FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)', (key, time.time())
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found.")
+            value = pickle.loads(row[0]) + delta
+            conn.execute('UPDATE cache SET value = ? WHERE key = ?', (self._dumps(value), key))
+            return value
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._write() as conn:
+            return conn.execute('DELETE FROM cache WHERE key = ?', (key,)).rowcount == 1
+
+    def delete_many(self, keys, version=None):
+        with self._write() as conn:
+            conn.executemany(
+                'DELETE FROM cache WHERE key = ?',
+                [(self.make_and_validate_key(key, version=version),) for key in keys],
+            )
+
+    def clear(self):
+        with self._write() as conn:
+            conn.execute('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        # Connexion gardée d'une requête à l'autre (comme LocMemCache)
+        pass
+
+
+class _Transaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
@@ -0,0 +1,113 @@
+# api/caching.py - CACHES NOMMÉS, CLÉS VERSIONNÉES, ANTI-EMBALLEMENT
+#
+# Trois caches (settings.CACHES), partagés entre les workers :
+# - HOT       : objets chauds (versions de tables, paquet de référence,
+#               aperçus d'import)
+# - THROTTLE  : compteurs des throttles DRF (api/throttles.py)
+# - TEMPLATES : fichiers générés (templates Excel d'import)
+#
+# Espaces de clés versionnés : versioned_key('reference', ...) inclut la
+# version de l'espace ; bump_namespace('reference') invalide toutes ses clés
+# d'un coup, sans les parcourir.
+#
+# get_or_build : une seule reconstruction à la fois par clé (verrou
+# cache.add) ; pendant ce temps les autres requêtes servent la valeur
+# périmée, ou attendent brièvement s'il n'y en a pas.
+
+import time
+
+from django.core.cache import caches
+
+from .instrumentation import record_cache
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+HOT = 'default'
+THROTTLE = 'throttle'
+TEMPLATES = 'templates'
+
+NAMESPACE_KEY = 'namespace_version:{}'
+LOCK_KEY = '{}:lock'
+
+# Durée max d'une reconstruction : au-delà le verrou expire et un autre processus reprend
+LOCK_TIMEOUT = 30
+WAIT_STEP = 0.05
+
+
+# ============================================================================
+# COMPTEURS ET ESPACES VERSIONNÉS
+# ============================================================================
+
+def bump_counter(key, alias=HOT):
+    """Incrémente un compteur permanent (créé à 1 s'il n'existe pas)"""
+    cache = caches[alias]
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout=None):
+            return 1
+        return cache.incr(key)
+
+
+def namespace_version(namespace, alias=HOT):
+    return caches[alias].get(NAMESPACE_KEY.format(namespace), 0)
+
+
+def bump_namespace(namespace, alias=HOT):
+    """Invalide toutes les clés de l'espace `namespace`"""
+    return bump_counter(NAMESPACE_KEY.format(namespace), alias)
+
+
+def versioned_key(namespace, *parts, alias=HOT):
+    """'namespace:v<version>:part1:part2' (une lecture du cache)"""
+    return ':'.join([namespace, f"v{namespace_version(namespace, alias)}", *map(str, parts)])
+
+
+# ============================================================================
+# ANTI-EMBALLEMENT (VERROU + VALEUR PÉRIMÉE)
+# ============================================================================
+
+def get_or_build(key, build, timeout, alias=HOT, stale_timeout=None, lock_timeout=LOCK_TIMEOUT):
+    """
+    Valeur de `key`, construite par `build()` si absente ou périmée.
+
+    La valeur reste fraîche `timeout` secondes puis est encore servie,
+    périmée, pendant `stale_timeout` secondes (défaut : `timeout`) à ceux
+    qui n'obtiennent pas le verrou de reconstruction. Sans valeur du tout,
+    ils attendent la reconstruction en cours (au plus `lock_timeout`).
+    """
+    cache = caches[alias]
+    stale_timeout = timeout if stale_timeout is None else stale_timeout
+
+    entry = cache.get(key)       # (fraîche jusqu'à, valeur)
+    if entry is not None and entry[0] > time.time():
+        record_cache(hit=True)
+        return entry[1]
+
+    lock = LOCK_KEY.format(key)
+    if cache.add(lock, 1, lock_timeout):
+        record_cache(hit=False)
+        try:
+            value = build()
+            cache.set(key, (time.time() + timeout, value), timeout + stale_timeout)
+        finally:
+            cache.delete(lock)
+        return value
+
+    if entry is not None:
+        record_cache(hit=True)
+        return entry[1]
+
+    deadline = time.time() + lock_timeout
+    while time.time() < deadline:
+        time.sleep(WAIT_STEP)
+        entry = cache.get(key)
+        if entry is not None:
+            record_cache(hit=True)
+            return entry[1]
+        if not cache.has_key(lock):
+            break
+    record_cache(hit=False)
+    return build()
@@ -0,0 +1,133 @@
+# api/calendrier.py - ANNIVERSAIRES ET ANCIENNETÉ (CALENDRIER RH)
+
+import calendar
+from datetime import date, timedelta
+
+from django.db.models import Case, CharField, F, IntegerField, Q, Value, When
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+TYPE_NAISSANCE = 'anniversaire'
+TYPE_EMBAUCHE = 'anciennete'
+TYPES_EVENEMENT = (TYPE_NAISSANCE, TYPE_EMBAUCHE)
+
+JOURS_DEFAUT = 30
+JOURS_MAX = 366
+
+# (type, champ date, champ clé stocké sur Salarie)
+SOURCES = {
+    TYPE_NAISSANCE: ('date_naissance', 'cle_naissance'),
+    TYPE_EMBAUCHE: ('date_embauche', 'cle_embauche'),
+}
+
+# Colonnes lues pour chaque événement (values(), pas de serializer)
+EVENEMENT_FIELDS = ('id', 'nom', 'prenom', 'matricule', 'poste', 'service_nom',
+                    'type_evenement', 'date_reference', 'cle', 'tour')
+
+
+# ============================================================================
+# CLÉS JOUR/MOIS
+# ============================================================================
+
+def date_key(d):
+    """
+    Clé jour/mois indépendante de l'année : mois * 100 + jour
+    (25 décembre -> 1225). None si pas de date.
+    """
+    if not d:
+        return None
+    if isinstance(d, str):
+        d = date.fromisoformat(d[:10])
+    return d.month * 100 + d.day
+
+
+def _range_keys(debut, fin):
+    """
+    Bornes (cle_debut, cle_fin) d'une fenêtre de dates. Un 28 février
+    d'année non bissextile couvre aussi les nés un 29 février.
+    """
+    cle_debut, cle_fin = date_key(debut), date_key(fin)
+    if cle_fin == 228 and not calendar.isleap(fin.year):
+        cle_fin = 229
+    return cle_debut, cle_fin
+
+
+def key_range_q(champ, debut, fin):
+    """
+    Condition sur une clé jour/mois pour la fenêtre [debut, fin].
+    Passage d'année (décembre -> janvier) : deux intervalles en OR,
+    toujours servis par l'index de la colonne.
+    """
+    if (fin - debut).days >= 365:
+        return Q(**{f'{champ}__isnull': False})
+    cle_debut, cle_fin = _range_keys(debut, fin)
+    if cle_debut <= cle_fin:
+        return Q(**{f'{champ}__range': (cle_debut, cle_fin)})
+    return Q(**{f'{champ}__gte': cle_debut}) | Q(**{f'{champ}__lte': cle_fin})
+
+
+def next_occurrence(d, debut):
+    """Prochaine occurrence (>= debut) du jour/mois de `d` (29/02 -> 28/02 hors bissextile)"""
+    for annee in (debut.year, debut.year + 1):
+        jour = d.day
+        if d.month == 2 and d.day == 29 and not calendar.isleap(annee):
+            jour = 28
+        occurrence = date(annee, d.month, jour)
+        if occurrence >= debut:
+            return occurrence
+    return None
+
+
+# ============================================================================
+# CALENDRIER
+# ============================================================================
+
+def _evenements_queryset(queryset, type_evenement, debut, fin):
+    champ_date, champ_cle = SOURCES[type_evenement]
+    qs = queryset.filter(key_range_q(champ_cle, debut, fin))
+    if type_evenement == TYPE_EMBAUCHE:
+        # Pas d'"ancienneté 0 an" pour les embauches récentes
+        qs = qs.filter(date_embauche__lt=debut)
+
+    cle_debut, _ = _range_keys(debut, fin)
+    return qs.order_by().annotate(
+        service_nom=F('service__nom'),
+        type_evenement=Value(type_evenement, output_field=CharField()),
+        date_reference=F(champ_date),
+        cle=F(champ_cle),
+        # 0 = cette année à partir de debut, 1 = après le passage d'année
+        tour=Case(When(**{f'{champ_cle}__gte': cle_debut}, then=Value(0)),
+                  default=Value(1), output_field=IntegerField()),
+    ).values(*EVENEMENT_FIELDS)
+
+
+def upcoming_events(queryset, debut=None, jours=JOURS_DEFAUT, types=TYPES_EVENEMENT):
+    """
+    Anniversaires de naissance et d'embauche entre `debut` et debut+jours,
+    en UNE requête (UNION ALL) filtrée sur les clés indexées et triée
+    chronologiquement en base : le résultat se pagine/tronque côté SQL.
+    Compléter chaque ligne de la page avec decorate_event().
+    """
+    debut = debut or date.today()
+    jours = max(0, min(int(jours), JOURS_MAX))
+    fin = debut + timedelta(days=jours)
+
+    querysets = [_evenements_queryset(queryset, t, debut, fin) for t in types]
+    result = querysets[0]
+    if len(querysets) > 1:
+        result = result.union(*querysets[1:], all=True)
+    return result.order_by('tour', 'cle', 'nom', 'prenom')
+
+
+def decorate_event(row, debut):
+    """Ajoute date, jours_restants et annees (âge ou ancienneté atteints) à une ligne"""
+    reference = row.pop('date_reference')
+    row.pop('cle', None)
+    row.pop('tour', None)
+    occurrence = next_occurrence(reference, debut)
+    row['date'] = occurrence
+    row['jours_restants'] = (occurrence - debut).days
+    row['annees'] = occurrence.year - reference.year
+    return row
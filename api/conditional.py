@@ -0,0 +1,74 @@
+# api/conditional.py - GET CONDITIONNEL SUR LES LISTES
+#
+# ETag faible calculé sans sérialiser : une requête d'agrégat sur le
+# queryset filtré (nombre, pk max, date_modification max) + les versions
+# des tables lues par le serializer (api/table_versions.py, une lecture du
+# cache). Si If-None-Match correspond : 304 avant pagination et serializers.
+# Un client qui interroge une liste inchangée coûte une requête d'agrégat.
+
+import hashlib
+from datetime import date
+
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.response import Response
+
+from .eager_loading import related_models
+from .table_versions import versions_signature
+
+MODIFIED_FIELD = 'date_modification'
+
+
+def list_etag(request, queryset, serializer_class):
+    """
+    ETag faible d'une page de liste. Change si une ligne du queryset est
+    ajoutée, supprimée ou modifiée, si une table liée est modifiée, si le
+    filtre / périmètre (SQL), la page, l'utilisateur ou le format changent.
+    """
+    Model = queryset.model
+    aggregates = {'total': Count('pk'), 'dernier_pk': Max('pk')}
+    if any(field.name == MODIFIED_FIELD for field in Model._meta.concrete_fields):
+        aggregates['derniere_modification'] = Max(MODIFIED_FIELD)
+    queryset = queryset.order_by()
+    state = queryset.aggregate(**aggregates)
+
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        # Filtre toujours vide (pk__in=[] : périmètre d'équipe vide...)
+        sql, params = '', ()
+    parts = [
+        request.get_full_path(),
+        str(request.user.pk),
+        request.accepted_renderer.format,
+        # Champs calculés à partir de la date du jour (ancienneté, soldes...)
+        date.today().isoformat(),
+        sql, repr(params),
+        repr(sorted(state.items())),
+        versions_signature({Model} | related_models(serializer_class)),
+    ]
+    return f'W/"{hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]}"'
+
+
+class ConditionalListMixin:
+    """
+    Action list avec ETag faible (list_etag) et réponse 304 quand le client
+    a déjà la page. À placer avant le ViewSet DRF dans les bases de classe.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag = list_etag(request, queryset, self.get_serializer_class())
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+            else:
+                response = Response(self.get_serializer(queryset, many=True).data)
+        response['ETag'] = etag
+        # Données propres à l'utilisateur, revalidées à chaque usage
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
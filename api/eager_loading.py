@@ -0,0 +1,182 @@
+# api/eager_loading.py - CHARGEMENT DES RELATIONS LUES PAR LES SERIALIZERS
+#
+# Déduit d'un serializer les jointures (select_related) et préchargements
+# (prefetch_related) nécessaires pour qu'une liste coûte un nombre fixe de
+# requêtes, quel que soit le nombre de lignes :
+# - champs à source pointée (source='departement.nom')
+# - serializers imbriqués et relations many=True (récursivement)
+# - indications déclarées dans Meta pour les SerializerMethodField :
+#       class Meta:
+#           select_related = ['responsable']
+#           prefetch_related = ['departements']
+# Avec ?fields= / ?omit= (api/sparse_fields.py), seuls les champs gardés
+# comptent, et si tous lisent des colonnes du modèle le SELECT est réduit
+# à ces colonnes (.only()).
+
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import RelatedField
+
+from .sparse_fields import SparseFieldsMixin, requested_fields
+
+
+def _walk(Model, parts):
+    """
+    Suit un chemin d'attributs depuis `Model` tant qu'il traverse des
+    relations. Retourne [(nom, multiple, modèle cible)] pour chaque relation.
+    """
+    relations = []
+    for part in parts:
+        try:
+            field = Model._meta.get_field(part)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation or field.related_model is None:
+            break
+        relations.append((part, field.many_to_many or field.one_to_many, field.related_model))
+        Model = field.related_model
+    return relations
+
+
+def _add(paths, prefix, relations, prefetch_prefix):
+    """Ajoute un chemin de relations : jointure tant qu'aucune relation multiple n'est traversée"""
+    select, prefetch = paths
+    path, many = prefix, prefetch_prefix
+    for name, multiple, _ in relations:
+        path = f"{path}__{name}" if path else name
+        many = many or multiple
+        (prefetch if many else select).add(path)
+
+
+def _model_field(field, Model):
+    """Champ du modèle lu par un champ de serializer, None pour une méthode / propriété"""
+    if isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+        return None
+    try:
+        return Model._meta.get_field(field.source.split('.')[0])
+    except FieldDoesNotExist:
+        return None
+
+
+def _collect(serializer, Model, prefix, many, paths, names=None):
+    fields = [field for name, field in serializer.fields.items() if names is None or name in names]
+
+    # Les indications de Meta servent les SerializerMethodField : inutiles si aucun n'est gardé
+    meta = getattr(serializer, 'Meta', None)
+    if names is None or any(_model_field(field, Model) is None for field in fields):
+        for hint in getattr(meta, 'select_related', ()):
+            _add(paths, prefix, _walk(Model, hint.split('__')), many)
+        for hint in getattr(meta, 'prefetch_related', ()):
+            _add(paths, prefix, _walk(Model, hint.split('__')), True)
+
+    for field in fields:
+        if field.write_only or field.source == '*':
+            continue
+        parts = field.source.split('.')
+        relations = _walk(Model, parts)
+        if not relations:
+            continue
+
+        child = field.child if isinstance(field, serializers.ListSerializer) else field
+        if isinstance(child, serializers.BaseSerializer):
+            # Serializer imbriqué : la relation puis, récursivement, ses propres relations
+            _add(paths, prefix, relations, many)
+            path = '__'.join(filter(None, [prefix] + [name for name, _, _ in relations]))
+            _collect(child, relations[-1][2], path, many or any(m for _, m, _ in relations), paths)
+        elif isinstance(field, RelatedField) and len(parts) == 1 and field.use_pk_only_optimization():
+            # Clé primaire seule (PrimaryKeyRelatedField) : lue dans la ligne, rien à charger
+            continue
+        else:
+            # source='a.b', relation many=True, __str__ ou slug de l'objet lié
+            _add(paths, prefix, relations, many)
+
+
+@lru_cache(maxsize=None)
+def _serializer(serializer_class):
+    """Instance de référence (sans contexte : tous les champs)"""
+    return serializer_class()
+
+
+def serializer_field_names(serializer_class):
+    """Champs de sortie du serializer (hors write_only)"""
+    return tuple(name for name, field in _serializer(serializer_class).fields.items() if not field.write_only)
+
+
+@lru_cache(maxsize=1024)
+def eager_loading_paths(serializer_class, names=None):
+    """
+    (select_related, prefetch_related) triés, calculés une fois par classe
+    et par sélection de champs `names` (None : tous).
+    """
+    paths = (set(), set())
+    _collect(_serializer(serializer_class), serializer_class.Meta.model, '', False, paths, names)
+    select, prefetch = paths
+    return tuple(sorted(select)), tuple(sorted(prefetch))
+
+
+@lru_cache(maxsize=1024)
+def only_columns(serializer_class, names):
+    """
+    Colonnes à charger pour les champs `names`, ou None si l'un d'eux lit
+    autre chose qu'un champ du modèle (méthode, propriété : colonnes inconnues).
+    """
+    Model = serializer_class.Meta.model
+    fields = _serializer(serializer_class).fields
+    columns = {Model._meta.pk.name}
+    for name in names:
+        model_field = _model_field(fields[name], Model)
+        if model_field is None:
+            return None
+        if model_field.concrete and not model_field.many_to_many:
+            columns.add(model_field.name)
+    return tuple(sorted(columns))
+
+
+@lru_cache(maxsize=None)
+def related_models(serializer_class):
+    """Modèles lus par le serializer au-delà du sien (cibles des chemins ci-dessus)"""
+    Model = serializer_class.Meta.model
+    models = set()
+    for path in sum(eager_loading_paths(serializer_class), ()):
+        models.update(target for _, _, target in _walk(Model, path.split('__')))
+    return frozenset(models)
+
+
+def apply_eager_loading(queryset, serializer_class, names=None):
+    if not hasattr(getattr(serializer_class, 'Meta', None), 'model'):
+        return queryset
+    select, prefetch = eager_loading_paths(serializer_class, names)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    columns = only_columns(serializer_class, names) if names is not None else None
+    if columns:
+        # Une relation déjà jointe par get_queryset ne peut pas être différée
+        joined = queryset.query.select_related
+        if joined is True:
+            return queryset
+        if joined:
+            columns = tuple(sorted(set(columns).union(joined)))
+        queryset = queryset.only(*columns)
+    return queryset
+
+
+class EagerLoadingMixin:
+    """
+    Applique aux querysets d'un ModelViewSet les relations lues par son
+    serializer (voir eager_loading_paths). Passe par filter_queryset :
+    s'applique à toutes les branches de get_queryset (admin, équipe,
+    fiche personnelle...) sans les modifier, pour list comme retrieve.
+    Limité aux champs de ?fields= / ?omit= si le serializer les gère.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        names = None
+        if issubclass(serializer_class, SparseFieldsMixin):
+            names = requested_fields(self.request, serializer_field_names(serializer_class))
+        return apply_eager_loading(queryset, serializer_class, names)
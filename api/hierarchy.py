@@ -0,0 +1,241 @@
+# api/hierarchy.py - ORGANIGRAMME ET HIÉRARCHIE (responsable_direct)
+
+import logging
+
+from django.db import connection, transaction
+
+from .models import Salarie, SalarieHierarchie
+
+logger = logging.getLogger(__name__)
+
+# Colonnes renvoyées pour chaque nœud de l'organigramme
+NODE_FIELDS = ('nom', 'prenom', 'matricule', 'poste', 'service_id', 'statut')
+
+
+# ============================================================================
+# REQUÊTES RÉCURSIVES (CTE) - compatibles PostgreSQL et SQLite
+# ============================================================================
+
+def _subtree_sql(max_depth):
+    table = Salarie._meta.db_table
+    depth_clause = 'AND a.profondeur < %s' if max_depth is not None else ''
+    columns = ', '.join(f's.{c}' for c in NODE_FIELDS)
+    # chemin = ",id1,id2,...," : un nœud déjà présent dans le chemin signale un cycle
+    return f"""
+        WITH RECURSIVE arbre(id, responsable_id, profondeur, chemin, cycle) AS (
+            SELECT s.id, s.responsable_direct_id, 0,
+                   ',' || CAST(s.id AS TEXT) || ',', 0
+            FROM {table} s WHERE s.id = %s
+            UNION ALL
+            SELECT s.id, s.responsable_direct_id, a.profondeur + 1,
+                   a.chemin || CAST(s.id AS TEXT) || ',',
+                   CASE WHEN a.chemin LIKE '%%,' || CAST(s.id AS TEXT) || ',%%' THEN 1 ELSE 0 END
+            FROM {table} s JOIN arbre a ON s.responsable_direct_id = a.id
+            WHERE a.cycle = 0 {depth_clause}
+        )
+        SELECT a.id, a.responsable_id, a.profondeur, a.cycle, {columns}
+        FROM arbre a JOIN {table} s ON s.id = a.id
+        ORDER BY a.profondeur, s.nom, s.prenom
+    """
+
+
+def _chain_sql():
+    table = Salarie._meta.db_table
+    columns = ', '.join(f's.{c}' for c in NODE_FIELDS)
+    return f"""
+        WITH RECURSIVE chaine(id, responsable_id, profondeur, chemin, cycle) AS (
+            SELECT s.id, s.responsable_direct_id, 0,
+                   ',' || CAST(s.id AS TEXT) || ',', 0
+            FROM {table} s WHERE s.id = %s
+            UNION ALL
+            SELECT s.id, s.responsable_direct_id, c.profondeur + 1,
+                   c.chemin || CAST(s.id AS TEXT) || ',',
+                   CASE WHEN c.chemin LIKE '%%,' || CAST(s.id AS TEXT) || ',%%' THEN 1 ELSE 0 END
+            FROM {table} s JOIN chaine c ON s.id = c.responsable_id
+            WHERE c.cycle = 0
+        )
+        SELECT c.id, c.responsable_id, c.profondeur, c.cycle, {columns}
+        FROM chaine c JOIN {table} s ON s.id = c.id
+        ORDER BY c.profondeur
+    """
+
+
+def _fetch(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _node(row):
+    node = {'id': row['id'], 'responsable_direct': row['responsable_id'], 'profondeur': row['profondeur']}
+    for field in NODE_FIELDS:
+        node[field.replace('_id', '')] = row[field]
+    return node
+
+
+# ============================================================================
+# API PUBLIQUE
+# ============================================================================
+
+def build_org_chart(salarie_id, max_depth=None):
+    """
+    Retourne l'organigramme sous `salarie_id` en UNE requête récursive.
+
+    Chaque nœud contient profondeur, effectif_direct, effectif_total
+    (tous niveaux) et ses subordonnes. Les cycles éventuels dans
+    responsable_direct sont coupés et listés dans `cycles`.
+    Retourne None si le salarié n'existe pas.
+    """
+    params = [salarie_id] + ([max_depth] if max_depth is not None else [])
+    rows = _fetch(_subtree_sql(max_depth), params)
+    if not rows:
+        return None
+
+    nodes = {}
+    cycles = []
+    for row in rows:
+        if row['cycle']:
+            cycles.append({'responsable': row['responsable_id'], 'salarie': row['id']})
+            continue
+        node = _node(row)
+        node['subordonnes'] = []
+        nodes[row['id']] = node
+
+    racine = nodes[salarie_id]
+    # Lignes triées par profondeur : les parents sont toujours déjà présents
+    for node in nodes.values():
+        if node is not racine and node['responsable_direct'] in nodes:
+            nodes[node['responsable_direct']]['subordonnes'].append(node)
+
+    # Effectifs calculés des feuilles vers la racine
+    for node in sorted(nodes.values(), key=lambda n: n['profondeur'], reverse=True):
+        node['effectif_direct'] = len(node['subordonnes'])
+        node['effectif_total'] = sum(1 + child['effectif_total'] for child in node['subordonnes'])
+
+    return {
+        'racine': racine,
+        'effectif': racine['effectif_total'],
+        'profondeur_max': max(n['profondeur'] for n in nodes.values()),
+        'cycles': cycles,
+    }
+
+
+def get_chain_of_command(salarie_id):
+    """
+    Chaîne hiérarchique de `salarie_id` jusqu'au sommet (profondeur 0 = le
+    salarié lui-même), en une requête. Retourne (chaine, cycle_detecte).
+    """
+    rows = _fetch(_chain_sql(), [salarie_id])
+    chaine = [_node(row) for row in rows if not row['cycle']]
+    return chaine, any(row['cycle'] for row in rows)
+
+
+def get_all_reports_ids(salarie_id, include_self=False):
+    """Ids de tous les subordonnés (tous niveaux) via la table de fermeture indexée"""
+    qs = SalarieHierarchie.objects.filter(ancetre_id=salarie_id)
+    if not include_self:
+        qs = qs.filter(profondeur__gt=0)
+    return qs.values_list('descendant_id', flat=True)
+
+
+def is_in_subtree(salarie_id, candidat_id):
+    """True si `candidat_id` est `salarie_id` ou l'un de ses subordonnés"""
+    if salarie_id == candidat_id:
+        return True
+    return SalarieHierarchie.objects.filter(ancetre_id=salarie_id, descendant_id=candidat_id).exists()
+
+
+# ============================================================================
+# MAINTENANCE DE LA TABLE DE FERMETURE
+# ============================================================================
+
+def closure_attach(salarie_id, responsable_id):
+    """
+    (Re)place `salarie_id` et tout son sous-arbre sous `responsable_id`
+    (None = racine). Appelé par les signals à la création et quand
+    responsable_direct change.
+    """
+    with transaction.atomic():
+        SalarieHierarchie.objects.get_or_create(
+            ancetre_id=salarie_id, descendant_id=salarie_id, defaults={'profondeur': 0}
+        )
+        subtree = list(
+            SalarieHierarchie.objects.filter(ancetre_id=salarie_id).values_list('descendant_id', 'profondeur')
+        )
+        subtree_ids = [descendant_id for descendant_id, _ in subtree]
+
+        # Détacher le sous-arbre de ses anciens ancêtres
+        SalarieHierarchie.objects.filter(descendant_id__in=subtree_ids).exclude(ancetre_id__in=subtree_ids).delete()
+
+        if responsable_id is None:
+            return
+        if responsable_id in subtree_ids:
+            logger.warning(
+                f"Cycle hiérarchique: {responsable_id} est subordonné de {salarie_id}, sous-arbre laissé détaché"
+            )
+            return
+
+        ancestors = SalarieHierarchie.objects.filter(descendant_id=responsable_id).values_list('ancetre_id', 'profondeur')
+        SalarieHierarchie.objects.bulk_create([
+            SalarieHierarchie(ancetre_id=ancetre_id, descendant_id=descendant_id, profondeur=d1 + d2 + 1)
+            for ancetre_id, d1 in ancestors
+            for descendant_id, d2 in subtree
+        ], batch_size=1000)
+
+
+def closure_add_roots(salarie_ids):
+    """Ajoute les lignes réflexives de nouveaux salariés sans responsable (imports en masse)"""
+    SalarieHierarchie.objects.bulk_create([
+        SalarieHierarchie(ancetre_id=salarie_id, descendant_id=salarie_id, profondeur=0)
+        for salarie_id in salarie_ids
+    ], batch_size=2000, ignore_conflicts=True)
+
+
+def break_cycles(parents):
+    """
+    Coupe les cycles de `parents` ({id: responsable_id}) sur place : dans
+    chaque cycle, le lien du plus petit id est ignoré (ce salarié devient
+    racine de la chaîne), comme closure_attach qui refuse le lien fermant
+    un cycle. Retourne les ids coupés.
+    """
+    cut, done = [], set()
+    for start in parents:
+        path, position = [], {}
+        current = start
+        while current is not None and current not in done and current not in position:
+            position[current] = len(path)
+            path.append(current)
+            current = parents.get(current)
+        if current is not None and current in position:
+            cycle = path[position[current]:]
+            root = min(cycle)
+            parents[root] = None
+            cut.append(root)
+            logger.warning(f"Cycle hiérarchique {cycle}: lien de {root} vers son responsable ignoré")
+        done.update(path)
+    return cut
+
+
+def rebuild_closure():
+    """
+    Reconstruit entièrement la table de fermeture (une lecture de
+    (id, responsable_direct_id) puis bulk_create). À utiliser après des
+    modifications en masse qui contournent les signals (queryset.update).
+    Les cycles de responsable_direct sont coupés (break_cycles) : aucun
+    salarié n'est son propre ancêtre. Retourne le nombre de lignes créées.
+    """
+    parents = dict(Salarie.objects.values_list('id', 'responsable_direct_id'))
+    break_cycles(parents)
+    rows = []
+    for salarie_id in parents:
+        rows.append(SalarieHierarchie(ancetre_id=salarie_id, descendant_id=salarie_id, profondeur=0))
+        current, depth = parents[salarie_id], 1
+        while current is not None:
+            rows.append(SalarieHierarchie(ancetre_id=current, descendant_id=salarie_id, profondeur=depth))
+            current, depth = parents.get(current), depth + 1
+
+    with transaction.atomic():
+        SalarieHierarchie.objects.all().delete()
+        SalarieHierarchie.objects.bulk_create(rows, batch_size=2000)
+    return len(rows)
@@ -0,0 +1,407 @@
+# api/import_converters.py - CONVERSION VECTORISÉE DES COLONNES D'IMPORT
+
+import numpy as np
+import pandas as pd
+from django.core.exceptions import FieldDoesNotExist
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y')
+TIME_FORMATS = ('%H:%M:%S', '%H:%M')
+TRUE_VALUES = frozenset(('true', '1', '1.0', 'yes', 'oui'))
+
+# Type interne Django -> famille de conversion
+FIELD_KINDS = {
+    'ForeignKey': 'fk',
+    'OneToOneField': 'fk',
+    'ManyToManyField': 'm2m',
+    'DateField': 'date',
+    'DateTimeField': 'datetime',
+    'TimeField': 'time',
+    'BooleanField': 'bool',
+    'IntegerField': 'int',
+    'AutoField': 'int',
+    'BigAutoField': 'int',
+    'BigIntegerField': 'int',
+    'SmallIntegerField': 'int',
+    'PositiveIntegerField': 'int',
+    'PositiveSmallIntegerField': 'int',
+    'DecimalField': 'float',
+    'FloatField': 'float',
+}
+
+
+# Champ de recherche des FK par modèle cible (défaut : 'nom' s'il existe, puis pk)
+FK_LOOKUPS = {
+    'Salarie': 'matricule',
+    'Departement': 'numero',
+    'User': 'username',
+}
+
+
+class ColumnSpec:
+    """Métadonnées d'une colonne résolues une seule fois (champ, famille, clé de sortie)"""
+
+    def __init__(self, column, field=None, error=None, ignored=False):
+        self.column = column
+        self.field = field
+        self.error = error
+        self.ignored = ignored
+        self.kind = FIELD_KINDS.get(field.get_internal_type(), 'text') if field is not None else None
+        # Les FK sont écrites par attname (service_id) : pas d'instance chargée
+        self.key = field.attname if self.kind == 'fk' else column
+        # Colonne "service_id" : valeur = pk, pas de recherche par nom
+        self.by_pk = self.kind == 'fk' and column == field.attname
+
+
+def build_column_specs(Model, columns, ignored=()):
+    """
+    Résout les champs du modèle pour chaque colonne du fichier. Les
+    colonnes de `ignored` et les champs non éditables (dates auto,
+    champs calculés) sont ignorées.
+    """
+    specs = []
+    for column in columns:
+        try:
+            field = Model._meta.get_field(column)
+        except FieldDoesNotExist:
+            specs.append(ColumnSpec(column, error=f"{Model.__name__} n'a pas de champ '{column}'"))
+            continue
+        skip = column in ignored or not field.editable or getattr(field, 'auto_now', False) \
+            or getattr(field, 'auto_now_add', False)
+        specs.append(ColumnSpec(column, field, ignored=skip))
+    return specs
+
+
+# ============================================================================
+# CONVERTISSEURS PAR FAMILLE (une Series entière à la fois)
+# Chaque convertisseur retourne (valeurs, masque_erreurs, message)
+# ============================================================================
+
+def stripped_texts(raw):
+    """Colonne en texte sans espaces de bord (calculé une fois par colonne)"""
+    if pd.api.types.is_float_dtype(raw):
+        # Excel lit les codes numériques en float : 123.0 -> '123'
+        integral = raw.isna() | (raw % 1 == 0)
+        if integral.all():
+            return pd.Series([str(v) for v in raw.fillna(0).to_numpy(dtype=np.int64).tolist()],
+                             index=raw.index, dtype=object)
+    if raw.dtype != object:
+        return raw.astype(str)
+    # Compréhension de liste : nettement plus rapide que raw.str.strip() (vides -> '')
+    texts = [
+        v.strip() if type(v) is str else ('' if v is None or v != v else str(v).strip())
+        for v in raw.to_numpy()
+    ]
+    return pd.Series(texts, index=raw.index, dtype=object)
+
+
+def empty_mask(raw, texts=None):
+    """Cellules vides : NaN/None ou chaîne blanche (texts requis si dtype object)"""
+    mask = raw.isna()
+    if raw.dtype == object:
+        mask |= texts.eq('')
+    return mask
+
+
+def _convert_dates(raw, texts, empty, as_datetime=False):
+    parsed = pd.to_datetime(raw, format=DATE_FORMATS[0], errors='coerce')
+    for date_format in DATE_FORMATS[1:]:
+        missing = parsed.isna() & ~empty
+        if missing.any():
+            parsed[missing] = pd.to_datetime(raw[missing], format=date_format, errors='coerce')
+    errors = parsed.isna() & ~empty
+    # datetime64 -> objets Python en une passe numpy (NaT -> None)
+    unit = 'datetime64[us]' if as_datetime else 'datetime64[D]'
+    values = parsed.to_numpy(dtype=unit).astype(object)
+    return pd.Series(values, index=raw.index, dtype=object), errors, \
+        'Format de date invalide (attendu: YYYY-MM-DD ou DD/MM/YYYY)'
+
+
+def _convert_times(raw, texts, empty):
+    if texts is None:
+        texts = stripped_texts(raw)
+    parsed = pd.to_datetime(texts, format=TIME_FORMATS[0], errors='coerce')
+    for time_format in TIME_FORMATS[1:]:
+        missing = parsed.isna() & ~empty
+        if missing.any():
+            parsed[missing] = pd.to_datetime(texts[missing], format=time_format, errors='coerce')
+    errors = parsed.isna() & ~empty
+    values = pd.Series([None if v is pd.NaT else v.time() for v in parsed], index=raw.index, dtype=object)
+    return values, errors, 'Format d\'heure invalide (attendu: HH:MM ou HH:MM:SS)'
+
+
+def _convert_choices(field, values, empty):
+    """Accepte la clé ou le libellé d'un choix (sans casse) et renvoie la clé"""
+    mapping = {}
+    for key, label in field.flatchoices:
+        mapping[str(label).lower()] = key
+        mapping[str(key).lower()] = key
+    mapped = pd.Series([mapping.get(str(v).lower()) for v in values.tolist()], index=values.index, dtype=object)
+    errors = mapped.isna() & ~empty
+    allowed = ', '.join(str(key) for key, _ in field.flatchoices)
+    return mapped, errors, f"Valeur non autorisée (choix: {allowed})"
+
+
+def _convert_bools(raw, texts, empty):
+    if pd.api.types.is_numeric_dtype(raw) or pd.api.types.is_bool_dtype(raw):
+        values = raw.fillna(0).astype(bool)
+    else:
+        values = pd.Series([t.lower() in TRUE_VALUES for t in texts.tolist()], index=raw.index)
+    return values.astype(object), pd.Series(False, index=raw.index), None
+
+
+def _convert_ints(raw, texts, empty):
+    numbers = pd.to_numeric(raw, errors='coerce')
+    errors = (numbers.isna() | (numbers % 1 != 0)) & ~empty
+    values = numbers.where(~errors & ~empty).astype('Int64').astype(object)
+    return values, errors, 'Nombre entier invalide'
+
+
+def _convert_floats(raw, texts, empty):
+    numbers = pd.to_numeric(raw, errors='coerce')
+    errors = numbers.isna() & ~empty
+    return numbers.astype(object), errors, 'Nombre invalide'
+
+
+def _convert_texts(raw, texts, empty):
+    return stripped_texts(raw).astype(object) if texts is None else texts.astype(object), \
+        pd.Series(False, index=raw.index), None
+
+
+# ============================================================================
+# RÉSOLUTION DES CLÉS ÉTRANGÈRES (cache partagé sur tout un import)
+# ============================================================================
+
+class ForeignKeyResolver:
+    """
+    Résout les valeurs des colonnes FK en pk, en lot : une requête par
+    champ de recherche pour les valeurs distinctes pas encore connues.
+    Le cache est partagé par tous les lots (et feuilles) d'un import ;
+    seules les correspondances trouvées sont mémorisées.
+    """
+
+    def __init__(self, lookups=None):
+        self.lookups = {**FK_LOOKUPS, **(lookups or {})}
+        self._cache = {}        # modèle -> {valeur texte: pk | AMBIGUOUS}
+        self._pk_cache = {}     # modèle -> {pk existants}
+        self._placeholder = 0
+
+    AMBIGUOUS = object()
+
+    def lookup_field(self, related_model):
+        lookup = self.lookups.get(related_model.__name__)
+        if lookup:
+            return lookup
+        if any(f.name == 'nom' for f in related_model._meta.concrete_fields):
+            return 'nom'
+        return None
+
+    def invalidate(self, Model):
+        """Oublie tout ce qui est connu de `Model` (écriture hors de l'import)"""
+        self._cache.pop(Model, None)
+        self._pk_cache.pop(Model, None)
+
+    def remember(self, Model, written, previous=None):
+        """
+        Reporte en mémoire les lignes qui viennent d'être écrites
+        (written = [(instance, pk)]) : les lots et feuilles suivants les
+        résolvent sans requête. previous = {pk: {champ: ancienne valeur}}
+        pour oublier les anciennes valeurs de recherche renommées.
+        """
+        lookup = self.lookup_field(Model)
+        cache = self._cache.setdefault(Model, {})
+        pks = self._pk_cache.setdefault(Model, set())
+        for old in (previous or {}).values():
+            if lookup in old and old[lookup] is not None:
+                cache.pop(str(old[lookup]), None)
+        for instance, pk in written:
+            pks.add(pk)
+            if lookup is None:
+                continue
+            value = getattr(instance, lookup)
+            if value is None:
+                continue
+            value = str(value)
+            cache[value] = pk if cache.get(value, pk) == pk else self.AMBIGUOUS
+
+    def placeholder_pk(self):
+        """pk fictif (négatif) des lignes créées en dry_run, pour résoudre les références"""
+        self._placeholder -= 1
+        return self._placeholder
+
+    def _lookup_values(self, related_model, lookup, values):
+        cache = self._cache.setdefault(related_model, {})
+        missing = [v for v in values if v not in cache]
+        if missing and lookup:
+            for pk, value in related_model.objects.filter(**{f'{lookup}__in': missing}).values_list('pk', lookup):
+                value = str(value)
+                cache[value] = self.AMBIGUOUS if value in cache else pk
+        return cache
+
+    def _existing_pks(self, related_model, candidates):
+        known = self._pk_cache.setdefault(related_model, set())
+        missing = [pk for pk in candidates if pk not in known]
+        if missing:
+            known.update(related_model.objects.filter(pk__in=missing).values_list('pk', flat=True))
+        return known
+
+    def resolve(self, spec, raw, texts, empty):
+        related_model = spec.field.related_model
+        if texts is None:
+            texts = stripped_texts(raw)
+        distinct = set(texts[~empty].unique())
+
+        mapping = {}
+        lookup = None if spec.by_pk else self.lookup_field(related_model)
+        if lookup and distinct:
+            cache = self._lookup_values(related_model, lookup, distinct)
+            mapping = {v: cache[v] for v in distinct if v in cache and cache[v] is not self.AMBIGUOUS}
+
+        candidates = {v for v in distinct - mapping.keys() if v.isdigit()}
+        if candidates:
+            existing = self._existing_pks(related_model, {int(v) for v in candidates})
+            mapping.update({v: int(v) for v in candidates if int(v) in existing})
+
+        values = texts.map(mapping)
+        errors = values.isna() & ~empty
+        searched = f"{lookup} ou id" if lookup else "id"
+        message = f"Impossible de trouver {related_model.__name__} par {searched} (ou valeur ambiguë)"
+        return values.astype(object), errors, message
+
+
+def convert_column(spec, raw, resolver=None):
+    """Convertit une colonne entière selon son ColumnSpec"""
+    # Texte nettoyé calculé une fois, seulement quand il sert (colonnes object)
+    texts = stripped_texts(raw) if raw.dtype == object else None
+    empty = empty_mask(raw, texts)
+    if spec.error:
+        return raw, ~empty, empty, spec.error
+    if spec.kind == 'm2m':
+        return raw, ~empty, empty, "ManyToMany non supporté pour l'import"
+    if spec.kind == 'fk':
+        values, errors, message = (resolver or ForeignKeyResolver()).resolve(spec, raw, texts, empty)
+    elif spec.kind in ('date', 'datetime'):
+        values, errors, message = _convert_dates(raw, texts, empty, as_datetime=spec.kind == 'datetime')
+    elif spec.kind == 'time':
+        values, errors, message = _convert_times(raw, texts, empty)
+    elif spec.kind == 'bool':
+        values, errors, message = _convert_bools(raw, texts, empty)
+    elif spec.kind == 'int':
+        values, errors, message = _convert_ints(raw, texts, empty)
+    elif spec.kind == 'float':
+        values, errors, message = _convert_floats(raw, texts, empty)
+    else:
+        values, errors, message = _convert_texts(raw, texts, empty)
+    if spec.field is not None and spec.field.choices and spec.kind == 'text':
+        values, errors, message = _convert_choices(spec.field, values, empty)
+    return values, errors, empty, message
+
+
+def convert_value(field, value):
+    """
+    Conversion d'une valeur isolée avec les mêmes règles que les colonnes.
+    Retourne None si vide, lève ValueError si invalide.
+    """
+    spec = ColumnSpec(field.name, field)
+    values, errors, empty, message = convert_column(spec, pd.Series([value], dtype=object))
+    if errors.iloc[0]:
+        raise ValueError(message)
+    return None if empty.iloc[0] else values.iloc[0]
+
+
+# ============================================================================
+# CONVERSION D'UN DATAFRAME
+# ============================================================================
+
+_EMPTY = object()
+
+
+class ConvertedFrame:
+    """
+    Résultat de convert_dataframe() : colonnes converties, masques de
+    cellules vides et d'erreurs. rows() matérialise des dicts simples.
+    """
+
+    def __init__(self, specs, columns, row_numbers, pending_fk=()):
+        self.specs = specs
+        self.columns = columns          # [(spec, valeurs, erreurs, vides, message)]
+        self.row_numbers = row_numbers
+        self.pending_fk = list(pending_fk)  # colonnes FK laissées à resolve_foreign_keys()
+
+    def resolve_foreign_keys(self, df, resolver):
+        """
+        Convertit les colonnes FK mises de côté (defer_fk=True) : la
+        résolution interroge la base, elle se fait dans le processus qui
+        écrit, avec son cache. Colonnes remises dans l'ordre du fichier.
+        """
+        for spec in self.pending_fk:
+            values, errors, empty, message = convert_column(spec, df[spec.column], resolver)
+            self.columns.append((spec, values, errors.to_numpy(dtype=bool), empty.to_numpy(dtype=bool), message))
+        self.pending_fk = []
+        order = {spec.column: i for i, spec in enumerate(self.specs)}
+        self.columns.sort(key=lambda column: order[column[0].column])
+
+    @property
+    def ignored_columns(self):
+        return [spec.column for spec in self.specs if spec.ignored]
+
+    @property
+    def error_mask(self):
+        mask = np.zeros(len(self.row_numbers), dtype=bool)
+        for _, _, errors, _, _ in self.columns:
+            mask |= errors
+        return mask
+
+    def rows(self):
+        """
+        Itère (numéro_ligne, données, erreurs) : données = {clé: valeur}
+        sans les cellules vides, erreurs = messages de conversion de la ligne.
+        """
+        keys = [spec.key for spec, *_ in self.columns]
+        cells = []
+        for spec, values, errors, empty, message in self.columns:
+            # Cellules vides remplacées par un marqueur, écartées à la construction du dict
+            column = values.to_numpy(dtype=object, copy=True)
+            column[empty] = _EMPTY
+            cells.append(column.tolist())
+
+        error_rows = self.error_mask.tolist()
+        for i, (row_num, row) in enumerate(zip(self.row_numbers, zip(*cells))):
+            if error_rows[i]:
+                errors = [
+                    f"Erreur conversion champ '{spec.column}': {message}"
+                    for spec, _, col_errors, _, message in self.columns if col_errors[i]
+                ]
+                yield row_num, None, errors
+                continue
+            yield row_num, {key: value for key, value in zip(keys, row) if value is not _EMPTY}, []
+
+
+def convert_dataframe(Model, df, first_row=2, row_numbers=None, resolver=None, ignored=(), defer_fk=False):
+    """
+    Convertit un DataFrame colonne par colonne pour `Model` : une
+    résolution des champs par colonne, parsing vectorisé (dates,
+    nombres, booléens), FK résolues en lot via `resolver` (cache
+    partagé). `first_row` = numéro de la première ligne de données dans
+    le fichier (1 = en-tête), ou `row_numbers` explicites (lots issus
+    de api/import_readers.py). defer_fk=True : aucune requête, les
+    colonnes FK sont laissées à ConvertedFrame.resolve_foreign_keys()
+    (conversion dans un autre processus, voir api/import_engine.py).
+    """
+    specs = build_column_specs(Model, df.columns, ignored)
+    resolver = resolver or ForeignKeyResolver()
+    columns, pending_fk = [], []
+    for spec in specs:
+        if spec.ignored:
+            continue
+        if defer_fk and spec.kind == 'fk' and not spec.error:
+            pending_fk.append(spec)
+            continue
+        values, errors, empty, message = convert_column(spec, df[spec.column], resolver)
+        columns.append((spec, values, errors.to_numpy(dtype=bool), empty.to_numpy(dtype=bool), message))
+    if row_numbers is None:
+        row_numbers = range(first_row, first_row + len(df))
+    return ConvertedFrame(specs, columns, row_numbers, pending_fk)
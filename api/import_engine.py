@@ -0,0 +1,888 @@
+# api/import_engine.py - MOTEUR D'IMPORT UNIQUE
+#
+# Registre des modèles -> lecteur (api/import_readers.py) -> conversion
+# vectorisée + cache FK (api/import_converters.py) -> écriture en masse.
+# Les endpoints d'import (import_views, batch_views) n'en sont que des adaptateurs.
+# pandas (import_converters) n'est chargé qu'au premier import de fichier :
+# le module reste léger à charger pour les vues, l'admin et les commandes.
+
+import logging
+import multiprocessing
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import DatabaseError, connection, models, transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, pre_save
+
+from .import_readers import TabularReader, open_reader, sheet_names
+from .import_workers import convert_chunk, init_worker
+from .provisioning import deferred_provisioning
+from .table_versions import bump_table_version
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+APP_LABEL = 'api'
+BATCH_SIZE = 2000
+WRITE_BATCH_SIZE = 500
+# UPDATE groupé par valeurs si au moins 4 lignes par combinaison en moyenne
+GROUPED_UPDATE_RATIO = 4
+
+DEFAULT_EXCLUDE = ('id', 'date_creation', 'date_modification')
+
+# Au-delà, la table de fermeture est reconstruite d'un bloc plutôt que ligne à ligne
+CLOSURE_REBUILD_THRESHOLD = 50
+
+# Processus de conversion des gros fichiers (1 = tout dans la requête)
+IMPORT_WORKERS = getattr(settings, 'IMPORT_WORKERS', 1)
+# Lots convertis d'avance par processus (mémoire bornée)
+WORKER_PREFETCH = 2
+
+
+def _is_placeholder(pk):
+    """pk fictif d'une ligne créée en dry_run (voir ForeignKeyResolver.placeholder_pk)"""
+    return pk is None or (isinstance(pk, int) and pk < 0)
+
+
+def normalize_column(column):
+    return str(column).strip().lower().replace(' ', '_')
+
+
+# ============================================================================
+# REGISTRE DES MODÈLES IMPORTABLES
+# ============================================================================
+
+def derive_unique_fields(Model):
+    """
+    Clé de dédoublonnage déduite des contraintes du modèle : premier
+    champ unique=True (hors pk et OneToOne), sinon premier unique_together.
+    """
+    for field in Model._meta.concrete_fields:
+        if field.unique and not field.primary_key and not field.is_relation:
+            return (field.name,)
+    if Model._meta.unique_together:
+        return tuple(Model._meta.unique_together[0])
+    return ()
+
+
+def _has_row_receivers(signal, Model):
+    """Receivers du signal pour Model, hors ceux marqués bulk_safe (ex: versions de table)"""
+    if not signal.has_listeners(Model):
+        return False
+    return any(not getattr(receiver, 'bulk_safe', False) for receiver in signal._live_receivers(Model))
+
+
+class ImportSpec:
+    """Description d'un modèle importable : clé, libellé, clé unique, colonnes exclues, hook"""
+
+    def __init__(self, key, model, name, unique_fields=None, exclude=DEFAULT_EXCLUDE, importable=True):
+        self.key = key
+        self.model_name = model
+        self.name = name
+        self._unique_fields = tuple(unique_fields) if unique_fields is not None else None
+        self.exclude = tuple(exclude)
+        self.importable = importable
+        self.after_write = None
+
+    @cached_property
+    def Model(self):
+        return apps.get_model(APP_LABEL, self.model_name)
+
+    @cached_property
+    def unique_fields(self):
+        if self._unique_fields is not None:
+            return self._unique_fields
+        return derive_unique_fields(self.Model)
+
+    @cached_property
+    def bulk(self):
+        """
+        Écriture en masse possible ? Non si le modèle a un save() surchargé
+        ou des signals de sauvegarde, sauf si un hook after_write les remplace.
+        """
+        if self.after_write is not None:
+            return True
+        custom_save = self.Model.save is not models.Model.save
+        signals = _has_row_receivers(pre_save, self.Model) or _has_row_receivers(post_save, self.Model)
+        return not (custom_save or signals)
+
+    def as_config(self):
+        """Forme historique de IMPORTABLE_MODELS (api/import_utils.py)"""
+        return {
+            'app': APP_LABEL,
+            'model': self.model_name,
+            'name': self.name,
+            'unique_field': self.unique_fields[0] if len(self.unique_fields) == 1 else None,
+            'unique_fields': list(self.unique_fields),
+            'exclude_fields': list(self.exclude),
+        }
+
+
+class ImportRegistry:
+    """Registre unique des modèles importables, par clé ('salarie') ou nom de classe ('Salarie')"""
+
+    def __init__(self):
+        self._specs = {}
+
+    def register(self, key, model, name, **kwargs):
+        spec = ImportSpec(key, model, name, **kwargs)
+        self._specs[key] = spec
+        return spec
+
+    def after_write(self, key):
+        """Décorateur : hook appelé après chaque écriture en masse du modèle"""
+        def decorator(func):
+            self._specs[key].after_write = func
+            return func
+        return decorator
+
+    def importable(self):
+        return [spec for spec in self._specs.values() if spec.importable]
+
+    def get(self, name):
+        """
+        Spec par clé du registre ou nom de modèle (insensible à la casse).
+        Un modèle de l'app non déclaré reçoit une spec par défaut.
+        LookupError si le modèle n'existe pas.
+        """
+        if name in self._specs:
+            return self._specs[name]
+        lowered = str(name).lower()
+        for spec in self._specs.values():
+            if spec.model_name.lower() == lowered:
+                return spec
+        Model = apps.get_model(APP_LABEL, name)
+        spec = ImportSpec(Model._meta.model_name, Model.__name__, Model._meta.verbose_name, importable=False)
+        self._specs[spec.key] = spec
+        return spec
+
+
+IMPORT_REGISTRY = ImportRegistry()
+
+IMPORT_REGISTRY.register('societe', 'Societe', 'Société')
+IMPORT_REGISTRY.register('departement', 'Departement', 'Département')
+IMPORT_REGISTRY.register('circuit', 'Circuit', 'Circuit')
+IMPORT_REGISTRY.register('service', 'Service', 'Service')
+IMPORT_REGISTRY.register('grade', 'Grade', 'Grade')
+IMPORT_REGISTRY.register('creneau_travail', 'CreneauTravail', 'Créneau de Travail')
+IMPORT_REGISTRY.register('type_acces', 'TypeAcces', 'Type d\'Accès', exclude=('id',))
+IMPORT_REGISTRY.register('outil_travail', 'OutilTravail', 'Outil de Travail', exclude=('id',))
+IMPORT_REGISTRY.register('type_application_acces', 'TypeApplicationAcces', 'Type d\'Application', exclude=('id',))
+IMPORT_REGISTRY.register('equipement', 'Equipement', 'Équipement')
+IMPORT_REGISTRY.register('salarie', 'Salarie', 'Salarié')
+IMPORT_REGISTRY.register('accesapplication', 'AccesApplication', 'Accès Application')
+IMPORT_REGISTRY.register('equipementinstance', 'EquipementInstance', 'Équipement Instance')
+IMPORT_REGISTRY.register('horairesalarie', 'HoraireSalarie', 'Horaire Salarié')
+
+
+# ============================================================================
+# HOOKS APRÈS ÉCRITURE EN MASSE (remplacent save() / signals)
+# hook(created, updated, fields, previous) : instances créées, instances
+# modifiées, attnames modifiés, {pk: {attname: ancienne valeur}}
+# ============================================================================
+
+@IMPORT_REGISTRY.after_write('salarie')
+def _after_write_salaries(created, updated, fields, previous):
+    from .hierarchy import closure_add_roots, closure_attach, rebuild_closure
+    from .provisioning import provision_users, sync_users
+    from .team_scope import invalidate_team_scopes
+
+    # Nouveaux salariés sans responsable (cas de la première passe) : simple ligne réflexive
+    closure_add_roots([s.pk for s in created if s.responsable_direct_id is None])
+    moved = [s for s in updated if 'responsable_direct_id' in previous[s.pk]]
+    attach = [s for s in created if s.responsable_direct_id is not None] + moved
+    if len(attach) > CLOSURE_REBUILD_THRESHOLD:
+        rebuild_closure()
+    else:
+        for salarie in attach:
+            closure_attach(salarie.pk, salarie.responsable_direct_id)
+
+    provision_users(created)
+    if fields & {'nom', 'prenom', 'mail_professionnel'}:
+        sync_users(updated)
+    if created or moved or 'service_id' in fields:
+        invalidate_team_scopes()
+
+
+@IMPORT_REGISTRY.after_write('service')
+def _after_write_services(created, updated, fields, previous):
+    from .team_scope import invalidate_team_scopes
+
+    invalidate_team_scopes()
+
+
+@IMPORT_REGISTRY.after_write('equipement')
+def _after_write_equipements(created, updated, fields, previous):
+    Equipement = IMPORT_REGISTRY.get('equipement').Model
+    Equipement.recalculer_stocks([e.pk for e in list(created) + list(updated)])
+
+
+@IMPORT_REGISTRY.after_write('equipementinstance')
+def _after_write_equipement_instances(created, updated, fields, previous):
+    Equipement = IMPORT_REGISTRY.get('equipement').Model
+    ids = {i.equipement_id for i in list(created) + list(updated)}
+    ids |= {old['equipement_id'] for old in previous.values() if old.get('equipement_id')}
+    Equipement.recalculer_stocks(ids)
+
+
+# ============================================================================
+# RÉSULTAT
+# ============================================================================
+
+class ImportDiff:
+    """
+    Aperçu d'un import (dry_run) : statut de chaque ligne et, pour les
+    lignes modifiées, {colonne: [avant, après]}. Calculé en mémoire à
+    partir des lignes déjà chargées par le BulkWriter (aucune requête).
+    """
+
+    def __init__(self):
+        self.rows = {}      # numéro_ligne -> {'row', 'status', 'id', 'cle', 'changes'}
+
+    def add(self, row_num, status, pk=None, key=None, changes=None):
+        row = self.rows.get(row_num)
+        if row is None:
+            self.rows[row_num] = {'row': row_num, 'status': status, 'id': pk, 'cle': key, 'changes': changes or {}}
+            return
+        # Seconde passe (auto-références) : changements ajoutés à la ligne
+        row['changes'].update(changes or {})
+        if row['changes'] and row['status'] == 'unchanged':
+            row['status'] = 'updated'
+
+    def stats(self, top=10):
+        counts = Counter(row['status'] for row in self.rows.values())
+        columns = Counter(column for row in self.rows.values() for column in row['changes'])
+        return {
+            'new': counts['created'],
+            'changed': counts['updated'],
+            'unchanged': counts['unchanged'],
+            'columns': [{'column': column, 'rows': n} for column, n in columns.most_common(top)],
+        }
+
+    def as_list(self, status=None):
+        rows = (row for _, row in sorted(self.rows.items()))
+        return [row for row in rows if status is None or row['status'] == status]
+
+
+class ImportResult:
+    """
+    Compteurs, erreurs et (optionnellement) statut ligne par ligne d'un
+    import ; le détail par ligne est borné à ROWS_LIMIT entrées.
+    """
+
+    ROWS_LIMIT = 500
+
+    def __init__(self, collect_rows=False, collect_diff=False):
+        self.total = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0      # lignes identiques à la base : aucune écriture
+        self.errors = []        # [{'row', 'error'}]
+        self.warnings = []      # [{'row', 'warning'}]
+        self.rows = [] if collect_rows else None
+        self.rows_truncated = False
+        self.diff = ImportDiff() if collect_diff else None
+        self._unchanged_rows = set()
+
+    def _add_row(self, row):
+        if len(self.rows) < self.ROWS_LIMIT:
+            self.rows.append(row)
+        else:
+            self.rows_truncated = True
+
+    def add_error(self, row_num, message):
+        self.errors.append({'row': row_num, 'error': message})
+        if self.rows is not None:
+            self._add_row({'row': row_num, 'status': 'error', 'errors': [message]})
+
+    def add_status(self, row_num, status, pk):
+        if status == 'created':
+            self.inserted += 1
+        elif status == 'unchanged':
+            self.unchanged += 1
+            self._unchanged_rows.add(row_num)
+        else:
+            self.updated += 1
+        if self.rows is not None:
+            self._add_row({'row': row_num, 'status': status, 'id': pk, 'message': 'OK'})
+
+    def mark_updated(self, row_num):
+        """Ligne comptée inchangée en première passe mais modifiée par la seconde"""
+        if row_num in self._unchanged_rows:
+            self._unchanged_rows.discard(row_num)
+            self.unchanged -= 1
+            self.updated += 1
+
+    def as_dict(self):
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'errors': self.errors,
+            'warnings': self.warnings,
+        }
+
+
+# ============================================================================
+# ÉCRITURE EN MASSE
+# ============================================================================
+
+class _Entry:
+    """Une ligne (ou plusieurs lignes fusionnées ayant la même clé) à écrire"""
+
+    __slots__ = ('row_nums', 'data', 'key', 'instance', 'created', 'unchanged')
+
+    def __init__(self, row_num, data, key):
+        self.row_nums = [row_num]
+        self.data = data
+        self.key = key
+        self.instance = None
+        self.created = False
+        self.unchanged = False
+
+    @property
+    def status(self):
+        return 'created' if self.created else ('unchanged' if self.unchanged else 'updated')
+
+
+class BulkWriter:
+    """
+    Écrit un lot de lignes converties : lecture des existants en une
+    requête (par clé unique ou pk), puis bulk_create + bulk_update dans
+    un savepoint. En cas d'erreur base (contrainte...), le lot est
+    rejoué ligne à ligne pour attribuer l'erreur à la bonne ligne.
+    Une ligne identique à la base n'est pas écrite (ré-import idempotent,
+    date_modification inchangée) ; une ligne modifiée ne met à jour que
+    ses champs modifiés.
+    """
+
+    def __init__(self, spec, result, resolver=None, dry_run=False):
+        self.spec = spec
+        self.Model = spec.Model
+        self.result = result
+        self.resolver = resolver
+        self.dry_run = dry_run
+        meta = self.Model._meta
+        self.key_attnames = tuple(meta.get_field(name).attname for name in spec.unique_fields)
+        self.pk_attname = meta.pk.attname
+        self.fields_by_attname = {f.attname: f for f in meta.concrete_fields}
+        self.auto_now_fields = [f for f in meta.concrete_fields if getattr(f, 'auto_now', False)]
+        self.derived_fields = set(getattr(self.Model, 'DERIVED_FIELDS', ()))
+
+    # ------------------------------------------------------------ clés
+
+    def _entry_key(self, data):
+        if data.get(self.pk_attname) is not None:
+            return ('pk', data[self.pk_attname])
+        if self.key_attnames and all(data.get(a) is not None for a in self.key_attnames):
+            return tuple(data[a] for a in self.key_attnames)
+        return None
+
+    def _group(self, rows):
+        """Fusionne les lignes d'un même lot ayant la même clé (la dernière l'emporte)"""
+        entries, by_key = [], {}
+        for row_num, data in rows:
+            key = self._entry_key(data)
+            if key is not None and key in by_key:
+                entry = by_key[key]
+                entry.row_nums.append(row_num)
+                entry.data.update(data)
+                continue
+            entry = _Entry(row_num, data, key)
+            entries.append(entry)
+            if key is not None:
+                by_key[key] = entry
+        return entries, by_key
+
+    def _fetch_existing(self, keys):
+        """Instances existantes pour les clés du lot, en une requête"""
+        pk_keys = [k[1] for k in keys if k[0] == 'pk']
+        unique_keys = [k for k in keys if k[0] != 'pk']
+        condition = Q(pk__in=pk_keys) if pk_keys else Q()
+        if unique_keys:
+            if len(self.key_attnames) == 1:
+                condition |= Q(**{f'{self.key_attnames[0]}__in': [k[0] for k in unique_keys]})
+            else:
+                for key in unique_keys:
+                    condition |= Q(**dict(zip(self.key_attnames, key)))
+        if not condition:
+            return {}
+
+        existing = {}
+        for instance in self.Model.objects.filter(condition):
+            existing[('pk', instance.pk)] = instance
+            if self.key_attnames:
+                existing[tuple(getattr(instance, a) for a in self.key_attnames)] = instance
+        return existing
+
+    def _changed_fields(self, instance, data):
+        """attnames dont la valeur importée diffère de la base (comparées sous leur forme SQL)"""
+        changed = []
+        for attname, value in data.items():
+            old = getattr(instance, attname)
+            if attname == self.pk_attname or old == value:
+                continue
+            field = self.fields_by_attname[attname]
+            try:
+                same = field.get_db_prep_save(old, connection) == field.get_db_prep_save(value, connection)
+            except (TypeError, ValueError):
+                same = False
+            if not same:
+                changed.append(attname)
+        return changed
+
+    # ---------------------------------------------------------- écriture
+
+    def write(self, rows, record=True):
+        """
+        rows : [(numéro_ligne, {attname: valeur})] déjà convertis.
+        Retourne {numéro_ligne: pk} des lignes écrites ; record=False
+        n'ajoute pas de statut au résultat (passe complémentaire).
+        """
+        if not rows:
+            return {}
+        entries, by_key = self._group(rows)
+        existing = self._fetch_existing(list(by_key))
+
+        created, updated, fields, previous = [], [], set(), {}
+        for entry in entries:
+            instance = existing.get(entry.key) if entry.key is not None else None
+            if instance is None:
+                data = {k: v for k, v in entry.data.items() if k != self.pk_attname or entry.key is None}
+                entry.instance, entry.created = self.Model(**data), True
+                created.append(entry.instance)
+                continue
+            entry.instance = instance
+            changed = self._changed_fields(instance, entry.data)
+            if not changed:
+                entry.unchanged = True
+                continue
+            previous[instance.pk] = {attname: getattr(instance, attname) for attname in changed}
+            for attname in changed:
+                setattr(instance, attname, entry.data[attname])
+            fields.update(changed)
+            updated.append(instance)
+
+        if not self.dry_run:
+            if self.spec.bulk:
+                try:
+                    self._write_bulk(created, updated, fields, previous)
+                except DatabaseError as e:
+                    logger.warning(f"Import {self.spec.key}: écriture en masse impossible ({e}), reprise ligne à ligne")
+                    return self._write_rows(entries, previous, record)
+            else:
+                return self._write_rows(entries, previous, record)
+            if created or updated:
+                bump_table_version(self.Model)
+
+        written, remembered = {}, []
+        diff = self.result.diff
+        for entry in entries:
+            status = entry.status
+            if not self.dry_run or not entry.created:
+                pk = entry.instance.pk
+            elif self.resolver is not None:
+                pk = self.resolver.placeholder_pk()
+            else:
+                pk = None
+            remembered.append((entry.instance, pk))
+            shown = pk if not self.dry_run else 'N/A (dry_run)'
+            changes = None
+            if diff is not None and status == 'updated':
+                old = previous[entry.instance.pk]
+                changes = {
+                    self.fields_by_attname[a].name: [old[a], self._display(a, getattr(entry.instance, a))]
+                    for a in old
+                }
+            for i, row_num in enumerate(entry.row_nums):
+                written[row_num] = pk
+                if record:
+                    self.result.add_status(row_num, 'updated' if i and entry.created else status, shown)
+                elif status == 'updated':
+                    self.result.mark_updated(row_num)
+                if diff is not None and (record or changes):
+                    key = None
+                    if entry.created and entry.key is not None and entry.key[0] != 'pk':
+                        key = dict(zip(self.key_attnames, entry.key))
+                    diff.add(row_num, status, None if entry.created else pk, key, changes)
+        if self.resolver is not None:
+            self.resolver.remember(self.Model, remembered, previous)
+        return written
+
+    def _display(self, attname, value):
+        """Valeur convertie dans le type Python du champ (ex: pk 2.0 venu de pandas -> 2)"""
+        try:
+            return self.fields_by_attname[attname].to_python(value)
+        except ValidationError:
+            return value
+
+    def _write_bulk(self, created, updated, fields, previous):
+        fields = set(fields) - {self.pk_attname}
+        if hasattr(self.Model, 'refresh_derived_fields'):
+            for instance in created:
+                instance.refresh_derived_fields()
+            # Champs calculés réécrits seulement s'ils changent
+            for instance in updated:
+                before = [getattr(instance, name) for name in self.derived_fields]
+                instance.refresh_derived_fields()
+                fields.update(name for name, old in zip(self.derived_fields, before)
+                              if getattr(instance, name) != old)
+        # auto_now : un seul horodatage pour le lot (permet le regroupement ci-dessous)
+        for field in self.auto_now_fields:
+            if updated:
+                now = field.pre_save(updated[0], add=False)
+                for instance in updated:
+                    setattr(instance, field.attname, now)
+                fields.add(field.attname)
+
+        with transaction.atomic():
+            self.Model.objects.bulk_create(created, batch_size=WRITE_BATCH_SIZE)
+            if updated and fields:
+                self._update(updated, sorted(fields))
+            if self.spec.after_write is not None:
+                self.spec.after_write(created, updated, fields, previous)
+
+    def _update(self, instances, fields):
+        """
+        bulk_update génère un CASE WHEN par champ et par ligne : quand peu
+        de combinaisons de valeurs distinctes (ex: responsable_direct), un
+        UPDATE ... WHERE id IN (...) par combinaison est bien plus rapide.
+        """
+        groups = {}
+        try:
+            for instance in instances:
+                values = tuple(getattr(instance, name) for name in fields)
+                groups.setdefault(values, []).append(instance.pk)
+        except TypeError:
+            groups = None   # valeur non hachable (JSONField...)
+        if groups is None or len(groups) * GROUPED_UPDATE_RATIO > len(instances):
+            self.Model.objects.bulk_update(instances, fields, batch_size=WRITE_BATCH_SIZE)
+            return
+        for values, pks in groups.items():
+            for start in range(0, len(pks), WRITE_BATCH_SIZE):
+                self.Model.objects.filter(pk__in=pks[start:start + WRITE_BATCH_SIZE]).update(**dict(zip(fields, values)))
+
+    def _write_rows(self, entries, previous, record=True):
+        """Écriture ligne à ligne (save() + signals), un savepoint par ligne"""
+        written, remembered = {}, []
+        for entry in entries:
+            try:
+                if not entry.unchanged:
+                    with transaction.atomic():
+                        if entry.created:
+                            entry.instance.pk = None
+                        entry.instance.save()
+            except Exception as e:
+                for row_num in entry.row_nums:
+                    self.result.add_error(row_num, str(e))
+                continue
+            remembered.append((entry.instance, entry.instance.pk))
+            for i, row_num in enumerate(entry.row_nums):
+                written[row_num] = entry.instance.pk
+                if record:
+                    status = 'updated' if i and entry.created else entry.status
+                    self.result.add_status(row_num, status, entry.instance.pk)
+                elif entry.status == 'updated':
+                    self.result.mark_updated(row_num)
+        if self.resolver is not None:
+            self.resolver.remember(self.Model, remembered, previous)
+        return written
+
+
+# ============================================================================
+# MOTEUR
+# ============================================================================
+
+def _resolver():
+    """Cache FK partagé par tout un import (charge import_converters, donc pandas)"""
+    from .import_converters import ForeignKeyResolver
+
+    return ForeignKeyResolver()
+
+
+class ImportEngine:
+    """
+    Importe un fichier (CSV/XLSX/JSON) pour un modèle du registre :
+
+        result = ImportEngine(IMPORT_REGISTRY.get('salarie')).run_file(upload)
+
+    Lecture par lots, conversion vectorisée, FK résolues via un cache
+    partagé, écriture en masse, provisionnement des User différé ; le
+    tout dans une transaction. workers > 1 : conversion des lots dans un
+    pool de processus (voir _run_parallel).
+    """
+
+    def __init__(self, spec, dry_run=False, batch_size=BATCH_SIZE, resolver=None, collect_rows=False,
+                 deferred_fields=(), collect_diff=False, workers=None):
+        self.spec = spec
+        self.deferred_fields = tuple(deferred_fields)
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+        self.workers = IMPORT_WORKERS if workers is None else workers
+        self.resolver = resolver or _resolver()
+        self.result = ImportResult(collect_rows=collect_rows, collect_diff=collect_diff)
+        self.writer = BulkWriter(spec, self.result, self.resolver, dry_run=dry_run)
+        # Références en attente de la seconde passe : (numéro_ligne, pk, valeurs brutes)
+        self._deferred_columns = None
+        self._pending_links = []
+
+    def run_file(self, file, filename=None, **reader_kwargs):
+        return self.run(open_reader(file, filename=filename, batch_size=self.batch_size, **reader_kwargs))
+
+    def run(self, reader, link=True):
+        """link=False : seconde passe laissée à l'appelant (voir WorkbookImport)"""
+        with transaction.atomic(), deferred_provisioning():
+            if self.workers > 1:
+                self._run_parallel(reader)
+            else:
+                for batch in reader.batches():
+                    self.import_batch(batch)
+            if link:
+                self.link_deferred_references()
+        return self.result
+
+    def _deferred_reference_columns(self, columns):
+        """Colonnes FK vers le modèle importé lui-même (ex: responsable_direct) ou reportées"""
+        Model = self.spec.Model
+        deferred_columns = []
+        for column in columns:
+            if column in self.spec.exclude:
+                continue
+            try:
+                field = Model._meta.get_field(column)
+            except FieldDoesNotExist:
+                continue
+            if field.many_to_one and (field.related_model is Model or field.name in self.deferred_fields):
+                deferred_columns.append(column)
+        return deferred_columns
+
+    def import_batch(self, batch):
+        from .import_converters import convert_dataframe
+
+        df = self._frame(batch)
+        converted = convert_dataframe(
+            self.spec.Model, df.drop(columns=self._deferred_columns), row_numbers=batch.row_numbers,
+            resolver=self.resolver, ignored=self.spec.exclude,
+        )
+        self._commit(batch, df, converted)
+
+    def _frame(self, batch):
+        df = batch.to_dataframe()
+        df.columns = [normalize_column(col) for col in df.columns]
+        self.result.total += len(batch)
+
+        # Les auto-références peuvent viser une ligne plus loin dans le
+        # fichier : mises de côté, résolues une fois tout le fichier écrit
+        if self._deferred_columns is None:
+            self._deferred_columns = self._deferred_reference_columns(df.columns)
+        return df
+
+    def _commit(self, batch, df, converted):
+        if converted.ignored_columns and not self.result.warnings:
+            self.result.warnings.append({
+                'row': 1,
+                'warning': f"Colonnes ignorées: {', '.join(converted.ignored_columns)}",
+            })
+
+        valid = []
+        for row_num, data, errors in converted.rows():
+            if errors:
+                self.result.add_error(row_num, '; '.join(errors))
+            elif not data:
+                self.result.warnings.append({'row': row_num, 'warning': 'Ligne vide'})
+            else:
+                valid.append((row_num, data))
+        written = self.writer.write(valid)
+
+        if self._deferred_columns and written:
+            references = df[self._deferred_columns].itertuples(index=False, name=None)
+            for row_num, values in zip(batch.row_numbers, references):
+                if row_num in written:
+                    self._pending_links.append((row_num, written[row_num], values))
+
+    def _run_parallel(self, reader):
+        """
+        Conversion des lots dans un pool de processus pendant que ce
+        processus lit le fichier et écrit. Seules les FK (requêtes, cache
+        qui suit les écritures) sont résolues ici. Les lots sont écrits
+        dans l'ordre du fichier, chacun dans son savepoint : compteurs,
+        erreurs et avertissements identiques au mode séquentiel.
+
+        Le premier lot est traité sur place : un petit fichier ne démarre
+        aucun processus.
+        """
+        batches = reader.batches()
+        first = next(batches, None)
+        if first is None:
+            return
+        self.import_batch(first)
+
+        label = self.spec.Model._meta.label
+        # spawn : processus neufs, sans les connexions à la base de celui-ci
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(self.workers, mp_context=context, initializer=init_worker) as pool:
+            pending = deque()
+            for batch in batches:
+                df = self._frame(batch)
+                future = pool.submit(
+                    convert_chunk, label, df.drop(columns=self._deferred_columns), batch.row_numbers,
+                    self.spec.exclude,
+                )
+                pending.append((batch, df, future))
+                if len(pending) >= self.workers * WORKER_PREFETCH:
+                    self._commit_converted(*pending.popleft())
+            while pending:
+                self._commit_converted(*pending.popleft())
+
+    def _commit_converted(self, batch, df, future):
+        converted = future.result()
+        converted.resolve_foreign_keys(df, self.resolver)
+        self._commit(batch, df, converted)
+
+    def link_deferred_references(self):
+        """
+        Seconde passe : résout les références mises de côté (tout le
+        fichier est en base, ou connu du resolver en dry_run) et les écrit
+        par pk. Une référence introuvable laisse la ligne importée, sans
+        lien, avec un avertissement.
+        """
+        import pandas as pd
+
+        from .import_converters import convert_dataframe
+
+        pending, self._pending_links = self._pending_links, []
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            frame = pd.DataFrame.from_records([values for _, _, values in chunk], columns=self._deferred_columns)
+            converted = convert_dataframe(
+                self.spec.Model, frame, row_numbers=[row_num for row_num, _, _ in chunk], resolver=self.resolver,
+            )
+            pks = {row_num: pk for row_num, pk, _ in chunk}
+
+            links = []
+            for row_num, data, errors in converted.rows():
+                if errors:
+                    self.result.warnings.append({'row': row_num, 'warning': '; '.join(errors)})
+                elif data and not (self.dry_run and _is_placeholder(pks[row_num])):
+                    links.append((row_num, {self.writer.pk_attname: pks[row_num], **data}))
+            # En dry_run, le writer n'écrit rien mais complète le diff des lignes existantes
+            self.writer.write(links, record=False)
+
+
+# ============================================================================
+# CLASSEUR MULTI-FEUILLES
+# ============================================================================
+
+def load_order(specs):
+    """
+    Ordre de chargement selon le graphe des FK : parents d'abord.
+    `specs` est donné dans l'ordre du registre ; une FK nullable vers un
+    modèle plus loin dans cet ordre (Service.responsable -> Salarie) ne
+    contraint pas l'ordre et, si son parent est chargé après, est reportée
+    à la seconde passe. Les auto-références sont toujours reportées.
+    Retourne (specs ordonnées, {clé: [champs reportés]}) ; un cycle de
+    FK obligatoires lève ValueError.
+    """
+    rank = {spec.Model: i for i, spec in enumerate(specs)}
+    by_model = {spec.Model: spec for spec in specs}
+
+    def parents(spec, soft):
+        for field in spec.Model._meta.concrete_fields:
+            parent = by_model.get(field.related_model) if field.many_to_one else None
+            if parent is None or parent is spec:
+                continue
+            is_soft = field.null and rank[parent.Model] > rank[spec.Model]
+            if is_soft == soft:
+                yield field, parent
+
+    ordered, done, visiting = [], set(), set()
+
+    def visit(spec):
+        if spec.Model in done:
+            return
+        if spec.Model in visiting:
+            raise ValueError(f"Dépendance circulaire entre feuilles: {spec.model_name}")
+        visiting.add(spec.Model)
+        for _, parent in parents(spec, soft=False):
+            visit(parent)
+        visiting.discard(spec.Model)
+        done.add(spec.Model)
+        ordered.append(spec)
+
+    for spec in specs:
+        visit(spec)
+
+    position = {spec.Model: i for i, spec in enumerate(ordered)}
+    deferred = {}
+    for spec in ordered:
+        late = [field.name for field, parent in parents(spec, soft=True)
+                if position[parent.Model] > position[spec.Model]]
+        if late:
+            deferred[spec.key] = late
+    return ordered, deferred
+
+
+class WorkbookImport:
+    """
+    Importe un classeur XLSX dont chaque feuille porte le nom d'un modèle
+    du registre (clé, nom de modèle ou libellé) : feuilles chargées dans
+    l'ordre du graphe des FK, en une transaction, avec un resolver
+    commun qui reporte en mémoire les pk créés vers les feuilles suivantes.
+
+        results = WorkbookImport(upload).run()   # {clé: ImportResult}
+    """
+
+    def __init__(self, file, dry_run=False, batch_size=BATCH_SIZE):
+        self.file = file
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+        self.resolver = _resolver()
+        self.warnings = []
+        self.sheets = self._match_sheets()
+
+    def _match_sheets(self):
+        """[(nom de feuille, spec)] dans l'ordre de chargement"""
+        by_label = {normalize_column(spec.name): spec for spec in IMPORT_REGISTRY.importable()}
+        matched = {}
+        for sheet in sheet_names(self.file):
+            try:
+                spec = by_label.get(normalize_column(sheet)) or IMPORT_REGISTRY.get(normalize_column(sheet))
+            except LookupError:
+                spec = None
+            if spec is None or not spec.importable:
+                self.warnings.append(f"Feuille '{sheet}' ignorée: aucun modèle importable correspondant")
+                continue
+            if spec.Model in matched:
+                self.warnings.append(f"Feuille '{sheet}' ignorée: {spec.name} déjà importé par une autre feuille")
+                continue
+            matched[spec.Model] = (sheet, spec)
+
+        registry_order = [spec for spec in IMPORT_REGISTRY.importable() if spec.Model in matched]
+        ordered, self.deferred_fields = load_order(registry_order)
+        return [(matched[spec.Model][0], spec) for spec in ordered]
+
+    def run(self):
+        engines = []
+        with transaction.atomic(), deferred_provisioning():
+            for sheet, spec in self.sheets:
+                engine = ImportEngine(
+                    spec, dry_run=self.dry_run, batch_size=self.batch_size, resolver=self.resolver,
+                    deferred_fields=self.deferred_fields.get(spec.key, ()),
+                )
+                reader = TabularReader(self.file, filename='classeur.xlsx', sheet=sheet, batch_size=self.batch_size)
+                engine.run(reader, link=False)
+                engines.append(engine)
+                logger.info(f"Classeur: feuille '{sheet}' ({spec.key}) {engine.result.total} lignes")
+
+            # Seconde passe, toutes les feuilles écrites : auto-références et FK reportées
+            for engine in engines:
+                engine.link_deferred_references()
+        return {engine.spec.key: engine.result for engine in engines}
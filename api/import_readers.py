@@ -0,0 +1,290 @@
+# api/import_readers.py - LECTURE EN FLUX DES FICHIERS D'IMPORT (XLSX / CSV)
+#
+# openpyxl et pandas sont importés à l'usage : lire un CSV ne les charge pas.
+
+import codecs
+import csv
+import hashlib
+import io
+import json
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+BATCH_SIZE = 2000
+
+# Échantillon lu pour détecter BOM et séparateur CSV ; taille des blocs lus sinon
+SNIFF_SIZE = 64 * 1024
+CSV_DELIMITERS = ',;\t|'
+# Essayés dans l'ordre si pas de BOM (cp1252 = exports Excel Windows)
+CSV_ENCODINGS = ('utf-8', 'cp1252')
+
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm')
+CSV_EXTENSIONS = ('.csv', '.txt')
+JSON_EXTENSIONS = ('.json',)
+
+
+def detect_format(filename):
+    """'xlsx', 'csv' ou 'json' selon l'extension, ValueError sinon"""
+    name = (filename or '').lower()
+    if name.endswith(EXCEL_EXTENSIONS):
+        return 'xlsx'
+    if name.endswith(CSV_EXTENSIONS):
+        return 'csv'
+    if name.endswith(JSON_EXTENSIONS):
+        return 'json'
+    raise ValueError('Format non supporté. Utilisez CSV, XLSX ou JSON.')
+
+
+def _binary_stream(file):
+    """
+    Flux binaire sous-jacent d'un upload Django : fichier temporaire sur
+    disque au-delà de FILE_UPLOAD_MAX_MEMORY_SIZE, BytesIO en deçà.
+    """
+    stream = getattr(file, 'file', file)
+    stream.seek(0)
+    return stream
+
+
+def file_fingerprint(file):
+    """Empreinte SHA-256 du contenu de l'upload, lu par blocs"""
+    stream = _binary_stream(file)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(SNIFF_SIZE), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def sheet_names(file):
+    """Noms des feuilles d'un classeur XLSX, dans l'ordre du fichier"""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(_binary_stream(file), read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def _is_empty(row):
+    return all(value is None or (isinstance(value, str) and not value.strip()) for value in row)
+
+
+# ============================================================================
+# LOTS DE LIGNES
+# ============================================================================
+
+class RowBatch:
+    """Lot de lignes : numéros de ligne dans le fichier + tuples de valeurs alignés sur headers"""
+
+    def __init__(self, headers, row_numbers, rows):
+        self.headers = headers
+        self.row_numbers = row_numbers
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def to_dicts(self):
+        """[(numéro_ligne, {en-tête: valeur})]"""
+        return [(num, dict(zip(self.headers, row))) for num, row in zip(self.row_numbers, self.rows)]
+
+    def to_dataframe(self):
+        import pandas as pd
+
+        return pd.DataFrame.from_records(self.rows, columns=self.headers)
+
+
+# ============================================================================
+# LECTEUR
+# ============================================================================
+
+class TabularReader:
+    """
+    Lit un fichier XLSX (openpyxl read_only, values_only) ou CSV (lecture
+    incrémentale, encodage/BOM/séparateur détectés) et produit des lots
+    de taille fixe : la mémoire reste bornée quelle que soit la taille.
+
+        reader = TabularReader(request.FILES['file'])
+        for batch in reader.batches():
+            ...
+    """
+
+    def __init__(self, file, filename=None, sheet=None, batch_size=BATCH_SIZE):
+        self.file = file
+        self.format = detect_format(filename or getattr(file, 'name', ''))
+        self.sheet = sheet
+        self.batch_size = batch_size
+        self.headers = None
+
+    # ---------------------------------------------------------------- XLSX
+
+    def _xlsx_rows(self):
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(_binary_stream(self.file), read_only=True, data_only=True)
+        try:
+            worksheet = workbook[self.sheet] if self.sheet else workbook.active
+            yield from worksheet.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+    # ----------------------------------------------------------------- CSV
+
+    def _sniff(self, stream):
+        sample = stream.read(SNIFF_SIZE)
+        stream.seek(0)
+
+        encoding = None
+        for bom, bom_encoding in BOMS:
+            if sample.startswith(bom):
+                encoding = bom_encoding
+                break
+        if encoding is None:
+            encoding = self._detect_encoding(stream)
+
+        # Séparateur = le plus fréquent sur la ligne d'en-tête (';' pour Excel FR)
+        text = codecs.getincrementaldecoder(encoding)(errors='replace').decode(sample, final=False)
+        header = text.lstrip('\ufeff').split('\n', 1)[0]
+        delimiter = max(CSV_DELIMITERS, key=header.count)
+        if not header.count(delimiter):
+            delimiter = ','
+        return encoding, delimiter
+
+    @staticmethod
+    def _detect_encoding(stream):
+        """
+        Premier de CSV_ENCODINGS qui décode tout le fichier (par blocs : un
+        caractère accentué au-delà de l'échantillon compte aussi). Vérifié
+        avant la première ligne : aucun lot n'est produit avec le mauvais.
+        """
+        for candidate in CSV_ENCODINGS:
+            decoder = codecs.getincrementaldecoder(candidate)()
+            try:
+                for chunk in iter(lambda: stream.read(SNIFF_SIZE), b''):
+                    decoder.decode(chunk)
+                decoder.decode(b'', final=True)
+                return candidate
+            except UnicodeDecodeError:
+                continue
+            finally:
+                stream.seek(0)
+        raise ValueError(f"Encodage du fichier non reconnu ({', '.join(CSV_ENCODINGS)} attendus)")
+
+    def _csv_rows(self):
+        stream = _binary_stream(self.file)
+        encoding, delimiter = self._sniff(stream)
+        text = io.TextIOWrapper(stream, encoding=encoding, newline='')
+        try:
+            yield from csv.reader(text, delimiter=delimiter)
+        except UnicodeDecodeError as exc:
+            # Fichier avec BOM mais contenu dans un autre encodage
+            raise ValueError(f"Fichier illisible en {encoding} : enregistrer le CSV en UTF-8") from exc
+        finally:
+            # Ne pas fermer l'upload avec le wrapper
+            text.detach()
+
+    # ------------------------------------------------------------- COMMUN
+
+    def _rows(self):
+        return self._xlsx_rows() if self.format == 'xlsx' else self._csv_rows()
+
+    def batches(self):
+        """
+        Itère des RowBatch d'au plus batch_size lignes non vides. Les
+        en-têtes (ligne 1) sont disponibles dans self.headers ; les
+        colonnes sans en-tête sont ignorées.
+        """
+        rows = self._rows()
+        try:
+            header_row = next(rows)
+        except StopIteration:
+            self.headers = []
+            return
+
+        positions = [i for i, h in enumerate(header_row) if h is not None and str(h).strip()]
+        self.headers = [str(header_row[i]).strip() for i in positions]
+        width = len(header_row)
+
+        row_numbers, batch = [], []
+        for row_num, row in enumerate(rows, start=2):
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+            values = tuple(row[i] for i in positions)
+            if _is_empty(values):
+                continue
+            row_numbers.append(row_num)
+            batch.append(values)
+            if len(batch) >= self.batch_size:
+                yield RowBatch(self.headers, row_numbers, batch)
+                row_numbers, batch = [], []
+        if batch:
+            yield RowBatch(self.headers, row_numbers, batch)
+
+    def iter_dicts(self):
+        """Itère (numéro_ligne, {en-tête: valeur}) ligne par ligne"""
+        for batch in self.batches():
+            yield from batch.to_dicts()
+
+
+class JsonReader(TabularReader):
+    """
+    Fichier JSON : liste d'objets {colonne: valeur} (ou {"rows": [...]}).
+    Même interface par lots que TabularReader ; en-têtes = union des clés
+    dans l'ordre d'apparition.
+    """
+
+    def _rows(self):
+        data = json.loads(_binary_stream(self.file).read().decode('utf-8-sig'))
+        if isinstance(data, dict):
+            data = data.get('rows', [])
+        if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+            raise ValueError('JSON attendu: une liste d\'objets {colonne: valeur}')
+
+        headers = list(dict.fromkeys(key for item in data for key in item))
+        yield tuple(headers)
+        for item in data:
+            yield tuple(item.get(header) for header in headers)
+
+
+class DefaultColumns:
+    """
+    Ajoute aux lots d'un lecteur les colonnes absentes du fichier, avec
+    une valeur constante (ex: societe des données de référence).
+    """
+
+    def __init__(self, reader, defaults):
+        self.reader = reader
+        self.defaults = defaults
+
+    def batches(self):
+        for batch in self.reader.batches():
+            missing = {k: v for k, v in self.defaults.items() if k not in batch.headers}
+            if not missing:
+                yield batch
+                continue
+            extra = tuple(missing.values())
+            yield RowBatch(batch.headers + list(missing), batch.row_numbers, [row + extra for row in batch.rows])
+
+
+# Lecteurs par format (extension) - point d'extension des imports
+READERS = {
+    'xlsx': TabularReader,
+    'csv': TabularReader,
+    'json': JsonReader,
+}
+
+
+def open_reader(file, filename=None, **kwargs):
+    """Lecteur adapté au fichier uploadé (voir READERS)"""
+    file_format = detect_format(filename or getattr(file, 'name', ''))
+    return READERS[file_format](file, filename=filename, **kwargs)
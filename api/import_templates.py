@@ -0,0 +1,190 @@
+# api/import_templates.py - TEMPLATES EXCEL D'IMPORT
+#
+# Listes déroulantes écrites une fois dans une feuille masquée et
+# référencées par plage ; une validation par colonne entière. Le fichier
+# généré est mis en cache par modèle + versions des tables référencées.
+
+from io import BytesIO
+import logging
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.utils import get_column_letter, quote_sheetname
+from openpyxl.worksheet.datavalidation import DataValidation
+
+from .caching import TEMPLATES, get_or_build
+from .import_converters import ForeignKeyResolver
+from .table_versions import versions_signature
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+TEMPLATE_CACHE_KEY = 'import_template:{key}:{versions}'
+# Filet de sécurité pour les écritures qui ne passent ni par les signals ni par le moteur
+TEMPLATE_TIMEOUT = 60 * 60
+
+DATA_SHEET = "Données"
+LISTS_SHEET = "Listes"
+INSTRUCTIONS_SHEET = "Instructions"
+
+EXAMPLE_ROWS = 10
+MAX_ROW = 1048576   # dernière ligne Excel : validation sur la colonne entière
+INSTRUCTIONS_PREVIEW = 5
+
+HEADER_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
+THIN = Side(style='thin')
+BORDER = Border(left=THIN, right=THIN, top=THIN, bottom=THIN)
+
+
+# ============================================================================
+# CONSTRUCTION
+# ============================================================================
+
+class TemplateBuilder:
+    """
+    Template Excel d'un modèle du registre d'import (voir api/import_engine.py) :
+    feuille de données, feuille masquée des listes (valeurs FK par le champ
+    de recherche de l'import, choix), feuille d'instructions.
+    """
+
+    def __init__(self, spec, fields, resolver=None):
+        self.spec = spec
+        self.Model = spec.Model
+        self.fields = fields
+        self.resolver = resolver or ForeignKeyResolver()
+
+    def related_models(self):
+        """Modèles dont le contenu apparaît dans le template (clé du cache)"""
+        return {
+            field.related_model for field in map(self.Model._meta.get_field, self.fields)
+            if field.many_to_one
+        }
+
+    def _lists(self):
+        """{champ: [valeurs]} pour les FK (une requête par FK) et les champs à choix"""
+        lists = {}
+        for field_name in self.fields:
+            field = self.Model._meta.get_field(field_name)
+            if field.many_to_one:
+                lookup = self.resolver.lookup_field(field.related_model)
+                if lookup:
+                    lists[field_name] = [
+                        str(value) for value in
+                        field.related_model.objects.order_by(lookup).values_list(lookup, flat=True).distinct()
+                        if value not in (None, '')
+                    ]
+            elif field.choices:
+                lists[field_name] = [str(key) for key, _ in field.flatchoices]
+        return lists
+
+    def build(self) -> bytes:
+        wb = Workbook()
+        ws = wb.active
+        ws.title = DATA_SHEET
+        lists = self._lists()
+
+        # En-têtes
+        for col_num, field_name in enumerate(self.fields, 1):
+            cell = ws.cell(row=1, column=col_num, value=field_name)
+            cell.fill = HEADER_FILL
+            cell.font = HEADER_FONT
+            cell.border = BORDER
+            cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+            ws.column_dimensions[get_column_letter(col_num)].width = max(15, len(field_name) + 5)
+
+        # Lignes d'exemple vides
+        for row in range(2, EXAMPLE_ROWS + 2):
+            for col_num in range(1, len(self.fields) + 1):
+                ws.cell(row=row, column=col_num).border = BORDER
+        ws.freeze_panes = "A2"
+
+        # Listes dans une feuille masquée, une colonne par champ
+        lists_ws = wb.create_sheet(LISTS_SHEET)
+        lists_ws.sheet_state = 'hidden'
+        list_col = 0
+        for col_num, field_name in enumerate(self.fields, 1):
+            values = lists.get(field_name)
+            if not values:
+                continue
+            list_col += 1
+            list_letter = get_column_letter(list_col)
+            lists_ws.cell(row=1, column=list_col, value=field_name)
+            for row, value in enumerate(values, 2):
+                lists_ws.cell(row=row, column=list_col, value=value)
+
+            source = f"{quote_sheetname(LISTS_SHEET)}!${list_letter}$2:${list_letter}${len(values) + 1}"
+            dv = DataValidation(type='list', formula1=source, allow_blank=True)
+            dv.error = f'Sélectionnez une valeur valide pour {field_name}'
+            dv.errorTitle = f'Valeur invalide: {field_name}'
+            col_letter = get_column_letter(col_num)
+            dv.add(f'{col_letter}2:{col_letter}{MAX_ROW}')
+            ws.add_data_validation(dv)
+
+        self._instructions(wb, lists)
+
+        output = BytesIO()
+        wb.save(output)
+        return output.getvalue()
+
+    def _instructions(self, wb, lists):
+        sheet = wb.create_sheet(INSTRUCTIONS_SHEET)
+        sheet['A1'] = "INSTRUCTIONS D'IMPORT"
+        sheet['A1'].font = Font(bold=True, size=14, color="FFFFFF")
+        sheet['A1'].fill = HEADER_FILL
+
+        row = 3
+        sheet[f'A{row}'] = "Colonnes obligatoires:"
+        sheet[f'A{row}'].font = Font(bold=True, size=11)
+        row += 1
+        for field_name in self.fields:
+            field = self.Model._meta.get_field(field_name)
+            is_required = not field.null and not field.blank
+            is_unique = field_name in self.spec.unique_fields
+            if is_required or is_unique:
+                marker = "⚠️ " if is_required else "🔑 "
+                sheet[f'A{row}'] = f"{marker} {field_name}"
+                if is_unique:
+                    sheet[f'B{row}'] = "(Clé unique)"
+                row += 1
+
+        row += 2
+        sheet[f'A{row}'] = "Champs avec sélection (dropdown):"
+        sheet[f'A{row}'].font = Font(bold=True, size=11)
+        row += 1
+        for field_name in self.fields:
+            values = lists.get(field_name)
+            if values is None:
+                continue
+            preview = ", ".join(values[:INSTRUCTIONS_PREVIEW])
+            if len(values) > INSTRUCTIONS_PREVIEW:
+                preview += f"... (+{len(values) - INSTRUCTIONS_PREVIEW} autres)"
+            sheet[f'A{row}'] = f"• {field_name}"
+            sheet[f'B{row}'] = preview
+            row += 1
+
+        sheet.column_dimensions['A'].width = 30
+        sheet.column_dimensions['B'].width = 80
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+def get_template(spec, fields):
+    """
+    Template du modèle, servi depuis le cache tant qu'aucune table
+    référencée n'a changé (versions incrémentées par les écritures).
+    """
+    builder = TemplateBuilder(spec, fields)
+    key = TEMPLATE_CACHE_KEY.format(key=spec.key, versions=versions_signature(builder.related_models()))
+
+    def build():
+        content = builder.build()
+        logger.info(f"Template d'import {spec.key} généré ({len(content)} octets)")
+        return content
+
+    return get_or_build(key, build, TEMPLATE_TIMEOUT, alias=TEMPLATES)
@@ -5,15 +5,57 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.utils.urls import replace_query_param
+from django.core.cache import cache
 from django.http import HttpResponse
+from django.urls import reverse
+from django.utils import timezone
 import logging
+import uuid
 
+from .import_engine import WorkbookImport
+from .import_readers import EXCEL_EXTENSIONS, file_fingerprint
 from .import_utils import GenericImporter, get_importable_models
-from .models import ImportLog
-from .serializers import ImportLogSerializer
+from .models import ImportLog, ImportLogErreur
+from .serializers import ImportLogSerializer, ImportLogListSerializer
 
 logger = logging.getLogger(__name__)
 
+# Aperçus d'import (dry_run) conservés le temps de les parcourir
+PREVIEW_CACHE_KEY = 'import_preview:{}'
+PREVIEW_TIMEOUT = 30 * 60
+
+
+def _errors_summary(request, errors, log_id):
+    """
+    Erreurs d'un import pour la réponse, bornée quel que soit le fichier :
+    nombre, aperçu des premières erreurs, premières classes (même message,
+    plages de lignes) et lien vers la liste complète paginée.
+    """
+    classes = ImportLogErreur.grouper(errors)
+    return {
+        'errors': errors[:ImportLogErreur.APERCU],
+        'error_count': len(errors),
+        'error_classes': classes[:ImportLogErreur.APERCU],
+        'error_class_count': len(classes),
+        'errors_url': request.build_absolute_uri(
+            reverse('import-logs-errors', args=[log_id])
+        ) if errors and log_id else None,
+    }
+
+
+def _date_import(import_log):
+    """Date d'un import dans le fuseau local (stockée en UTC)"""
+    return f"{timezone.localtime(import_log.date_creation):%d/%m/%Y %H:%M}"
+
+
+class PreviewPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
 class ImportViewSet(viewsets.ViewSet):
     """ViewSet pour gérer l'importation générique de modèles via API moderne"""
     permission_classes = [IsAuthenticated]
@@ -128,21 +170,56 @@ class ImportViewSet(viewsets.ViewSet):
             # Créer l'importeur
             importer = GenericImporter(model_name)
             
+            # Fichier identique déjà importé avec succès : rien à rejouer (sauf force=true).
+            # Seul le dernier import réussi court-circuite : un fichier importé
+            # partiellement (ou en erreur) est réappliqué ; ses lignes déjà
+            # importées ressortent inchangées (aucune écriture), les lignes en
+            # erreur sont retentées (ex: après création des FK manquantes).
+            empreinte = file_fingerprint(file)
+            force = str(request.data.get('force', 'false')).lower() == 'true'
+            dernier_import = ImportLog.objects.filter(
+                api_name=model_name, empreinte_fichier=empreinte
+            ).order_by('-date_creation').first()
+            if dernier_import and dernier_import.statut == 'succes' and not force:
+                return Response({
+                    'success': True,
+                    'model': model_name,
+                    'inserted': 0,
+                    'updated': 0,
+                    'unchanged': dernier_import.total_lignes,
+                    'errors': [],
+                    'error_count': 0,
+                    'warnings': [{
+                        'row': 0,
+                        'warning': f"Fichier identique déjà importé le {_date_import(dernier_import)} (envoyer force=true pour le rejouer)"
+                    }],
+                    'log_id': dernier_import.id,
+                    'deja_importe': True
+                }, status=status.HTTP_200_OK)
+            
             # Importer les données
             results = importer.import_from_excel(file)
+            if dernier_import and dernier_import.statut != 'succes':
+                results['warnings'].append({
+                    'row': 0,
+                    'warning': f"Fichier déjà importé partiellement le {_date_import(dernier_import)} : "
+                               f"lignes déjà importées inchangées, lignes en erreur retentées"
+                })
             
             # Enregistrer le log d'import
-            total = results['inserted'] + results['updated']
+            total = results['inserted'] + results['updated'] + results.get('unchanged', 0)
             status_log = 'succes' if not results['errors'] else ('partiel' if total > 0 else 'erreur')
             
-            import_log = ImportLog.objects.create(
+            import_log = ImportLog.creer(
+                results['errors'],
                 api_name=model_name,
                 fichier_nom=file.name,
+                empreinte_fichier=empreinte,
                 total_lignes=total + len(results['errors']),
-                lignes_succes=results['inserted'] + results['updated'],
+                lignes_succes=total,
+                lignes_inchangees=results.get('unchanged', 0),
                 lignes_erreur=len(results['errors']),
                 statut=status_log,
-                details_erreurs=results['errors'],
                 cree_par=request.user
             )
             
@@ -153,7 +230,8 @@ class ImportViewSet(viewsets.ViewSet):
                 'model': model_name,
                 'inserted': results['inserted'],
                 'updated': results['updated'],
-                'errors': results['errors'],
+                'unchanged': results.get('unchanged', 0),
+                **_errors_summary(request, results['errors'], import_log.id),
                 'warnings': results['warnings'],
                 'log_id': import_log.id
             }, status=status.HTTP_200_OK)
@@ -169,6 +247,190 @@ class ImportViewSet(viewsets.ViewSet):
                 'error': f"Erreur serveur: {str(e)}"
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['get', 'post'])
+    def preview(self, request):
+        """
+        POST /api/import/preview/
+        Simule l'import d'un fichier (rien n'est écrit) et retourne le diff :
+        lignes nouvelles / modifiées (colonne: [avant, après]) / inchangées,
+        colonnes les plus modifiées, classes d'erreurs et première page
+
+        Body: FormData avec:
+        - model: nom du modèle (ex: 'salarie', 'departement')
+        - file: fichier Excel (ou CSV / JSON)
+
+        GET /api/import/preview/?token=<token>&page=2&page_size=100&status=updated
+        Pages suivantes d'un aperçu (conservé PREVIEW_TIMEOUT secondes)
+        """
+        if request.method == 'GET':
+            token = request.query_params.get('token')
+            preview = cache.get(PREVIEW_CACHE_KEY.format(token)) if token else None
+            if preview is None:
+                return Response({
+                    'success': False,
+                    'error': 'Aperçu introuvable ou expiré, renvoyer le fichier'
+                }, status=status.HTTP_404_NOT_FOUND)
+            return self._preview_page(request, token, preview)
+
+        try:
+            model_name = request.data.get('model')
+            file = request.FILES.get('file')
+            if not model_name or not file:
+                return Response({
+                    'success': False,
+                    'error': 'Paramètres "model" et "file" requis'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            result = GenericImporter(model_name).preview(file)
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Erreur aperçu: {str(e)}")
+            return Response({
+                'success': False,
+                'error': f"Erreur serveur: {str(e)}"
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        token = uuid.uuid4().hex
+        preview = {
+            'model': model_name,
+            'fichier_nom': file.name,
+            'total_rows': result.total,
+            'stats': result.diff.stats(),
+            'errors': len(result.errors),
+            'error_classes': ImportLogErreur.grouper(result.errors),
+            'warnings': result.warnings,
+            'rows': result.diff.as_list(),
+        }
+        cache.set(PREVIEW_CACHE_KEY.format(token), preview, PREVIEW_TIMEOUT)
+        return self._preview_page(request, token, preview)
+
+    def _preview_page(self, request, token, preview):
+        """Résumé de l'aperçu + une page de lignes (filtrables par statut)"""
+        rows = preview['rows']
+        row_status = request.query_params.get('status')
+        if row_status:
+            rows = [row for row in rows if row['status'] == row_status]
+        paginator = PreviewPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
+
+        def with_token(link):
+            # Les pages suivantes se lisent en GET sur le même aperçu
+            return replace_query_param(link, 'token', token) if link else None
+
+        return Response({
+            'success': True,
+            'token': token,
+            'expires_in': PREVIEW_TIMEOUT,
+            **{key: value for key, value in preview.items() if key != 'rows'},
+            'count': paginator.page.paginator.count,
+            'next': with_token(paginator.get_next_link()),
+            'previous': with_token(paginator.get_previous_link()),
+            'results': page,
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def workbook(self, request):
+        """
+        POST /api/import/workbook/
+        Importe un classeur complet (une feuille par modèle : societe,
+        departement, ..., salarie) en une seule transaction, dans l'ordre
+        des dépendances FK
+
+        Body: FormData avec:
+        - file: classeur Excel (.xlsx)
+        - dry_run: 'true' pour simuler sans écrire (optionnel)
+        """
+        file = request.FILES.get('file')
+        if not file:
+            return Response({
+                'success': False,
+                'error': 'Paramètre "file" requis'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if not file.name.lower().endswith(EXCEL_EXTENSIONS):
+            return Response({
+                'success': False,
+                'error': 'Un classeur Excel (.xlsx) est requis'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get('dry_run', 'false')).lower() == 'true'
+        force = str(request.data.get('force', 'false')).lower() == 'true'
+
+        try:
+            workbook = WorkbookImport(file, dry_run=dry_run)
+            if not workbook.sheets:
+                return Response({
+                    'success': False,
+                    'error': 'Aucune feuille ne correspond à un modèle importable',
+                    'warnings': workbook.warnings
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            # Classeur identique déjà importé avec succès (toutes ses feuilles) : rien à rejouer ;
+            # une feuille partielle ou en erreur fait réappliquer le classeur (voir upload)
+            empreinte = file_fingerprint(file)
+            keys = {spec.key for _, spec in workbook.sheets}
+            deja_importes = set(ImportLog.objects.filter(
+                api_name__in=keys, empreinte_fichier=empreinte, statut='succes'
+            ).values_list('api_name', flat=True))
+            if deja_importes == keys and not force:
+                return Response({
+                    'success': True,
+                    'dry_run': dry_run,
+                    'deja_importe': True,
+                    'sheets': [],
+                    'warnings': workbook.warnings + [
+                        'Classeur identique déjà importé (envoyer force=true pour le rejouer)'
+                    ]
+                }, status=status.HTTP_200_OK)
+
+            results = workbook.run()
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Erreur import classeur: {str(e)}")
+            return Response({
+                'success': False,
+                'error': f"Erreur serveur: {str(e)}"
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        # Un log d'import par feuille (hors simulation)
+        sheets = []
+        for sheet, spec in workbook.sheets:
+            result = results[spec.key]
+            succes = result.inserted + result.updated + result.unchanged
+            log_id = None
+            if not dry_run:
+                log_id = ImportLog.creer(
+                    result.errors,
+                    api_name=spec.key,
+                    fichier_nom=f"{file.name} [{sheet}]",
+                    empreinte_fichier=empreinte,
+                    total_lignes=result.total,
+                    lignes_succes=succes,
+                    lignes_inchangees=result.unchanged,
+                    lignes_erreur=len(result.errors),
+                    statut='succes' if not result.errors else ('partiel' if succes else 'erreur'),
+                    cree_par=request.user
+                ).id
+            sheets.append({
+                'sheet': sheet, 'model': spec.key, **result.as_dict(),
+                **_errors_summary(request, result.errors, log_id), 'log_id': log_id,
+            })
+
+        logger.info(f"Import classeur {file.name}: {', '.join(s['model'] for s in sheets)}")
+
+        return Response({
+            'success': not any(s['errors'] for s in sheets),
+            'dry_run': dry_run,
+            'sheets': sheets,
+            'warnings': workbook.warnings
+        }, status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['get'])
     def history(self, request):
         """
@@ -176,8 +438,8 @@ class ImportViewSet(viewsets.ViewSet):
         Récupère l'historique des 50 derniers imports
         """
         try:
-            logs = ImportLog.objects.all().order_by('-date_creation')[:50]
-            serializer = ImportLogSerializer(logs, many=True)
+            logs = ImportLog.objects.select_related('cree_par').defer('details_erreurs').order_by('-date_creation')[:50]
+            serializer = ImportLogListSerializer(logs, many=True)
             return Response({
                 'success': True,
                 'count': len(logs),
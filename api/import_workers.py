@@ -0,0 +1,23 @@
+# api/import_workers.py - POINTS D'ENTRÉE DES PROCESSUS DE CONVERSION
+#
+# Le pool de l'import parallèle (ImportEngine._run_parallel) démarre en
+# spawn : un processus neuf importe le module de ces fonctions avant
+# django.setup(). Ce module ne charge donc aucun modèle au niveau du module
+# (import_engine, lui, importe provisioning -> django.contrib.auth.models).
+
+
+def init_worker():
+    """Initialisation d'un processus de conversion"""
+    import django
+
+    django.setup()
+
+
+def convert_chunk(model_label, df, row_numbers, exclude):
+    """Conversion d'un lot hors FK (aucune requête)"""
+    from django.apps import apps
+
+    from .import_converters import convert_dataframe
+
+    return convert_dataframe(apps.get_model(model_label), df, row_numbers=row_numbers, ignored=exclude,
+                             defer_fk=True)
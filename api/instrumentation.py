@@ -0,0 +1,120 @@
+# api/instrumentation.py - MESURES PAR REQUÊTE
+#
+# Compteurs de la requête en cours (contextvar : un jeu par thread gthread) :
+# - SQL        : nombre et durée des requêtes (connection.execute_wrapper)
+# - serializer : temps dans to_representation des serializers racine
+#                (SQL paresseux des relations compris)
+# - cache      : succès / échecs de api/caching.get_or_build
+# Remplis entre start() et stop() par PerformanceMiddleware (api/middleware.py),
+# qui les publie en Server-Timing, journalise les requêtes lentes et alimente
+# les percentiles par route (api/route_stats.py). Hors requête : aucun coût.
+
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('sql_count', 'sql_time', 'serializer_time', 'cache_hits', 'cache_misses', 'serializing')
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.serializing = False
+
+
+def start():
+    """Ouvre les compteurs de la requête ; renvoie le jeton à passer à stop()"""
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+# ============================================================================
+# SQL
+# ============================================================================
+
+def _sql_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.sql_count += 1
+        metrics.sql_time += time.perf_counter() - started
+
+
+@contextmanager
+def sql_timing():
+    """Compte les requêtes SQL de toutes les connexions du thread"""
+    from django.db import connections
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(_sql_wrapper))
+        yield
+
+
+# ============================================================================
+# CACHE ET SERIALIZERS
+# ============================================================================
+
+def record_cache(hit):
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+class TimedSerializerMixin:
+    """
+    Serializer dont le temps de to_representation est compté. Les
+    serializers imbriqués sont inclus dans le temps de leur parent.
+    """
+
+    def to_representation(self, instance):
+        metrics = _current.get()
+        if metrics is None or metrics.serializing:
+            return super().to_representation(instance)
+        metrics.serializing = True
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serializer_time += time.perf_counter() - started
+            metrics.serializing = False
+
+
+# ============================================================================
+# JOURNAL STRUCTURÉ
+# ============================================================================
+
+class JSONFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement, champs de `extra={'perf': {...}}` compris"""
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        data.update(getattr(record, 'perf', {}))
+        return json.dumps(data, ensure_ascii=False, default=str)
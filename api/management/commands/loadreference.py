@@ -0,0 +1,106 @@
+import hashlib
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.import_converters import ForeignKeyResolver
+from api.import_engine import IMPORT_REGISTRY, ImportEngine, load_order
+from api.import_readers import DefaultColumns, detect_format, file_fingerprint, open_reader
+from api.models import ImportLog, Societe
+
+# Un fichier par modèle du registre d'import, nommé par sa clé (departement.csv)
+REFERENCE_DIR = Path(__file__).resolve().parents[2] / 'fixtures' / 'reference'
+ERRORS_SHOWN = 10
+
+
+class Command(BaseCommand):
+    help = (
+        "Charge les données de référence (api/fixtures/reference) : upsert en masse via le moteur "
+        "d'import, une transaction par table. Une version de fichier déjà appliquée n'est pas rejouée."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fichiers', nargs='*', help="Fichiers CSV/XLSX/JSON (défaut: tout api/fixtures/reference)")
+        parser.add_argument('--societe', help="Société des lignes sans colonne 'societe' (défaut: la seule société existante, obligatoire sinon)")
+        parser.add_argument('--force', action='store_true', help="Recharger même si la version est déjà appliquée")
+
+    def handle(self, *args, **options):
+        fixtures = self._fixtures(options['fichiers'])
+        societe = options['societe']
+        if not societe and any(self._has_societe(spec) for spec in fixtures):
+            societe = self._default_societe()
+
+        ordered, _ = load_order([spec for spec in IMPORT_REGISTRY.importable() if spec in fixtures])
+        resolver = ForeignKeyResolver()
+        for spec in ordered:
+            for path in fixtures[spec]:
+                self._load(spec, path, societe, resolver, options['force'])
+
+    def _fixtures(self, paths):
+        """{spec: [chemins]} ; le modèle est déduit du nom de fichier (departement.csv, Departement_data.csv)"""
+        paths = [Path(p) for p in paths] or sorted(p for p in REFERENCE_DIR.iterdir() if p.is_file())
+        fixtures = {}
+        for path in paths:
+            if not path.is_file():
+                raise CommandError(f"Fichier introuvable: {path}")
+            detect_format(path.name)
+            try:
+                spec = IMPORT_REGISTRY.get(path.stem.split('_')[0].lower())
+            except LookupError:
+                raise CommandError(f"{path.name}: aucun modèle importable ne correspond au nom du fichier")
+            fixtures.setdefault(spec, []).append(path)
+        return fixtures
+
+    @staticmethod
+    def _has_societe(spec):
+        return any(f.name == 'societe' for f in spec.Model._meta.concrete_fields)
+
+    def _default_societe(self):
+        """La seule société existante ; sinon erreur avant tout chargement (lignes sans société)"""
+        noms = list(Societe.objects.values_list('nom', flat=True)[:2])
+        if len(noms) != 1:
+            raise CommandError(
+                "Aucune société en base : précisez --societe" if not noms
+                else "Plusieurs sociétés en base : précisez --societe"
+            )
+        return noms[0]
+
+    def _load(self, spec, path, societe, resolver, force):
+        defaults = {'societe': societe} if societe and self._has_societe(spec) else {}
+
+        with path.open('rb') as f:
+            # Version = contenu du fichier + colonnes ajoutées
+            version = hashlib.sha256(f"{file_fingerprint(f)}:{sorted(defaults.items())}".encode()).hexdigest()
+            applied = ImportLog.objects.filter(api_name=spec.key, empreinte_fichier=version, statut='succes').first()
+            if applied and not force:
+                self.stdout.write(f"{spec.key}: {path.name} déjà appliqué le {timezone.localtime(applied.date_creation):%d/%m/%Y %H:%M}")
+                return
+
+            start = time.perf_counter()
+            engine = ImportEngine(spec, resolver=resolver)
+            result = engine.run(DefaultColumns(open_reader(f, filename=path.name), defaults))
+            elapsed = time.perf_counter() - start
+
+        succes = result.inserted + result.updated + result.unchanged
+        ImportLog.creer(
+            result.errors,
+            api_name=spec.key,
+            fichier_nom=f"reference:{path.name}",
+            empreinte_fichier=version,
+            total_lignes=result.total,
+            lignes_succes=succes,
+            lignes_inchangees=result.unchanged,
+            lignes_erreur=len(result.errors),
+            statut='succes' if not result.errors else ('partiel' if succes else 'erreur'),
+        )
+
+        summary = (f"{spec.key}: {result.inserted} créés, {result.updated} mis à jour, "
+                   f"{result.unchanged} inchangés ({elapsed * 1000:.0f} ms)")
+        if not result.errors:
+            self.stdout.write(self.style.SUCCESS(summary))
+            return
+        self.stdout.write(self.style.WARNING(f"{summary}, {len(result.errors)} erreurs"))
+        for error in result.errors[:ERRORS_SHOWN]:
+            self.stdout.write(self.style.ERROR(f"  ligne {error['row']}: {error['error']}"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.hierarchy import rebuild_closure
+
+
+class Command(BaseCommand):
+    help = "Reconstruit la table de fermeture de la hiérarchie (responsable_direct)"
+
+    def handle(self, *args, **options):
+        count = rebuild_closure()
+        self.stdout.write(self.style.SUCCESS(f"Hiérarchie reconstruite: {count} liens"))
@@ -0,0 +1,31 @@
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+# Ancien mot de passe commun des comptes provisionnés (publié dans l'historique du dépôt)
+PUBLISHED_PASSWORD = 'TempPassword2026!'
+
+
+class Command(BaseCommand):
+    help = (
+        "Rend inutilisable le mot de passe des comptes qui ont encore l'ancien mot de passe "
+        "temporaire commun ; les salariés concernés passent par une invitation "
+        "(POST /api/salaries/<id>/invitation/). Une vérification PBKDF2 par compte : lent."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Lister les comptes sans les modifier")
+
+    def handle(self, *args, **options):
+        exposes = [
+            user for user in User.objects.filter(is_active=True).only('id', 'username', 'password')
+            if user.has_usable_password() and check_password(PUBLISHED_PASSWORD, user.password)
+        ]
+        for user in exposes:
+            self.stdout.write(f"  {user.username}")
+        if not options['dry_run']:
+            for user in exposes:
+                user.password = make_password(None)
+            User.objects.bulk_update(exposes, ['password'], batch_size=1000)
+        verbe = "à révoquer" if options['dry_run'] else "révoqués"
+        self.stdout.write(self.style.SUCCESS(f"{len(exposes)} mots de passe temporaires {verbe}"))
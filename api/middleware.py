@@ -0,0 +1,183 @@
+# api/middleware.py - COMPRESSION DES RÉPONSES, MESURES PAR REQUÊTE
+#
+# CompressionMiddleware :
+# Brotli si le client l'accepte et que le module est installé, gzip sinon
+# (GZipMiddleware de Django, avec ses octets aléatoires anti-BREACH : seul
+# gzip est utilisé pour le HTML, qui peut contenir un jeton CSRF).
+# Seuls les types textuels au-delà de COMPRESS_MIN_SIZE octets sont
+# compressés : les xlsx / images / PDF le sont déjà.
+#
+# PerformanceMiddleware (api/instrumentation.py, api/route_stats.py) :
+# SQL, serializer, cache et durée totale de chaque requête dans l'en-tête
+# Server-Timing (si SERVER_TIMING), requêtes au-delà de SLOW_REQUEST_MS
+# journalisées dans le logger api.performance, percentiles par route.
+#
+# ProfilerMiddleware (api/profiling.py) : profil cProfile + SQL d'une
+# requête à la demande du staff, si PROFILER_ENABLED.
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from . import instrumentation, profiling, route_stats
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+COMPRESS_MIN_SIZE = getattr(settings, 'COMPRESS_MIN_SIZE', 1024)
+SERVER_TIMING = getattr(settings, 'SERVER_TIMING', True)
+SLOW_REQUEST_MS = getattr(settings, 'SLOW_REQUEST_MS', 1000)
+# Qualité 5 : bon compromis taille / CPU pour du contenu généré à chaque requête
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+)
+
+
+def _accepts(request, coding):
+    """Accept-Encoding contient `coding` avec une qualité non nulle"""
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = item.strip().partition(';')
+        if name.strip().lower() == coding:
+            q = params.replace(' ', '').lower().partition('q=')[2]
+            try:
+                return float(q) > 0 if q else True
+            except ValueError:
+                return True
+    return False
+
+
+class CompressionMiddleware(GZipMiddleware):
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < COMPRESS_MIN_SIZE:
+            return response
+
+        if (brotli is not None and content_type != 'text/html' and not response.streaming
+                and not response.has_header('Content-Encoding') and _accepts(request, 'br')):
+            return self._brotli(response)
+        return super().process_response(request, response)
+
+    def _brotli(self, response):
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        # Même règle que GZipMiddleware : un ETag fort devient faible une fois compressé
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+
+# ============================================================================
+# MESURES PAR REQUÊTE
+# ============================================================================
+
+perf_logger = logging.getLogger('api.performance')
+
+
+def _route(request):
+    """'GET:salarie-list' (nom de la vue, sinon motif d'URL) ; None si non résolue"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    return f"{request.method}:{match.view_name or match.route}"
+
+
+class PerformanceMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics, token = instrumentation.start()
+        started = time.perf_counter()
+        try:
+            with instrumentation.sql_timing():
+                response = self.get_response(request)
+        finally:
+            instrumentation.stop(token)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        if SERVER_TIMING:
+            response['Server-Timing'] = self._server_timing(metrics, total_ms)
+
+        route = _route(request)
+        if route is not None:
+            route_stats.record(route, total_ms, metrics.sql_count, response.status_code >= 500)
+        if total_ms >= SLOW_REQUEST_MS:
+            self._log_slow(request, response, route, metrics, total_ms)
+        return response
+
+    @staticmethod
+    def _server_timing(metrics, total_ms):
+        entries = [
+            f'db;dur={metrics.sql_time * 1000:.1f};desc="SQL x{metrics.sql_count}"',
+            f'ser;dur={metrics.serializer_time * 1000:.1f};desc="Serializer"',
+        ]
+        if metrics.cache_hits or metrics.cache_misses:
+            entries.append(f'cache;desc="hit {metrics.cache_hits} / miss {metrics.cache_misses}"')
+        entries.append(f'total;dur={total_ms:.1f}')
+        return ', '.join(entries)
+
+    @staticmethod
+    def _log_slow(request, response, route, metrics, total_ms):
+        user = getattr(request, 'user', None)
+        perf_logger.warning(
+            "Requête lente %s %s %.0f ms", request.method, request.path, total_ms,
+            extra={'perf': {
+                'method': request.method,
+                'path': request.get_full_path(),
+                'route': route,
+                'status': response.status_code,
+                'user': user.pk if user is not None and user.is_authenticated else None,
+                'duration_ms': round(total_ms, 1),
+                'sql_queries': metrics.sql_count,
+                'sql_ms': round(metrics.sql_time * 1000, 1),
+                'serializer_ms': round(metrics.serializer_time * 1000, 1),
+                'cache_hits': metrics.cache_hits,
+                'cache_misses': metrics.cache_misses,
+            }},
+        )
+
+
+# ============================================================================
+# PROFILAGE À LA DEMANDE
+# ============================================================================
+
+class ProfilerMiddleware:
+    """Profile les requêtes marquées ?_profile=1 / X-Profile: 1 d'un membre du staff"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILER_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiling.requested(request):
+            return self.get_response(request)
+        user = profiling.staff_user(request)
+        if user is None:
+            return self.get_response(request)
+        response, profile_id = profiling.profile_request(self.get_response, request, user)
+        if profile_id is not None:
+            response['X-Profile-Id'] = profile_id
+        return response
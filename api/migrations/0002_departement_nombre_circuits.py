@@ -0,0 +1,19 @@
+# Generated by Django 4.2.11 on 2025-11-25 12:59
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='departement',
+            name='nombre_circuits',
+            field=models.IntegerField(default=1, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 4.2.11 on 2026-10-19 11:50
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+# Trigger PostgreSQL qui maintient search_vector (config fr_unaccent = french + unaccent)
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'fr_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION fr_unaccent (COPY = french);
+            ALTER TEXT SEARCH CONFIGURATION fr_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, french_stem;
+        END IF;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION api_salarie_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('fr_unaccent', coalesce(NEW.nom, '')), 'A') ||
+            setweight(to_tsvector('fr_unaccent', coalesce(NEW.prenom, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.matricule, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.mail_professionnel, '')), 'B') ||
+            setweight(to_tsvector('fr_unaccent', coalesce(NEW.poste, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS api_salarie_search_vector_trigger ON api_salarie",
+    """
+    CREATE TRIGGER api_salarie_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF nom, prenom, matricule, mail_professionnel, poste
+        ON api_salarie FOR EACH ROW EXECUTE FUNCTION api_salarie_search_vector_update()
+    """,
+    "CREATE INDEX IF NOT EXISTS api_salarie_search_vector_gin ON api_salarie USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS api_salarie_nom_recherche_trgm ON api_salarie USING gin (nom_recherche gin_trgm_ops)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS api_salarie_nom_recherche_trgm",
+    "DROP INDEX IF EXISTS api_salarie_search_vector_gin",
+    "DROP TRIGGER IF EXISTS api_salarie_search_vector_trigger ON api_salarie",
+    "DROP FUNCTION IF EXISTS api_salarie_search_vector_update()",
+]
+
+
+def install_search(apps, schema_editor):
+    """Extensions, trigger et index GIN : PostgreSQL uniquement"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in POSTGRES_FORWARD:
+        schema_editor.execute(sql)
+
+
+def uninstall_search(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in POSTGRES_BACKWARD:
+        schema_editor.execute(sql)
+
+
+def backfill_search(apps, schema_editor):
+    """Remplit nom_recherche (et search_vector via le trigger) pour l'existant"""
+    from api.search import normalize_search_text
+
+    Salarie = apps.get_model('api', 'Salarie')
+    batch = []
+    for salarie in Salarie.objects.only('id', 'nom', 'prenom', 'matricule', 'mail_professionnel').iterator():
+        salarie.nom_recherche = normalize_search_text(
+            salarie.nom, salarie.prenom, salarie.matricule, salarie.mail_professionnel
+        )
+        batch.append(salarie)
+    Salarie.objects.bulk_update(batch, ['nom_recherche'], batch_size=1000)
+
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("UPDATE api_salarie SET nom = nom")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_salarie_photo_alter_equipement_type_equipement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salarie',
+            name='nom_recherche',
+            field=models.CharField(blank=True, default='', editable=False, max_length=512),
+        ),
+        migrations.AddField(
+            model_name='salarie',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(install_search, uninstall_search),
+        migrations.RunPython(backfill_search, migrations.RunPython.noop),
+    ]
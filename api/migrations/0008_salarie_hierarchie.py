@@ -0,0 +1,68 @@
+# Generated by Django 4.2.11 on 2026-10-19 11:52
+
+import logging
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+logger = logging.getLogger('api.hierarchy')
+
+
+def _break_cycles(parents):
+    """Copie figée de api.hierarchy.break_cycles : lien du plus petit id de chaque cycle ignoré"""
+    done = set()
+    for start in parents:
+        path, position = [], {}
+        current = start
+        while current is not None and current not in done and current not in position:
+            position[current] = len(path)
+            path.append(current)
+            current = parents.get(current)
+        if current is not None and current in position:
+            cycle = path[position[current]:]
+            parents[min(cycle)] = None
+            logger.warning(f"Cycle hiérarchique {cycle}: lien de {min(cycle)} vers son responsable ignoré")
+        done.update(path)
+
+
+def populate_hierarchie(apps, schema_editor):
+    """Construit la table de fermeture à partir de responsable_direct (cycles coupés)"""
+    Salarie = apps.get_model('api', 'Salarie')
+    SalarieHierarchie = apps.get_model('api', 'SalarieHierarchie')
+
+    parents = dict(Salarie.objects.values_list('id', 'responsable_direct_id'))
+    _break_cycles(parents)
+    rows = []
+    for salarie_id in parents:
+        rows.append(SalarieHierarchie(ancetre_id=salarie_id, descendant_id=salarie_id, profondeur=0))
+        current, depth = parents[salarie_id], 1
+        while current is not None:
+            rows.append(SalarieHierarchie(ancetre_id=current, descendant_id=salarie_id, profondeur=depth))
+            current, depth = parents.get(current), depth + 1
+    SalarieHierarchie.objects.bulk_create(rows, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_salarie_recherche'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalarieHierarchie',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profondeur', models.PositiveIntegerField(default=0)),
+                ('ancetre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hierarchie_descendants', to='api.salarie')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hierarchie_ancetres', to='api.salarie')),
+            ],
+            options={
+                'verbose_name': 'Lien hiérarchique',
+                'verbose_name_plural': 'Liens hiérarchiques',
+                'indexes': [models.Index(fields=['descendant', 'profondeur'], name='api_salarie_descend_7b0f90_idx')],
+                'unique_together': {('ancetre', 'descendant')},
+            },
+        ),
+        migrations.RunPython(populate_hierarchie, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.11 on 2026-10-19 11:56
+
+from django.db import migrations, models
+
+
+def backfill_cles(apps, schema_editor):
+    """Calcule cle_naissance / cle_embauche pour les salariés existants"""
+    from api.calendrier import date_key
+
+    Salarie = apps.get_model('api', 'Salarie')
+    batch = []
+    for salarie in Salarie.objects.only('id', 'date_naissance', 'date_embauche').iterator():
+        salarie.cle_naissance = date_key(salarie.date_naissance)
+        salarie.cle_embauche = date_key(salarie.date_embauche)
+        batch.append(salarie)
+    Salarie.objects.bulk_update(batch, ['cle_naissance', 'cle_embauche'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_salarie_hierarchie'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salarie',
+            name='cle_embauche',
+            field=models.PositiveSmallIntegerField(db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='salarie',
+            name='cle_naissance',
+            field=models.PositiveSmallIntegerField(db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_cles, migrations.RunPython.noop),
+    ]
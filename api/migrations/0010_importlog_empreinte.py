@@ -0,0 +1,23 @@
+# Generated by Django 4.2.11 on 2026-10-19 12:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_salarie_calendrier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importlog',
+            name='empreinte_fichier',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='importlog',
+            name='lignes_inchangees',
+            field=models.IntegerField(default=0),
+        ),
+    ]
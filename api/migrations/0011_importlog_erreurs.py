@@ -0,0 +1,31 @@
+# Generated by Django 4.2.11 on 2026-10-19 12:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_importlog_empreinte'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportLogErreur',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.TextField()),
+                ('nombre', models.PositiveIntegerField(default=0)),
+                ('premiere_ligne', models.PositiveIntegerField(default=0)),
+                ('lignes', models.JSONField(default=list)),
+                ('import_log', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='erreurs', to='api.importlog')),
+            ],
+            options={
+                'verbose_name': "Erreur d'import",
+                'verbose_name_plural': "Erreurs d'import",
+                'ordering': ['premiere_ligne', 'id'],
+                'indexes': [models.Index(fields=['import_log', 'premiere_ligne'], name='api_importl_import__6349a2_idx')],
+            },
+        ),
+    ]
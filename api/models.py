@@ -1,9 +1,14 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from datetime import datetime, date, timedelta
 from dateutil.relativedelta import relativedelta
 
+from .calendrier import date_key
+from .search import normalize_search_text
+
 # ============================================================================
 # MODELES DE BASE - PARAMÉTRAGE
 # ============================================================================
@@ -292,6 +297,18 @@ class Equipement(models.Model):
         self.recalculer_stock()
         super().save(*args, **kwargs)
 
+    @classmethod
+    def recalculer_stocks(cls, equipement_ids):
+        """Version ensembliste de recalculer_stock() (imports en masse) : 2 requêtes"""
+        equipements = list(
+            cls.objects.filter(id__in=equipement_ids).annotate(
+                affectes=models.Count('instances', filter=models.Q(instances__date_retrait__isnull=True))
+            )
+        )
+        for equipement in equipements:
+            equipement.stock_disponible = max(0, equipement.stock_total - equipement.affectes)
+        cls.objects.bulk_update(equipements, ['stock_disponible'], batch_size=1000)
+
 
 # ============================================================================
 # MODELES SALARIÉS
@@ -342,6 +359,17 @@ class Salarie(models.Model):
     creneau_travail = models.ForeignKey(CreneauTravail, on_delete=models.SET_NULL, null=True, blank=True, related_name='salaries')
     en_poste = models.BooleanField(default=True)
 
+    # Recherche (voir api/search.py)
+    # nom_recherche : "nom prenom matricule email" normalisé, indexé en trigrammes sous PostgreSQL
+    # search_vector : tsvector maintenu par trigger PostgreSQL (NULL sous SQLite)
+    nom_recherche = models.CharField(max_length=512, blank=True, default='', editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Calendrier (voir api/calendrier.py) : clés jour/mois (mois*100+jour) indexées
+    # pour les anniversaires de naissance et d'embauche
+    cle_naissance = models.PositiveSmallIntegerField(null=True, editable=False, db_index=True)
+    cle_embauche = models.PositiveSmallIntegerField(null=True, editable=False, db_index=True)
+
     date_creation = models.DateTimeField(auto_now_add=True)
     date_modification = models.DateTimeField(auto_now=True)
 
@@ -352,6 +380,33 @@ class Salarie(models.Model):
     def __str__(self):
         return f"{self.prenom} {self.nom} ({self.matricule})"
 
+    def build_nom_recherche(self):
+        """Texte normalisé utilisé par la recherche et l'autocomplétion"""
+        return normalize_search_text(self.nom, self.prenom, self.matricule, self.mail_professionnel)
+
+    # Champs calculés par refresh_derived_fields() (aussi utilisé par les imports en masse)
+    DERIVED_FIELDS = ('nom_recherche', 'cle_naissance', 'cle_embauche')
+
+    def refresh_derived_fields(self):
+        self.nom_recherche = self.build_nom_recherche()
+        self.cle_naissance = date_key(self.date_naissance)
+        self.cle_embauche = date_key(self.date_embauche)
+
+    def save(self, *args, **kwargs):
+        """Maintient nom_recherche et les clés du calendrier à jour avant sauvegarde"""
+        self.refresh_derived_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {'nom', 'prenom', 'matricule', 'mail_professionnel'} & update_fields:
+                update_fields.add('nom_recherche')
+            if 'date_naissance' in update_fields:
+                update_fields.add('cle_naissance')
+            if 'date_embauche' in update_fields:
+                update_fields.add('cle_embauche')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     def get_anciennete(self):
         """Retourne ancienneté au format '5 ans, 3 mois'"""
         if not self.date_embauche:
@@ -382,6 +437,28 @@ class Salarie(models.Model):
         return f"{self.date_naissance.day:02d}/{self.date_naissance.month:02d}"
 
 
+class SalarieHierarchie(models.Model):
+    """
+    Table de fermeture (closure table) de responsable_direct :
+    une ligne par couple (ancêtre, descendant), profondeur 0 = soi-même.
+    Maintenue par les signals (voir api/hierarchy.py).
+    """
+    ancetre = models.ForeignKey(Salarie, on_delete=models.CASCADE, related_name='hierarchie_descendants')
+    descendant = models.ForeignKey(Salarie, on_delete=models.CASCADE, related_name='hierarchie_ancetres')
+    profondeur = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Lien hiérarchique"
+        verbose_name_plural = "Liens hiérarchiques"
+        unique_together = ['ancetre', 'descendant']
+        indexes = [
+            models.Index(fields=['descendant', 'profondeur']),
+        ]
+
+    def __str__(self):
+        return f"{self.ancetre_id} → {self.descendant_id} ({self.profondeur})"
+
+
 class HistoriqueSalarie(models.Model):
     """Historique des évolutions professionnelles du salarié"""
     salarie = models.ForeignKey(Salarie, on_delete=models.CASCADE, related_name='historique')
@@ -848,6 +925,9 @@ class ImportLog(models.Model):
     lignes_erreur = models.IntegerField(default=0)
     statut = models.CharField(max_length=20, choices=STATUS_CHOICES, default='en_cours')
     details_erreurs = models.JSONField(default=dict, null=True, blank=True)
+    # Empreinte SHA-256 du fichier : un fichier identique déjà importé avec succès n'est pas rejoué
+    empreinte_fichier = models.CharField(max_length=64, null=True, blank=True, db_index=True)
+    lignes_inchangees = models.IntegerField(default=0)
     cree_par = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='import_logs')
     date_creation = models.DateTimeField(auto_now_add=True)
     date_modification = models.DateTimeField(auto_now=True)
@@ -858,10 +938,65 @@ class ImportLog(models.Model):
         verbose_name_plural = "Logs d'import"
 
     def __str__(self):
-        return f"{self.api_name} - {self.date_creation.strftime('%d/%m/%Y %H:%M')}"
+        return f"{self.api_name} - {timezone.localtime(self.date_creation):%d/%m/%Y %H:%M}"
 
     def get_taux_succes(self):
         """Retourne le % de succès"""
         if self.total_lignes == 0:
             return 0
         return round((self.lignes_succes / self.total_lignes) * 100, 2)
+
+    @classmethod
+    def creer(cls, errors, **fields):
+        """
+        Crée le log d'un import : details_erreurs ne garde qu'un aperçu des
+        premières erreurs, toutes sont enregistrées regroupées par message
+        dans ImportLogErreur (voir /api/import-logs/<id>/errors/).
+        """
+        import_log = cls.objects.create(details_erreurs=list(errors[:ImportLogErreur.APERCU]), **fields)
+        ImportLogErreur.objects.bulk_create(
+            [ImportLogErreur(import_log=import_log, **classe) for classe in ImportLogErreur.grouper(errors)],
+            batch_size=1000,
+        )
+        return import_log
+
+
+class ImportLogErreur(models.Model):
+    """Classe d'erreurs d'un import : même message, plages de lignes [[début, fin], ...]"""
+    # Nombre d'erreurs brutes gardées dans ImportLog.details_erreurs
+    APERCU = 20
+
+    import_log = models.ForeignKey(ImportLog, on_delete=models.CASCADE, related_name='erreurs')
+    message = models.TextField()
+    nombre = models.PositiveIntegerField(default=0)
+    premiere_ligne = models.PositiveIntegerField(default=0)
+    lignes = models.JSONField(default=list)
+
+    class Meta:
+        ordering = ['premiere_ligne', 'id']
+        indexes = [models.Index(fields=['import_log', 'premiere_ligne'])]
+        verbose_name = "Erreur d'import"
+        verbose_name_plural = "Erreurs d'import"
+
+    def __str__(self):
+        return f"{self.import_log_id} - {self.nombre} x {self.message[:50]}"
+
+    @staticmethod
+    def grouper(errors):
+        """[{'row', 'error'}] -> [{message, nombre, premiere_ligne, lignes}] par première ligne"""
+        par_message = {}
+        for error in errors:
+            par_message.setdefault(error['error'], []).append(error['row'])
+
+        classes = []
+        for message, rows in par_message.items():
+            rows = sorted(set(rows))
+            plages = [[rows[0], rows[0]]]
+            for row in rows[1:]:
+                if row == plages[-1][1] + 1:
+                    plages[-1][1] = row
+                else:
+                    plages.append([row, row])
+            classes.append({'message': message, 'nombre': len(rows), 'premiere_ligne': rows[0], 'lignes': plages})
+        classes.sort(key=lambda classe: classe['premiere_ligne'])
+        return classes
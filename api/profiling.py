@@ -0,0 +1,241 @@
+# api/profiling.py - PROFILAGE À LA DEMANDE (ADMINISTRATEURS)
+#
+# Avec PROFILER_ENABLED, un membre du staff profile une requête précise en
+# production :
+#
+#   GET /api/salaries/?search=dupont&_profile=1      ou en-tête  X-Profile: 1
+#
+# La requête passe sous cProfile (déterministe) et chaque requête SQL est
+# notée avec sa durée et les frames du projet qui l'ont déclenchée. Le
+# profil est écrit dans PROFILER_DIR : <id>.prof (pstats, pour snakeviz /
+# python -m pstats) et <id>.json (requête, SQL, fonctions les plus coûteuses).
+# Tampon circulaire : seuls les PROFILER_MAX_PROFILES derniers sont gardés.
+# Liste et téléchargement : /admin/profiles/. L'identifiant est renvoyé
+# dans l'en-tête X-Profile-Id.
+#
+# Désactivé (défaut), ProfilerMiddleware est retiré de la chaîne au
+# démarrage (MiddlewareNotUsed) : aucun coût.
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import secrets
+import tempfile
+import threading
+import time
+import traceback
+from contextlib import ExitStack
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connections
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+PROFILE_PARAM = '_profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+PROFILER_DIR = getattr(settings, 'PROFILER_DIR', None) or os.path.join(tempfile.gettempdir(), 'msi-profiles')
+PROFILER_MAX_PROFILES = getattr(settings, 'PROFILER_MAX_PROFILES', 20)
+
+# Bornes d'un profil : requêtes SQL notées, frames par requête, fonctions résumées
+MAX_QUERIES = 1000
+MAX_FRAMES = 8
+TOP_FUNCTIONS = 60
+
+# Modules de mesure, présents dans toutes les piles SQL
+INFRASTRUCTURE_FILES = ('profiling.py', 'instrumentation.py', 'middleware.py')
+
+PROFILE_ID = re.compile(r'^\d{8}-\d{12}-[0-9a-f]{4}$')
+KINDS = {'prof': 'application/octet-stream', 'json': 'application/json'}
+
+# Un profileur actif à la fois par processus (Python 3.12 : sys.monitoring est global)
+_active = threading.Lock()
+
+
+# ============================================================================
+# DÉCLENCHEMENT
+# ============================================================================
+
+def requested(request):
+    flag = request.GET.get(PROFILE_PARAM) or request.META.get(PROFILE_HEADER)
+    return flag not in (None, '', '0', 'false')
+
+
+def staff_user(request):
+    """Utilisateur staff de la session admin ou du jeton JWT, sinon None"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user if user.is_staff else None
+
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    if authenticated is None or not authenticated[0].is_staff:
+        return None
+    return authenticated[0]
+
+
+# ============================================================================
+# CAPTURE
+# ============================================================================
+
+def _project_frames():
+    """Frames du projet (hors bibliothèques et middlewares) menant à la requête SQL, la plus récente en dernier"""
+    frames = []
+    for frame in traceback.extract_stack():
+        if (frame.filename.startswith(str(settings.BASE_DIR)) and 'site-packages' not in frame.filename
+                and os.path.basename(frame.filename) not in INFRASTRUCTURE_FILES):
+            frames.append(f"{os.path.relpath(frame.filename, settings.BASE_DIR)}:{frame.lineno} {frame.name}")
+    return frames[-MAX_FRAMES:]
+
+
+class ProfileCapture:
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.queries = []
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.duration = 0.0
+
+    def _sql_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.sql_count += 1
+            self.sql_time += elapsed
+            if len(self.queries) < MAX_QUERIES:
+                # Paramètres non conservés : données personnelles
+                self.queries.append({
+                    'sql': sql,
+                    'many': many,
+                    'duration_ms': round(elapsed * 1000, 2),
+                    'stack': _project_frames(),
+                })
+
+    def run(self, get_response, request):
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self._sql_wrapper))
+            self.profile.enable()
+            try:
+                response = get_response(request)
+            finally:
+                self.profile.disable()
+        self.duration = time.perf_counter() - started
+        return response
+
+    def top_functions(self):
+        buffer = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=buffer)
+        stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        return buffer.getvalue()
+
+
+def profile_request(get_response, request, user):
+    """(réponse, id du profil) ; id None si un autre profil est en cours dans le processus"""
+    if not _active.acquire(blocking=False):
+        return get_response(request), None
+    try:
+        capture = ProfileCapture()
+        response = capture.run(get_response, request)
+    finally:
+        _active.release()
+    return response, save(capture, request, response, user)
+
+
+# ============================================================================
+# TAMPON CIRCULAIRE SUR DISQUE
+# ============================================================================
+
+def _path(profile_id, kind):
+    return os.path.join(PROFILER_DIR, f'{profile_id}.{kind}')
+
+
+def _write(path, write):
+    """Écriture atomique : un profil listé est toujours complet"""
+    temporary = f'{path}.tmp'
+    write(temporary)
+    os.replace(temporary, path)
+
+
+def save(capture, request, response, user):
+    """Écrit le profil, élimine les plus anciens au-delà de PROFILER_MAX_PROFILES ; renvoie son id"""
+    os.makedirs(PROFILER_DIR, exist_ok=True)
+    now = datetime.now()
+    profile_id = f"{now:%Y%m%d-%H%M%S%f}-{secrets.token_hex(2)}"
+    summary = {
+        'id': profile_id,
+        'created': now.isoformat(timespec='seconds'),
+        'method': request.method,
+        'path': request.get_full_path(),
+        'user': user.get_username(),
+        'status': response.status_code,
+        'duration_ms': round(capture.duration * 1000, 1),
+        'sql_count': capture.sql_count,
+        'sql_ms': round(capture.sql_time * 1000, 1),
+        'queries': capture.queries,
+        'functions': capture.top_functions(),
+    }
+    _write(_path(profile_id, 'prof'), capture.profile.dump_stats)
+    _write(_path(profile_id, 'json'), lambda path: _dump_json(summary, path))
+    prune()
+    return profile_id
+
+
+def _dump_json(data, path):
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(data, handle, ensure_ascii=False)
+
+
+def _ids():
+    try:
+        names = os.listdir(PROFILER_DIR)
+    except FileNotFoundError:
+        return []
+    return sorted(name[:-5] for name in names if name.endswith('.json') and PROFILE_ID.match(name[:-5]))
+
+
+def prune():
+    for profile_id in _ids()[:-PROFILER_MAX_PROFILES or None]:
+        for kind in KINDS:
+            try:
+                os.remove(_path(profile_id, kind))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles():
+    """Résumés des profils gardés, du plus récent au plus ancien (sans SQL ni fonctions)"""
+    profiles = []
+    for profile_id in reversed(_ids()):
+        try:
+            with open(_path(profile_id, 'json'), encoding='utf-8') as handle:
+                data = json.load(handle)
+        except (FileNotFoundError, ValueError):
+            continue
+        data.pop('queries', None)
+        data.pop('functions', None)
+        profiles.append(data)
+    return profiles
+
+
+def profile_file(profile_id, kind):
+    """Chemin d'un fichier de profil existant, None si l'id ou le type est invalide"""
+    if kind not in KINDS or not PROFILE_ID.match(profile_id):
+        return None
+    path = _path(profile_id, kind)
+    return path if os.path.exists(path) else None
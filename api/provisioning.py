@@ -0,0 +1,214 @@
+# api/provisioning.py - PROVISIONNEMENT DES COMPTES USER DES SALARIÉS
+#
+# Les comptes sont créés sans mot de passe utilisable : le salarié choisit
+# le sien via un lien d'invitation (invitation(), POST
+# /api/salaries/<id>/invitation/ puis POST /api/invitation/activer/).
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.contrib.auth.tokens import default_token_generator
+from django.db import transaction
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from .models import FicheParametresUser, Salarie
+from .table_versions import bump_table_version
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_GROUP = 'salarie'
+DEFAULT_EMAIL_DOMAIN = 'msi.tn'
+DEFAULT_PARAMETRES = {'theme': 'light', 'langue': 'fr', 'notifications_actives': True}
+
+# Champs du salarié recopiés sur le User
+USER_SOURCE_FIELDS = ('nom', 'prenom', 'mail_professionnel')
+
+BATCH_SIZE = 1000
+
+
+def default_email(salarie):
+    return salarie.mail_professionnel or f"{salarie.matricule}@{DEFAULT_EMAIL_DOMAIN}"
+
+
+def user_source_values(salarie):
+    """Valeurs (nom, prenom, mail) servant à détecter les changements à reporter sur le User"""
+    return tuple(salarie.__dict__.get(field) for field in USER_SOURCE_FIELDS)
+
+
+# ============================================================================
+# CRÉATION EN MASSE
+# ============================================================================
+
+def provision_users(salaries):
+    """
+    Crée et lie les User des salariés qui n'en ont pas, en un nombre
+    constant de requêtes : bulk_create des User (mot de passe inutilisable),
+    des appartenances au groupe par défaut et des paramètres, puis
+    bulk_update de Salarie.user. Un User existant dont le username est
+    le matricule (et non lié à un autre salarié) est réutilisé.
+    Retourne le nombre de User créés.
+    """
+    salaries = [s for s in salaries if s.pk and not s.user_id]
+    if not salaries:
+        return 0
+
+    with transaction.atomic():
+        matricules = [s.matricule for s in salaries]
+        existing = {
+            u.username: u for u in User.objects.filter(username__in=matricules).only('id', 'username')
+        }
+        deja_lies = set(
+            Salarie.objects.filter(user__username__in=existing.keys()).values_list('user__username', flat=True)
+        )
+
+        nouveaux = []
+        for salarie in salaries:
+            if salarie.matricule in existing:
+                continue
+            nouveaux.append(User(
+                username=salarie.matricule,
+                email=default_email(salarie),
+                first_name=salarie.prenom,
+                last_name=salarie.nom,
+                password=make_password(None),
+            ))
+        User.objects.bulk_create(nouveaux, batch_size=BATCH_SIZE)
+        if nouveaux:
+            bump_table_version(User)
+        users = {u.username: u for u in nouveaux}
+        users.update({username: u for username, u in existing.items() if username not in deja_lies})
+
+        lies = []
+        for salarie in salaries:
+            user = users.get(salarie.matricule)
+            if user is None:
+                logger.warning(f"User '{salarie.matricule}' déjà lié à un autre salarié, non provisionné")
+                continue
+            salarie.user = user
+            lies.append(salarie)
+        Salarie.objects.bulk_update(lies, ['user'], batch_size=BATCH_SIZE)
+
+        user_ids = [s.user_id for s in lies]
+        group = Group.objects.filter(name=DEFAULT_GROUP).first()
+        if group is None:
+            logger.warning(f"Group '{DEFAULT_GROUP}' inexistant, users créés sans groupe")
+        else:
+            Membership = User.groups.through
+            Membership.objects.bulk_create(
+                [Membership(user_id=user_id, group_id=group.id) for user_id in user_ids],
+                batch_size=BATCH_SIZE, ignore_conflicts=True,
+            )
+        FicheParametresUser.objects.bulk_create(
+            [FicheParametresUser(user_id=user_id, **DEFAULT_PARAMETRES) for user_id in user_ids],
+            batch_size=BATCH_SIZE, ignore_conflicts=True,
+        )
+
+    logger.info(f"Provisionnement: {len(nouveaux)} users créés, {len(lies)} salariés liés")
+    return len(nouveaux)
+
+
+# ============================================================================
+# INVITATION (PREMIER MOT DE PASSE)
+# ============================================================================
+
+def invitation(user):
+    """
+    {uid, token, lien} pour choisir son mot de passe. Jeton de
+    réinitialisation Django : expire après PASSWORD_RESET_TIMEOUT et dès
+    que le mot de passe change.
+    """
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    token = default_token_generator.make_token(user)
+    return {'uid': uid, 'token': token, 'lien': settings.INVITATION_URL.format(uid=uid, token=token)}
+
+
+def user_from_invitation(uid, token):
+    """User de l'invitation si le jeton est valide, sinon None"""
+    try:
+        user = User.objects.get(pk=force_str(urlsafe_base64_decode(uid)))
+    except (TypeError, ValueError, OverflowError, User.DoesNotExist):
+        return None
+    return user if default_token_generator.check_token(user, token) else None
+
+
+# ============================================================================
+# SYNCHRONISATION NOM / PRÉNOM / EMAIL
+# ============================================================================
+
+def sync_users(salaries):
+    """
+    Reporte nom/prénom/email des salariés sur leurs User, uniquement
+    pour ceux qui diffèrent réellement (une lecture + un bulk_update).
+    Retourne le nombre de User modifiés.
+    """
+    by_user = {s.user_id: s for s in salaries if s.user_id}
+    if not by_user:
+        return 0
+
+    modifies = []
+    for user in User.objects.filter(pk__in=by_user.keys()).only('id', 'first_name', 'last_name', 'email'):
+        salarie = by_user[user.pk]
+        valeurs = {
+            'first_name': salarie.prenom,
+            'last_name': salarie.nom,
+            'email': salarie.mail_professionnel or user.email,
+        }
+        if any(getattr(user, field) != value for field, value in valeurs.items()):
+            for field, value in valeurs.items():
+                setattr(user, field, value)
+            modifies.append(user)
+
+    User.objects.bulk_update(modifies, ['first_name', 'last_name', 'email'], batch_size=BATCH_SIZE)
+    return len(modifies)
+
+
+# ============================================================================
+# MODE DIFFÉRÉ (IMPORTS EN MASSE)
+# ============================================================================
+
+_deferred = ContextVar('provisioning_deferred', default=None)
+
+
+def is_deferred():
+    return _deferred.get() is not None
+
+
+def defer(salarie, created):
+    """Appelé par le signal post_save en mode différé : mémorise le salarié"""
+    pending = _deferred.get()
+    pending['crees' if created else 'modifies'][salarie.pk] = salarie
+
+
+@contextmanager
+def deferred_provisioning():
+    """
+    Regroupe le provisionnement des salariés sauvegardés dans le bloc :
+    les signals ne font que collecter, la création/synchronisation des
+    User est faite en masse à la sortie.
+
+        with deferred_provisioning():
+            for row in rows:
+                Salarie.objects.update_or_create(...)
+    """
+    if is_deferred():
+        # Bloc imbriqué : le bloc englobant s'en charge
+        yield
+        return
+
+    pending = {'crees': {}, 'modifies': {}}
+    token = _deferred.set(pending)
+    try:
+        yield
+    finally:
+        _deferred.reset(token)
+
+    provision_users(pending['crees'].values())
+    sync_users(s for pk, s in pending['modifies'].items() if pk not in pending['crees'])
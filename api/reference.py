@@ -0,0 +1,107 @@
+# api/reference.py - DONNÉES DE RÉFÉRENCE EN UN SEUL APPEL
+#
+# GET /api/reference/ : toutes les tables de paramétrage (sociétés,
+# départements, circuits...) sous forme compacte {champs, lignes}. La
+# version du paquet = versions des tables (api/table_versions.py,
+# incrémentées par les signals post_save/post_delete et les imports) :
+# ETag fort, 304 tant que rien n'a changé, contenu gardé en cache.
+
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+
+from .models import (
+    Societe, Departement, Circuit, Service, Grade, TypeAcces, OutilTravail,
+    CreneauTravail, Equipement, TypeApplicationAcces
+)
+from .caching import get_or_build
+from .table_versions import versions_signature
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Clé du paquet -> (modèle, champs exposés, permission requise ou None)
+REFERENCE_TABLES = {
+    'societes': (Societe, ('id', 'nom', 'actif'), None),
+    'departements': (Departement, ('id', 'numero', 'nom', 'region', 'societe_id', 'actif'), None),
+    'circuits': (Circuit, ('id', 'nom', 'departement_id', 'actif'), None),
+    'services': (Service, ('id', 'nom', 'societe_id', 'responsable_id', 'actif'), None),
+    'grades': (Grade, ('id', 'nom', 'societe_id', 'ordre', 'actif'), None),
+    'types_acces': (TypeAcces, ('id', 'nom', 'actif'), None),
+    'outils_travail': (OutilTravail, ('id', 'nom', 'actif'), None),
+    'creneaux_travail': (CreneauTravail, ('id', 'nom', 'societe_id', 'heure_debut', 'heure_fin', 'actif'), None),
+    # Mêmes droits que /api/equipements/ ; stocks exclus (recalculés en continu)
+    'equipements': (Equipement, ('id', 'nom', 'type_equipement', 'actif'), 'api.view_all_equipment'),
+    'types_application_acces': (TypeApplicationAcces, ('id', 'nom', 'actif'), None),
+}
+
+BUNDLE_CACHE_KEY = 'reference_bundle:{}'
+# Filet de sécurité pour les écritures qui ne passent ni par les signals ni par les imports
+BUNDLE_TIMEOUT = 60 * 60
+
+
+# ============================================================================
+# CONSTRUCTION
+# ============================================================================
+
+def visible_tables(user):
+    """Clés du paquet visibles par `user` (les tables soumises à permission en dépendent)"""
+    return tuple(
+        key for key, (_, _, perm) in REFERENCE_TABLES.items()
+        if perm is None or user.is_staff or user.has_perm(perm)
+    )
+
+
+def bundle_etag(tables):
+    """ETag fort : versions des tables visibles, sans lire leur contenu"""
+    signature = versions_signature([REFERENCE_TABLES[key][0] for key in tables])
+    digest = hashlib.sha256(f"{','.join(tables)}|{signature}".encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def build_bundle(tables):
+    """JSON du paquet : une requête par table, {clé: {champs, lignes}}"""
+    bundle = {}
+    for key in tables:
+        Model, fields, _ = REFERENCE_TABLES[key]
+        bundle[key] = {
+            'fields': fields,
+            'rows': list(Model.objects.order_by('pk').values_list(*fields)),
+        }
+    return json.dumps(bundle, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+
+
+def get_bundle(tables, etag):
+    key = BUNDLE_CACHE_KEY.format(etag.strip('"'))
+    return get_or_build(key, lambda: build_bundle(tables), BUNDLE_TIMEOUT)
+
+
+# ============================================================================
+# ENDPOINT
+# ============================================================================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def reference_bundle(request):
+    """
+    GET /api/reference/
+    Toutes les tables de paramétrage en un appel. Renvoyer l'ETag reçu
+    dans If-None-Match : 304 sans corps tant qu'aucune table n'a changé.
+    """
+    tables = visible_tables(request.user)
+    etag = bundle_etag(tables)
+
+    # Comparaison faible : l'ETag revient en W/"..." une fois la réponse compressée
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(get_bundle(tables, etag), content_type='application/json')
+    response['ETag'] = etag
+    # Réponse propre à l'utilisateur authentifié, à revalider à chaque usage
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
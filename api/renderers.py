@@ -0,0 +1,106 @@
+# api/renderers.py - RENDU ET LECTURE JSON (ORJSON)
+#
+# Même sortie que les JSONRenderer / JSONParser de DRF, plusieurs fois plus
+# rapide sur les grosses listes. orjson est optionnel : sans lui, les
+# classes DRF d'origine sont utilisées telles quelles.
+# Les dates, heures et datetimes hors serializer (dicts construits dans les
+# vues) suivent DATE_FORMAT / TIME_FORMAT / DATETIME_FORMAT de DRF.
+
+import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework import parsers, renderers, serializers
+from rest_framework.exceptions import ParseError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ============================================================================
+# CONVERSION DES TYPES NON NATIFS
+# ============================================================================
+
+# Champs DRF utilisés hors serializer : mêmes formats et fuseau que la sortie des serializers
+_DATETIME = serializers.DateTimeField()
+_DATE = serializers.DateField()
+_TIME = serializers.TimeField()
+
+if orjson is not None:
+    # Dates formatées par _default ; clés non-str (int...) converties comme json.dumps ; numpy (imports pandas)
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Séparateurs de ligne Unicode : échappés comme le fait DRF (JSON inclus dans du JavaScript)
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+def _default(obj):
+    """Types non gérés par orjson, convertis comme rest_framework.utils.encoders.JSONEncoder"""
+    if isinstance(obj, datetime.datetime):
+        return _DATETIME.to_representation(obj)
+    if isinstance(obj, datetime.date):
+        return _DATE.to_representation(obj)
+    if isinstance(obj, datetime.time):
+        return _TIME.to_representation(obj)
+    if isinstance(obj, Decimal):
+        # Les DecimalField des serializers sont déjà des chaînes (COERCE_DECIMAL_TO_STRING)
+        return float(obj)
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if isinstance(obj, QuerySet):
+        return tuple(obj)
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__getitem__'):
+        cls = list if isinstance(obj, (list, tuple)) else dict
+        try:
+            return cls(obj)
+        except Exception:
+            pass
+    elif hasattr(obj, '__iter__'):
+        return tuple(obj)
+    raise TypeError(f"Type {type(obj).__name__} non sérialisable en JSON")
+
+
+# ============================================================================
+# RENDERER / PARSER
+# ============================================================================
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer de DRF, sérialisation par orjson (indentation 2 si demandée)"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        option = ORJSON_OPTIONS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        content = orjson.dumps(data, default=_default, option=option)
+        for raw, escaped in _LINE_SEPARATORS:
+            if raw in content:
+                content = content.replace(raw, escaped)
+        return content
+
+
+class ORJSONParser(parsers.JSONParser):
+    """JSONParser de DRF, lecture par orjson (corps en UTF-8)"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,213 @@
+# api/route_stats.py - PERCENTILES DE LATENCE PAR ROUTE
+#
+# Chaque requête résolue est comptée dans un histogramme par route
+# ('GET:salarie-list' : méthode + nom de la vue) : seaux de durée, somme
+# des durées, requêtes SQL, erreurs 5xx. Cumul en mémoire dans le worker,
+# versé toutes les FLUSH_INTERVAL secondes dans le cache partagé (cache.incr)
+# par un thread du processus, hors du chemin des requêtes ; donc agrégé entre
+# workers et processus recyclés (versement final à la sortie), par jour.
+#
+#   GET    /api/performance/?days=1   p50 / p95 / p99 par route (admin)
+#   DELETE /api/performance/          remise à zéro
+#
+# Percentiles interpolés dans le seau : précision de l'ordre de sa largeur.
+
+import atexit
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from django.core.cache import caches
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .caching import HOT, LOCK_KEY, bump_namespace, versioned_key
+from .permissions import IsAdmin
+
+logger = logging.getLogger(__name__)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Bornes supérieures des seaux (ms) ; un dernier seau au-delà
+BUCKETS_MS = (5, 10, 25, 50, 75, 100, 150, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000, 30000)
+FLUSH_INTERVAL = 10
+NAMESPACE = 'route_stats'
+# Jours consultables ; chaque clé expire au-delà
+MAX_DAYS = 7
+STATS_TTL = (MAX_DAYS + 1) * 86400
+
+_lock = threading.Lock()
+_pending = {}
+_registered = set()
+# (pid, thread) du versement périodique : un thread par processus, relancé après fork
+_flusher = None
+
+
+# ============================================================================
+# ENREGISTREMENT
+# ============================================================================
+
+def record(route, duration_ms, queries, error):
+    """Compte une requête dans le cumul du worker (mémoire seule : aucun accès au cache)"""
+    bucket = bisect.bisect_left(BUCKETS_MS, duration_ms)
+    with _lock:
+        _ensure_flusher()
+        counters = _pending.setdefault(route, Counter())
+        counters[f'b{bucket}'] += 1
+        counters['ms'] += round(duration_ms)
+        counters['queries'] += queries
+        counters['errors'] += int(error)
+
+
+def _ensure_flusher():
+    """Démarre le thread de versement du processus (appelé sous _lock)"""
+    global _flusher
+    pid = os.getpid()
+    if _flusher is not None and _flusher[0] == pid:
+        return
+    thread = threading.Thread(target=_flush_loop, name='route-stats-flush', daemon=True)
+    _flusher = (pid, thread)
+    thread.start()
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        flush()
+
+
+def _day_prefix(day):
+    return f"{versioned_key(NAMESPACE)}:{day.isoformat()}"
+
+
+def _incr(cache, key, delta):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, STATS_TTL):
+            cache.incr(key, delta)
+
+
+def _register(cache, prefix, routes):
+    """
+    Ajoute les routes à la liste du jour (lue par stats()), sous verrou sans
+    attente : verrou pris par un autre worker, nouvel essai au versement suivant
+    (les compteurs sont déjà cumulés, la route apparaît alors avec eux).
+    """
+    new = {route for route in routes if (prefix, route) not in _registered}
+    if not new:
+        return
+    key = f'{prefix}:routes'
+    lock = LOCK_KEY.format(key)
+    if not cache.add(lock, 1, 5):
+        return
+    try:
+        cache.set(key, cache.get(key, set()) | new, STATS_TTL)
+    finally:
+        cache.delete(lock)
+    _registered.update((prefix, route) for route in new)
+
+
+def flush():
+    """Verse le cumul du worker dans le cache ; une erreur du cache est journalisée, le cumul perdu"""
+    global _pending
+    with _lock:
+        pending, _pending = _pending, {}
+    if not pending:
+        return
+    cache = caches[HOT]
+    try:
+        prefix = _day_prefix(date.today())
+        _register(cache, prefix, pending)
+        for route, counters in pending.items():
+            for name, delta in counters.items():
+                if delta:
+                    _incr(cache, f'{prefix}:{route}:{name}', delta)
+    except Exception:
+        logger.exception("Statistiques de routes non enregistrées")
+
+
+# Worker recyclé (max_requests) : le cumul en cours n'est pas perdu
+atexit.register(flush)
+
+
+# ============================================================================
+# LECTURE
+# ============================================================================
+
+def percentile(buckets, total, q):
+    """Percentile `q` (0-1) d'un histogramme [effectif par seau], interpolé dans le seau"""
+    target = q * total
+    seen = 0
+    for index, count in enumerate(buckets):
+        if count and seen + count >= target:
+            if index == len(BUCKETS_MS):
+                return float(BUCKETS_MS[-1])
+            lower = BUCKETS_MS[index - 1] if index else 0
+            return lower + (BUCKETS_MS[index] - lower) * (target - seen) / count
+        seen += count
+    return 0.0
+
+
+def stats(days=1):
+    """[{route, count, p50, p95, p99, moyenne...}] des `days` derniers jours, p95 décroissant"""
+    flush()
+    cache = caches[HOT]
+    names = [f'b{i}' for i in range(len(BUCKETS_MS) + 1)] + ['ms', 'queries', 'errors']
+    totals = {}
+    today = date.today()
+    for offset in range(days):
+        prefix = _day_prefix(today - timedelta(days=offset))
+        routes = cache.get(f'{prefix}:routes', set())
+        if not routes:
+            continue
+        values = cache.get_many([f'{prefix}:{route}:{name}' for route in routes for name in names])
+        for route in routes:
+            counters = totals.setdefault(route, Counter())
+            for name in names:
+                counters[name] += values.get(f'{prefix}:{route}:{name}', 0)
+
+    rows = []
+    for route, counters in totals.items():
+        buckets = [counters[f'b{i}'] for i in range(len(BUCKETS_MS) + 1)]
+        count = sum(buckets)
+        if not count:
+            continue
+        rows.append({
+            'route': route,
+            'count': count,
+            'p50_ms': round(percentile(buckets, count, 0.50), 1),
+            'p95_ms': round(percentile(buckets, count, 0.95), 1),
+            'p99_ms': round(percentile(buckets, count, 0.99), 1),
+            'mean_ms': round(counters['ms'] / count, 1),
+            'mean_queries': round(counters['queries'] / count, 1),
+            'errors': counters['errors'],
+        })
+    rows.sort(key=lambda row: row['p95_ms'], reverse=True)
+    return rows
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdmin])
+def performance_stats(request):
+    """
+    GET /api/performance/?days=N
+    Latences par route sur les N derniers jours (1 à 7, défaut 1).
+    DELETE /api/performance/ : remise à zéro des compteurs.
+    """
+    if request.method == 'DELETE':
+        flush()
+        bump_namespace(NAMESPACE)
+        return Response(status=204)
+
+    try:
+        days = min(max(int(request.query_params.get('days', 1)), 1), MAX_DAYS)
+    except ValueError:
+        days = 1
+    return Response({'days': days, 'buckets_ms': BUCKETS_MS, 'routes': stats(days)})
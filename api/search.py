@@ -0,0 +1,167 @@
+# api/search.py - RECHERCHE PLEIN TEXTE SUR LES SALARIÉS
+
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Configuration text search PostgreSQL créée par la migration 0007_salarie_recherche
+# (copie de 'french' avec le dictionnaire unaccent devant french_stem)
+SEARCH_CONFIG = 'fr_unaccent'
+
+# Seuil de similarité trigramme pour la recherche approximative (fautes de frappe) :
+# appliqué à l'opérateur % (pg_trgm.similarity_threshold), qui garde l'index GIN
+TRIGRAM_THRESHOLD = 0.3
+
+SUGGEST_MIN_LENGTH = 2
+SUGGEST_DEFAULT_LIMIT = 10
+SUGGEST_MAX_LIMIT = 20
+
+# Colonnes renvoyées par /api/salaries/suggest/ (pas de serializer, pas de jointure)
+SUGGEST_FIELDS = ('id', 'nom', 'prenom', 'matricule', 'poste')
+
+_TOKEN_RE = re.compile(r'[\w@.-]+')
+
+
+# ============================================================================
+# NORMALISATION
+# ============================================================================
+
+def normalize_search_text(*parts) -> str:
+    """
+    Normalise un texte pour la recherche : minuscules, sans accents,
+    espaces compactés. Les valeurs vides/None sont ignorées.
+    """
+    text = ' '.join(str(p) for p in parts if p)
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.lower().split())
+
+
+def tokenize(query: str) -> list:
+    """Découpe une requête normalisée en termes exploitables"""
+    return _TOKEN_RE.findall(normalize_search_text(query))
+
+
+def _is_postgresql() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+# ============================================================================
+# RECHERCHE
+# ============================================================================
+
+def search_salaries(queryset, query: str):
+    """
+    Filtre et classe un queryset de Salarie selon une requête libre.
+
+    - PostgreSQL : tsvector (config fr_unaccent, préfixes) + trigrammes
+      sur nom_recherche, tous deux indexés en GIN. Classement par
+      ts_rank + similarité.
+    - Autres moteurs (SQLite en test) : LIKE sur nom_recherche
+      (déjà normalisé), classement par type de correspondance.
+
+    Le queryset retourné est annoté avec `rang` et trié par pertinence.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset
+
+    if _is_postgresql():
+        return _search_postgresql(queryset, tokens)
+    return _search_fallback(queryset, tokens)
+
+
+def _set_trigram_threshold():
+    """
+    Seuil de l'opérateur % pour la connexion : limité à la transaction en
+    cours (ATOMIC_REQUESTS), à la session hors transaction.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('pg_trgm.similarity_threshold', %s, %s)",
+            [str(TRIGRAM_THRESHOLD), connection.in_atomic_block],
+        )
+
+
+def _search_postgresql(queryset, tokens):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+
+    normalized = ' '.join(tokens)
+    # Chaque terme en préfixe : "dup jea" -> dup:* & jea:*
+    words = [w for w in (re.sub(r'[^\w]', '', t) for t in tokens) if w]
+    raw = ' & '.join(f'{w}:*' for w in words)
+    ts_query = SearchQuery(raw, config=SEARCH_CONFIG, search_type='raw') if raw else None
+
+    contains_all = Q()
+    for token in tokens:
+        contains_all &= Q(nom_recherche__contains=token)
+
+    _set_trigram_threshold()
+    condition = contains_all | Q(nom_recherche__trigram_similar=normalized)
+    if ts_query is not None:
+        condition |= Q(search_vector=ts_query)
+
+    rang = TrigramSimilarity('nom_recherche', normalized)
+    if ts_query is not None:
+        rang = rang + SearchRank(F('search_vector'), ts_query)
+
+    return queryset.filter(condition).annotate(rang=rang).order_by('-rang', 'nom', 'prenom')
+
+
+def _search_fallback(queryset, tokens):
+    condition = Q()
+    for token in tokens:
+        condition &= Q(nom_recherche__contains=token)
+
+    first = tokens[0]
+    rang = Case(
+        When(matricule__iexact=first, then=Value(4)),
+        When(nom_recherche__startswith=first, then=Value(3)),
+        When(nom_recherche__contains=f' {first}', then=Value(2)),
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+    return queryset.filter(condition).annotate(rang=rang).order_by('-rang', 'nom', 'prenom')
+
+
+def suggest_salaries(queryset, query: str, limit: int = SUGGEST_DEFAULT_LIMIT) -> list:
+    """
+    Suggestions pour l'autocomplétion : quelques colonnes via values(),
+    limitées à `limit` résultats, sans instancier de modèles.
+    """
+    if len(normalize_search_text(query)) < SUGGEST_MIN_LENGTH:
+        return []
+    limit = max(1, min(int(limit), SUGGEST_MAX_LIMIT))
+    results = search_salaries(queryset, query)
+    return list(results.values(*SUGGEST_FIELDS)[:limit])
+
+
+# ============================================================================
+# FILTRE DRF
+# ============================================================================
+
+class SalarieSearchFilter(SearchFilter):
+    """
+    Remplace SearchFilter (ILIKE '%terme%' en OR sur chaque colonne) pour
+    les salariés. Doit être placé APRÈS OrderingFilter : le classement par
+    pertinence ne s'applique que si ?ordering= n'est pas fourni.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        results = search_salaries(queryset, ' '.join(terms))
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            # Respecter le tri demandé explicitement
+            return results.order_by(*queryset.query.order_by)
+        return results
@@ -1,12 +1,14 @@
 from rest_framework import serializers
 from rest_framework.relations import PrimaryKeyRelatedField
+from .instrumentation import TimedSerializerMixin
+from .sparse_fields import SparseFieldsMixin
 from .models import (
     Societe, Service, Grade, Departement, TypeAcces, OutilTravail, Circuit,
     Equipement, Salarie, AccesSalarie, HistoriqueSalarie, FichePoste,
     OutilFichePoste, AmeliorationProposee, EquipementInstance, CreneauTravail,
     HoraireSalarie, DocumentSalarie, DemandeConge, SoldeConge, TravauxExceptionnels,
     TypeApplicationAcces, AccesApplication, FicheParametresUser, Role,
-    DemandeAcompte, DemandeSortie, ImportLog
+    DemandeAcompte, DemandeSortie, ImportLog, ImportLogErreur
 )
 from django.contrib.auth.models import User
 from datetime import date
@@ -14,7 +16,7 @@ from datetime import date
 # ============================================
 # SERIALIZER SOCIÉTÉ
 # ============================================
-class SocieteSerializer(serializers.ModelSerializer):
+class SocieteSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Societe
         fields = [
@@ -26,7 +28,7 @@ class SocieteSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER CIRCUIT
 # ============================================
-class CircuitSerializer(serializers.ModelSerializer):
+class CircuitSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     departement_nom = serializers.CharField(source='departement.nom', read_only=True)
     
     class Meta:
@@ -40,7 +42,7 @@ class CircuitSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER DÉPARTEMENT
 # ============================================
-class DepartementSerializer(serializers.ModelSerializer):
+class DepartementSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     circuits = CircuitSerializer(many=True, read_only=True)
     label_complet = serializers.SerializerMethodField()
     
@@ -59,16 +61,17 @@ class DepartementSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER SERVICE
 # ============================================
-class ServiceSerializer(serializers.ModelSerializer):
+class ServiceSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     responsable_info = serializers.SerializerMethodField(read_only=True)
     
     class Meta:
         model = Service
         fields = [
             'id', 'nom', 'societe', 'description', 'responsable',
-            'responsable_info', 'parent_service', 'actif', 'date_creation'
+            'responsable_info', 'actif', 'date_creation'
         ]
         read_only_fields = ['date_creation']
+        select_related = ['responsable']
     
     def get_responsable_info(self, obj):
         if obj.responsable:
@@ -78,7 +81,7 @@ class ServiceSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER GRADE
 # ============================================
-class GradeSerializer(serializers.ModelSerializer):
+class GradeSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Grade
         fields = ['id', 'nom', 'societe', 'ordre', 'actif', 'date_creation']
@@ -87,7 +90,7 @@ class GradeSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER TYPE ACCÈS
 # ============================================
-class TypeAccesSerializer(serializers.ModelSerializer):
+class TypeAccesSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = TypeAcces
         fields = ['id', 'nom', 'description', 'actif']
@@ -95,7 +98,7 @@ class TypeAccesSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER OUTIL TRAVAIL
 # ============================================
-class OutilTravailSerializer(serializers.ModelSerializer):
+class OutilTravailSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = OutilTravail
         fields = ['id', 'nom', 'description', 'actif']
@@ -103,7 +106,7 @@ class OutilTravailSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER CRÉNEAU TRAVAIL
 # ============================================
-class CreneauTravailSerializer(serializers.ModelSerializer):
+class CreneauTravailSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = CreneauTravail
         fields = [
@@ -116,7 +119,7 @@ class CreneauTravailSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER ÉQUIPEMENT
 # ============================================
-class EquipementSerializer(serializers.ModelSerializer):
+class EquipementSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Equipement
         fields = [
@@ -128,7 +131,7 @@ class EquipementSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER TYPE APPLICATION ACCÈS
 # ============================================
-class TypeApplicationAccesSerializer(serializers.ModelSerializer):
+class TypeApplicationAccesSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = TypeApplicationAcces
         fields = ['id', 'nom', 'description', 'actif']
@@ -136,7 +139,7 @@ class TypeApplicationAccesSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER SALARIÉ (SIMPLE)
 # ============================================
-class SalarieSerializer(serializers.ModelSerializer):
+class SalarieSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer pour Salarie avec support multiple départements (M2M)
     """
@@ -184,7 +187,7 @@ class SalarieSerializer(serializers.ModelSerializer):
 # ============================================
 # 🎯 SERIALIZER ÉQUIPEMENT INSTANCE (À JOUR)
 # ============================================
-class EquipementInstanceSerializer(serializers.ModelSerializer):
+class EquipementInstanceSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer pour les instances d'équipement affectées aux salariés
     Retourne les détails complets de chaque équipement attribué
@@ -237,6 +240,7 @@ class EquipementInstanceSerializer(serializers.ModelSerializer):
             'etat_display',
             'duree_utilisation'
         ]
+        select_related = ['salarie']
 
     def get_salarie_nom(self, obj):
         """Retourne le nom complet du salarié"""
@@ -256,7 +260,7 @@ class EquipementInstanceSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER ACCÈS APPLICATION
 # ============================================
-class AccesApplicationSerializer(serializers.ModelSerializer):
+class AccesApplicationSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     application_display = serializers.CharField(source='get_type_application_display', read_only=True)
     
     class Meta:
@@ -270,7 +274,7 @@ class AccesApplicationSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER ACCÈS SALARIÉ
 # ============================================
-class AccesSalarieSerializer(serializers.ModelSerializer):
+class AccesSalarieSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     type_acces_nom = serializers.CharField(source='type_acces.nom', read_only=True)
     
     class Meta:
@@ -283,7 +287,7 @@ class AccesSalarieSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER HORAIRE SALARIÉ
 # ============================================
-class HoraireSalarieSerializer(serializers.ModelSerializer):
+class HoraireSalarieSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = HoraireSalarie
         fields = [
@@ -296,7 +300,7 @@ class HoraireSalarieSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER HISTORIQUE SALARIÉ
 # ============================================
-class HistoriqueSalarieSerializer(serializers.ModelSerializer):
+class HistoriqueSalarieSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     service_ancien_nom = serializers.CharField(source='service_ancien.nom', read_only=True)
     service_nouveau_nom = serializers.CharField(source='service_nouveau.nom', read_only=True)
     grade_ancien_nom = serializers.CharField(source='grade_ancien.nom', read_only=True)
@@ -314,7 +318,7 @@ class HistoriqueSalarieSerializer(serializers.ModelSerializer):
 # ============================================
 # 🎯 SERIALIZER SALARIÉ DÉTAIL (À JOUR)
 # ============================================
-class SalarieDetailSerializer(serializers.ModelSerializer):
+class SalarieDetailSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer COMPLET pour détail salarié avec toutes infos
     INCLUT les équipements affectés
@@ -360,6 +364,8 @@ class SalarieDetailSerializer(serializers.ModelSerializer):
             'date_creation', 'date_modification'
         ]
         read_only_fields = ['date_creation', 'date_modification', 'anciennete', 'statut_actuel']
+        select_related = ['responsable_direct', 'creneau_travail']
+        prefetch_related = ['departements']
 
     def get_responsable_nom(self, obj):
         if obj.responsable_direct:
@@ -379,7 +385,7 @@ class SalarieDetailSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER SALARIÉ LISTE
 # ============================================
-class SalarieListSerializer(serializers.ModelSerializer):
+class SalarieListSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer SIMPLE pour liste salariés (infos limitées)
     """
@@ -405,6 +411,7 @@ class SalarieListSerializer(serializers.ModelSerializer):
             'en_poste',
             'date_creation', 'date_modification'
 ]
+        select_related = ['creneau_travail']
 
     
     def get_anciennete(self, obj):
@@ -412,11 +419,18 @@ class SalarieListSerializer(serializers.ModelSerializer):
     
     def get_statut_actuel(self, obj):
         return obj.get_statut_actuel()
+    
+    def validate_responsable_direct(self, value):
+        """Refuse un responsable qui est le salarié lui-même ou l'un de ses subordonnés"""
+        from .hierarchy import is_in_subtree
+        if value is not None and self.instance is not None and is_in_subtree(self.instance.id, value.id):
+            raise serializers.ValidationError("Ce responsable créerait un cycle dans la hiérarchie.")
+        return value
 
 # ============================================
 # SERIALIZER SOLDE CONGÉ
 # ============================================
-class SoldeCongeSerializer(serializers.ModelSerializer):
+class SoldeCongeSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     salarie_info = serializers.CharField(source='salarie.matricule', read_only=True)
     
     class Meta:
@@ -430,7 +444,7 @@ class SoldeCongeSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER DEMANDE CONGÉ
 # ============================================
-class DemandeCongeSerializer(serializers.ModelSerializer):
+class DemandeCongeSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     salarie_info = serializers.SerializerMethodField(read_only=True)
     statut_display = serializers.CharField(source='get_statut_display', read_only=True)
     
@@ -444,6 +458,7 @@ class DemandeCongeSerializer(serializers.ModelSerializer):
             'rejete', 'date_rejet', 'motif_rejet', 'date_creation', 'date_modification'
         ]
         read_only_fields = ['date_creation', 'date_modification']
+        select_related = ['salarie']
     
     def get_salarie_info(self, obj):
         return f"{obj.salarie.prenom} {obj.salarie.nom} ({obj.salarie.matricule})"
@@ -451,7 +466,7 @@ class DemandeCongeSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER DEMANDE ACOMPTE
 # ============================================
-class DemandeAcompteSerializer(serializers.ModelSerializer):
+class DemandeAcompteSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     salarie_info = serializers.SerializerMethodField(read_only=True)
     
     class Meta:
@@ -461,6 +476,7 @@ class DemandeAcompteSerializer(serializers.ModelSerializer):
             'statut', 'valide_par_direct', 'date_validation_direct',
             'valide_par_service', 'date_validation_service', 'date_paiement'
         ]
+        select_related = ['salarie']
     
     def get_salarie_info(self, obj):
         return f"{obj.salarie.prenom} {obj.salarie.nom} ({obj.salarie.matricule})"
@@ -468,7 +484,7 @@ class DemandeAcompteSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER DEMANDE SORTIE
 # ============================================
-class DemandeSortieSerializer(serializers.ModelSerializer):
+class DemandeSortieSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     salarie_info = serializers.SerializerMethodField(read_only=True)
     
     class Meta:
@@ -478,6 +494,7 @@ class DemandeSortieSerializer(serializers.ModelSerializer):
             'heure_fin', 'motif', 'statut', 'valide_par_direct',
             'date_validation_direct', 'valide_par_service', 'date_validation_service'
         ]
+        select_related = ['salarie']
     
     def get_salarie_info(self, obj):
         return f"{obj.salarie.prenom} {obj.salarie.nom} ({obj.salarie.matricule})"
@@ -485,7 +502,7 @@ class DemandeSortieSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER TRAVAUX EXCEPTIONNELS
 # ============================================
-class TravauxExceptionnelsSerializer(serializers.ModelSerializer):
+class TravauxExceptionnelsSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     salarie_info = serializers.SerializerMethodField(read_only=True)
     
     class Meta:
@@ -497,6 +514,7 @@ class TravauxExceptionnelsSerializer(serializers.ModelSerializer):
             'date_validation_service', 'date_creation'
         ]
         read_only_fields = ['date_creation']
+        select_related = ['salarie']
     
     def get_salarie_info(self, obj):
         return f"{obj.salarie.prenom} {obj.salarie.nom} ({obj.salarie.matricule})"
@@ -504,7 +522,7 @@ class TravauxExceptionnelsSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER DOCUMENT SALARIÉ
 # ============================================
-class DocumentSalarieSerializer(serializers.ModelSerializer):
+class DocumentSalarieSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer pour documents avec visibilité par rôle
     """
@@ -519,6 +537,7 @@ class DocumentSalarieSerializer(serializers.ModelSerializer):
             'accessible_par_salarie', 'accessible_par_admin', 'accessible_par_rh',
             'accessible_par_daf', 'accessible_par_comptable'
         ]
+        select_related = ['salarie']
     
     def get_salarie_info(self, obj):
         return f"{obj.salarie.prenom} {obj.salarie.nom} ({obj.salarie.matricule})"
@@ -526,7 +545,7 @@ class DocumentSalarieSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER OUTIL FICHE POSTE
 # ============================================
-class OutilFichePosteSerializer(serializers.ModelSerializer):
+class OutilFichePosteSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     outil_nom = serializers.CharField(source='outil_travail.nom', read_only=True)
     
     class Meta:
@@ -536,7 +555,7 @@ class OutilFichePosteSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER AMÉLIORATION PROPOSÉE
 # ============================================
-class AmeliorationProposeeSerializer(serializers.ModelSerializer):
+class AmeliorationProposeeSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     salarie_info = serializers.SerializerMethodField(read_only=True)
     examinee_par_info = serializers.SerializerMethodField(read_only=True)
     
@@ -547,6 +566,7 @@ class AmeliorationProposeeSerializer(serializers.ModelSerializer):
             'description', 'raison', 'statut', 'date_proposition', 'date_examen',
             'examinee_par', 'examinee_par_info', 'priorite', 'responsables', 'deadline'
         ]
+        select_related = ['salarie_proposant', 'examinee_par']
     
     def get_salarie_info(self, obj):
         return f"{obj.salarie_proposant.prenom} {obj.salarie_proposant.nom}"
@@ -559,7 +579,7 @@ class AmeliorationProposeeSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER FICHE POSTE DÉTAIL
 # ============================================
-class FichePosteDetailSerializer(serializers.ModelSerializer):
+class FichePosteDetailSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     service_nom = serializers.CharField(source='service.nom', read_only=True)
     grade_nom = serializers.CharField(source='grade.nom', read_only=True)
     responsable_info = serializers.SerializerMethodField(read_only=True)
@@ -576,6 +596,7 @@ class FichePosteDetailSerializer(serializers.ModelSerializer):
             'date_creation', 'date_modification'
         ]
         read_only_fields = ['date_creation', 'date_modification']
+        select_related = ['responsable_service']
     
     def get_responsable_info(self, obj):
         if obj.responsable_service:
@@ -585,7 +606,7 @@ class FichePosteDetailSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER FICHE PARAMÈTRES USER
 # ============================================
-class FicheParametresUserSerializer(serializers.ModelSerializer):
+class FicheParametresUserSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
     
     class Meta:
@@ -599,7 +620,7 @@ class FicheParametresUserSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER RÔLE
 # ============================================
-class RoleSerializer(serializers.ModelSerializer):
+class RoleSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     nom_display = serializers.CharField(source='get_nom_display', read_only=True)
     
     class Meta:
@@ -614,7 +635,7 @@ class RoleSerializer(serializers.ModelSerializer):
 # ============================================
 # SERIALIZER IMPORT LOG
 # ============================================
-class ImportLogSerializer(serializers.ModelSerializer):
+class ImportLogSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """
     Sérializer pour les logs d'import
     """
@@ -625,8 +646,8 @@ class ImportLogSerializer(serializers.ModelSerializer):
         model = ImportLog
         fields = [
             'id', 'api_name', 'fichier_nom', 'total_lignes', 'lignes_succes',
-            'lignes_erreur', 'statut', 'taux_succes', 'details_erreurs',
-            'cree_par', 'cree_par_username', 'date_creation', 'date_modification'
+            'lignes_erreur', 'lignes_inchangees', 'statut', 'taux_succes', 'details_erreurs',
+            'empreinte_fichier', 'cree_par', 'cree_par_username', 'date_creation', 'date_modification'
         ]
         read_only_fields = ['id', 'date_creation', 'date_modification', 'taux_succes']
     
@@ -635,13 +656,33 @@ class ImportLogSerializer(serializers.ModelSerializer):
         Calcule et retourne le taux de succès en %
         """
         return obj.get_taux_succes()
+
+
+class ImportLogListSerializer(ImportLogSerializer):
+    """
+    Sérializer des listes de logs d'import : sans details_erreurs
+    (colonne lourde, différée dans le queryset)
+    """
+
+    class Meta(ImportLogSerializer.Meta):
+        fields = [field for field in ImportLogSerializer.Meta.fields if field != 'details_erreurs']
+
+
+class ImportLogErreurSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Sérializer d'une classe d'erreurs d'import (message + plages de lignes)
+    """
+
+    class Meta:
+        model = ImportLogErreur
+        fields = ['id', 'message', 'nombre', 'premiere_ligne', 'lignes']
 # Dans serializers.py - Ajoute cette nouvelle serializer
 
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Salarie, Role
 
-class UserMeSerializer(serializers.ModelSerializer):
+class UserMeSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer pour l'endpoint /api/me/"""
     
     role = serializers.SerializerMethodField()
@@ -707,7 +748,7 @@ class UserMeSerializer(serializers.ModelSerializer):
         return None
 # À la FIN de serializers.py
 
-class UserMeSerializer(serializers.ModelSerializer):
+class UserMeSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer pour l'endpoint /api/me/"""
     
     role = serializers.SerializerMethodField()
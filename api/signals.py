@@ -2,71 +2,133 @@
 # SIGNALS.PY - CRÉER USER AUTOMATIQUEMENT QUAND ON CRÉE UN SALARIE
 # ============================================================================
 
-from django.db.models.signals import post_save
+import logging
+
+from django.db.models.signals import post_save, post_init, pre_delete, post_delete
 from django.dispatch import receiver
-from django.contrib.auth.models import User, Group
-from .models import Salarie, FicheParametresUser
+from . import provisioning
+from .models import Salarie, Service
+from .hierarchy import closure_attach
+from .team_scope import invalidate_team_scopes
+from .table_versions import bump_table_version, is_versioned_write
+
+logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=Salarie)
-def create_user_for_salarie(sender, instance, created, **kwargs):
+def create_user_for_salarie(sender, instance, created, raw=False, **kwargs):
     """
     Signal: Crée automatiquement un User quand on crée un Salarie
     
     ✅ Username = matricule du salarié
     ✅ Email = email professionnel du salarié
-    ✅ Password = aléatoire (à changer)
+    ✅ Password = temporaire (hash précalculé, à changer)
     ✅ Group = 'salarie' par défaut
     ✅ Assigne les paramètres utilisateur
+    
+    Dans un bloc deferred_provisioning() (imports), la création est
+    regroupée en masse à la sortie du bloc (voir api/provisioning.py).
+    """
+    if raw or not created or instance.user_id:
+        return
+    if provisioning.is_deferred():
+        provisioning.defer(instance, created=True)
+        return
+    try:
+        provisioning.provision_users([instance])
+    except Exception as e:
+        logger.error(f"Erreur lors de la création du user pour {instance.matricule}: {str(e)}")
+
+
+@receiver(post_save, sender=Salarie)
+def update_user_for_salarie(sender, instance, created, raw=False, **kwargs):
     """
-    if created and not instance.user:  # Si nouveau salarié ET pas de user
-        try:
-            # 1️⃣ CRÉER LE USER
-            user = User.objects.create_user(
-                username=instance.matricule,  # Unique!
-                email=instance.mail_professionnel or f"{instance.matricule}@msi.tn",
-                first_name=instance.prenom,
-                last_name=instance.nom,
-                password='TempPassword2026!'  # À CHANGER!
-            )
-            
-            # 2️⃣ ASSIGNER LE GROUP 'salarie' PAR DÉFAUT
-            try:
-                salarie_group = Group.objects.get(name='salarie')
-                user.groups.add(salarie_group)
-                print(f"✅ {user.username} assigné au group 'salarie'")
-            except Group.DoesNotExist:
-                print(f"⚠️  Group 'salarie' n'existe pas! Crée-le d'abord.")
-            
-            # 3️⃣ LIER LE USER AU SALARIE
-            instance.user = user
-            instance.save(update_fields=['user'])
-            
-            # 4️⃣ CRÉER LES PARAMÈTRES UTILISATEUR
-            FicheParametresUser.objects.get_or_create(
-                user=user,
-                defaults={
-                    'theme': 'light',
-                    'langue': 'fr',
-                    'notifications_actives': True
-                }
-            )
-            
-            print(f"✅ User créé pour {instance.prenom} {instance.nom}")
-            print(f"   📧 Email: {user.email}")
-            print(f"   🔑 Password temporaire: TempPassword2026! (À CHANGER!)")
-            
-        except Exception as e:
-            print(f"❌ ERREUR lors de la création du user pour {instance.matricule}: {str(e)}")
+    Signal: Met à jour le User quand on modifie un Salarie, uniquement si
+    nom, prénom ou email professionnel ont réellement changé
+    """
+    if raw or created or not instance.user_id:
+        return
+    if provisioning.user_source_values(instance) == instance._user_source_initial:
+        return
+    instance._user_source_initial = provisioning.user_source_values(instance)
+    if provisioning.is_deferred():
+        provisioning.defer(instance, created=False)
+        return
+    provisioning.sync_users([instance])
+
+
+@receiver(post_init, sender=Salarie)
+def remember_user_source(sender, instance, **kwargs):
+    """Mémorise nom/prénom/email au chargement pour la détection des changements"""
+    instance._user_source_initial = provisioning.user_source_values(instance)
+
+
+# ============================================================================
+# HIÉRARCHIE - TABLE DE FERMETURE (voir api/hierarchy.py)
+# ============================================================================
+
+@receiver(post_init, sender=Salarie)
+def remember_responsable_direct(sender, instance, **kwargs):
+    """Mémorise responsable_direct/service au chargement (sans charger un champ différé)"""
+    instance._responsable_direct_initial = instance.__dict__.get('responsable_direct_id')
+    instance._service_initial = instance.__dict__.get('service_id')
 
 
 @receiver(post_save, sender=Salarie)
-def update_user_for_salarie(sender, instance, created, **kwargs):
+def update_hierarchie_for_salarie(sender, instance, created, **kwargs):
     """
-    Signal: Met à jour le User quand on modifie un Salarie
+    Signal: Met à jour la table de fermeture à la création ou quand
+    responsable_direct change
     """
-    if not created and instance.user:  # Si modification + user existe
-        instance.user.first_name = instance.prenom
-        instance.user.last_name = instance.nom
-        instance.user.email = instance.mail_professionnel or instance.user.email
-        instance.user.save()
-        print(f"✅ User {instance.matricule} mis à jour")
+    update_fields = kwargs.get('update_fields')
+    responsable_saved = created or update_fields is None or 'responsable_direct' in update_fields
+    service_saved = created or update_fields is None or 'service' in update_fields
+
+    responsable_changed = responsable_saved and (
+        created or instance.responsable_direct_id != instance._responsable_direct_initial
+    )
+    service_changed = service_saved and instance.service_id != instance._service_initial
+
+    if responsable_changed:
+        closure_attach(instance.id, instance.responsable_direct_id)
+    if responsable_changed or service_changed:
+        # Les périmètres "équipe" en cache ne sont plus à jour (api/team_scope.py)
+        invalidate_team_scopes()
+
+    if responsable_saved:
+        instance._responsable_direct_initial = instance.responsable_direct_id
+    if service_saved:
+        instance._service_initial = instance.service_id
+
+
+@receiver(pre_delete, sender=Salarie)
+def remember_subordonnes(sender, instance, **kwargs):
+    """Les subordonnés directs passeront à responsable_direct=NULL (SET_NULL sans signal)"""
+    instance._subordonnes_ids = list(instance.subordonnes.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Salarie)
+def detach_subordonnes(sender, instance, **kwargs):
+    """Signal: Les subordonnés d'un salarié supprimé deviennent des racines"""
+    for subordonne_id in getattr(instance, '_subordonnes_ids', []):
+        closure_attach(subordonne_id, None)
+    invalidate_team_scopes()
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidate_team_scopes_for_service(sender, instance, **kwargs):
+    """Signal: Un changement de Service.responsable modifie les périmètres équipe"""
+    invalidate_team_scopes()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_table_version_on_write(sender, update_fields=None, **kwargs):
+    """Signal: toute écriture d'une table versionnée change sa version (clés des caches dérivés)"""
+    if is_versioned_write(sender, update_fields):
+        bump_table_version(sender)
+
+
+# Sans effet de bord propre à la ligne : les imports en masse restent en
+# bulk_create/bulk_update et incrémentent la version eux-mêmes
+bump_table_version_on_write.bulk_safe = True
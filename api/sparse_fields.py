@@ -0,0 +1,55 @@
+# api/sparse_fields.py - CHAMPS À LA DEMANDE (?fields= / ?omit=)
+#
+#   GET /api/salaries/?fields=id,nom,prenom      seulement ces champs
+#   GET /api/salaries/?omit=photo,historique     tous sauf ceux-là
+#
+# Les champs non demandés sont retirés du serializer racine : leurs
+# SerializerMethodField ne sont pas appelés. Côté SQL, EagerLoadingMixin
+# (api/eager_loading.py) ne charge que les relations et colonnes des
+# champs gardés. Lecture seule (GET/HEAD/OPTIONS) : les écritures valident
+# toujours le serializer complet. Les noms inconnus sont ignorés.
+
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def _names(value):
+    return {name.strip() for name in value.split(',') if name.strip()} if value else set()
+
+
+def requested_fields(request, field_names):
+    """
+    Noms de champs à garder parmi `field_names` (dans leur ordre), ou None
+    si la requête ne restreint rien (ou ne garderait aucun champ connu).
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    params = getattr(request, 'query_params', request.GET)
+    only = _names(params.get(FIELDS_PARAM))
+    omit = _names(params.get(OMIT_PARAM))
+    if not only and not omit:
+        return None
+    keep = tuple(name for name in field_names if (not only or name in only) and name not in omit)
+    return keep or None
+
+
+class SparseFieldsMixin:
+    """
+    Serializer dont les champs de sortie suivent ?fields= / ?omit=. Ne
+    s'applique qu'au serializer racine de la réponse, pas aux imbriqués.
+    """
+
+    @cached_property
+    def fields(self):
+        fields = super().fields
+        parent = self.parent.parent if isinstance(self.parent, serializers.ListSerializer) else self.parent
+        if parent is None:
+            keep = requested_fields(self.context.get('request'), fields.keys())
+            if keep is not None:
+                for name in set(fields.keys()).difference(keep):
+                    fields.pop(name)
+        return fields
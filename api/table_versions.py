@@ -0,0 +1,80 @@
+# api/table_versions.py - COMPTEURS DE VERSION PAR TABLE
+#
+# Un compteur par modèle, incrémenté à chaque écriture (signals post_save /
+# post_delete, et explicitement par les écritures en masse qui les
+# contournent). Sert de clé aux caches dérivés du contenu d'une table
+# (templates d'import...) : pas d'invalidation à gérer, la clé change.
+#
+# L'incrément a lieu à la validation de la transaction (ATOMIC_REQUESTS) :
+# incrémenté avant, un lecteur concurrent pourrait mettre en cache
+# l'ancien contenu sous la nouvelle version, jusqu'à la prochaine écriture.
+
+from functools import lru_cache
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+
+from .caching import bump_counter
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+VERSION_KEY = 'table_version:{}'
+
+APP_LABEL = 'api'
+
+# Colonnes lues par aucun cache dérivé : les écrire seules ne change pas la
+# version (last_login : à chaque connexion, UPDATE_LAST_LOGIN de SIMPLE_JWT)
+UNVERSIONED_FIELDS = frozenset({'last_login'})
+
+
+def _key(Model):
+    return VERSION_KEY.format(Model._meta.label_lower)
+
+
+@lru_cache(maxsize=None)
+def versioned_models():
+    """
+    Modèles dont une version est lue : ceux de l'app (ETag des listes, paquet
+    de référence, templates d'import de n'importe quel modèle) et les modèles
+    d'autres apps qu'ils référencent (User par Salarie.user...).
+    """
+    models = set(apps.get_app_config(APP_LABEL).get_models())
+    for Model in list(models):
+        for field in Model._meta.fields + Model._meta.many_to_many:
+            if field.is_relation and field.related_model is not None:
+                models.add(field.related_model)
+    return frozenset(models)
+
+
+def is_versioned_write(Model, update_fields=None):
+    """L'écriture change-t-elle le contenu lu sous la version de `Model` ?"""
+    if Model not in versioned_models():
+        return False
+    return not update_fields or not UNVERSIONED_FIELDS.issuperset(update_fields)
+
+
+# ============================================================================
+# LECTURE / INCRÉMENT
+# ============================================================================
+
+def table_versions(models):
+    """{modèle: version} en une lecture du cache (version 0 si jamais écrit)"""
+    keys = {_key(Model): Model for Model in models}
+    found = cache.get_many(list(keys))
+    return {Model: found.get(key, 0) for key, Model in keys.items()}
+
+
+def versions_signature(models):
+    """Chaîne stable 'label:version,...' à inclure dans une clé de cache"""
+    versions = table_versions(models)
+    return ','.join(f"{Model._meta.label_lower}:{versions[Model]}"
+                    for Model in sorted(versions, key=lambda M: M._meta.label_lower))
+
+
+def bump_table_version(Model):
+    """Marque la table de `Model` comme modifiée, à la validation de la transaction en cours"""
+    key = _key(Model)
+    transaction.on_commit(lambda: bump_counter(key))
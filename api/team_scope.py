@@ -0,0 +1,86 @@
+# api/team_scope.py - PÉRIMÈTRE "ÉQUIPE" D'UN RESPONSABLE
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Salarie
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+TEAM_SCOPE_PERMISSION = 'api.view_team_salaries'
+TEAM_SCOPE_TIMEOUT = 60 * 15
+
+# Compteur global : incrémenté à chaque changement de hiérarchie/service,
+# ce qui invalide d'un coup tous les périmètres mis en cache
+GENERATION_KEY = 'team_scope:generation'
+
+
+def _generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        generation = cache.get(GENERATION_KEY, 1)
+    return generation
+
+
+def invalidate_team_scopes():
+    """Invalide les périmètres de tous les responsables (appelé par les signals)"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+
+
+# ============================================================================
+# RÉSOLUTION
+# ============================================================================
+
+def compute_team_salarie_ids(salarie):
+    """
+    Ids visibles par un responsable, en une requête :
+    - lui-même et tous ses subordonnés (table de fermeture, tous niveaux)
+    - les membres des services dont il est Service.responsable
+    - les membres de son propre service
+    """
+    condition = Q(hierarchie_ancetres__ancetre_id=salarie['id']) | Q(service__responsable_id=salarie['id'])
+    if salarie['service_id']:
+        condition |= Q(service_id=salarie['service_id'])
+    return frozenset(Salarie.objects.filter(condition).values_list('id', flat=True).distinct())
+
+
+def get_team_salarie_ids(user):
+    """
+    Périmètre équipe de `user`, mis en cache par responsable.
+    Retourne un frozenset vide si l'utilisateur n'a pas de profil salarié.
+    """
+    key = f'team_scope:{_generation()}:{user.pk}'
+    ids = cache.get(key)
+    if ids is not None:
+        return ids
+
+    salarie = Salarie.objects.filter(user=user).values('id', 'service_id').first()
+    ids = compute_team_salarie_ids(salarie) if salarie else frozenset()
+    cache.set(key, ids, TEAM_SCOPE_TIMEOUT)
+    return ids
+
+
+def has_team_scope(user):
+    return user.has_perm(TEAM_SCOPE_PERMISSION)
+
+
+# ============================================================================
+# MIXIN VIEWSET
+# ============================================================================
+
+class TeamScopeMixin:
+    """
+    Fournit filter_team_scope() aux viewsets avec visibilité "équipe".
+    `team_scope_field` désigne le champ qui pointe vers le salarié.
+    """
+    team_scope_field = 'salarie'
+
+    def filter_team_scope(self, queryset):
+        ids = get_team_salarie_ids(self.request.user)
+        return queryset.filter(**{f'{self.team_scope_field}__in': ids})
@@ -1,3 +1,1376 @@
-from django.test import TestCase
+import codecs
+import gzip
+import importlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time as time_module
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from itertools import count
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import urlencode
 
-# Create your tests here.
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission, User, update_last_login
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import profiling, route_stats, search
+from .caching import HOT, LOCK_KEY
+from .hierarchy import build_org_chart, get_all_reports_ids, is_in_subtree, rebuild_closure
+from .import_engine import IMPORT_REGISTRY, ImportEngine, load_order
+from .import_readers import SNIFF_SIZE, TabularReader
+from .models import (
+    Societe, Service, Grade, Departement, TypeAcces, OutilTravail, Circuit,
+    Equipement, Salarie, AccesSalarie, HistoriqueSalarie, FichePoste,
+    OutilFichePoste, AmeliorationProposee, EquipementInstance, CreneauTravail,
+    HoraireSalarie, DocumentSalarie, DemandeConge, SoldeConge, TravauxExceptionnels,
+    TypeApplicationAcces, AccesApplication, FicheParametresUser, Role,
+    DemandeAcompte, DemandeSortie, ImportLog, ImportLogErreur, SalarieHierarchie
+)
+from .provisioning import deferred_provisioning, provision_users
+from .renderers import ORJSONParser, ORJSONRenderer
+from .search import SUGGEST_FIELDS, normalize_search_text, tokenize
+from .table_versions import table_versions
+from .throttles import InvitationRateThrottle
+from .team_scope import get_team_salarie_ids
+from .urls import router
+
+# ============================================================================
+# REQUÊTES PAR ROUTE DE LISTE : O(1) EN NOMBRE DE LIGNES
+# ============================================================================
+
+_numeros = count(1)
+
+
+def seed(rows):
+    """`rows` lignes liées entre elles pour chaque modèle exposé par le routeur"""
+    for _ in range(rows):
+        n = next(_numeros)
+        user = User.objects.create_user(f'eager{n}', password='x')
+        societe = Societe.objects.create(nom=f'Société {n}')
+        departement = Departement.objects.create(numero=f'{n:03d}', nom=f'Dép {n}', societe=societe)
+        Circuit.objects.create(nom=f'Circuit {n}', departement=departement)
+        creneau = CreneauTravail.objects.create(nom=f'Créneau {n}', societe=societe,
+                                                heure_debut=time(8), heure_fin=time(17))
+        grade = Grade.objects.create(nom=f'Grade {n}', societe=societe)
+        responsable = Salarie.objects.create(nom='Resp', prenom=f'{n}', matricule=f'R{n}', genre='M', societe=societe)
+        service = Service.objects.create(nom=f'Service {n}', societe=societe, responsable=responsable)
+        salarie = Salarie.objects.create(
+            nom='Sal', prenom=f'{n}', matricule=f'S{n}', genre='F', societe=societe, service=service,
+            grade=grade, responsable_direct=responsable, creneau_travail=creneau,
+        )
+        salarie.departements.add(departement)
+
+        equipement = Equipement.objects.create(nom=f'PC {n}', type_equipement='pc')
+        EquipementInstance.objects.create(equipement=equipement, salarie=salarie, date_affectation=date(2024, 1, 1))
+        type_acces = TypeAcces.objects.create(nom=f'Badge {n}')
+        AccesSalarie.objects.create(salarie=salarie, type_acces=type_acces)
+        type_application = TypeApplicationAcces.objects.create(nom=f'App {n}')
+        AccesApplication.objects.create(salarie=salarie, type_application=type_application)
+        HoraireSalarie.objects.create(salarie=salarie, date_debut=date(2024, 1, 1), heure_debut=time(9), heure_fin=time(18))
+        HistoriqueSalarie.objects.create(salarie=salarie, service_ancien=service, service_nouveau=service,
+                                         grade_ancien=grade, grade_nouveau=grade)
+
+        DemandeConge.objects.create(salarie=salarie, date_debut=date(2024, 2, 1), date_fin=date(2024, 2, 2))
+        SoldeConge.objects.create(salarie=salarie)
+        DemandeAcompte.objects.create(salarie=salarie, montant=100)
+        DemandeSortie.objects.create(salarie=salarie, date_sortie=date(2024, 3, 1), heure_debut=time(10), heure_fin=time(11))
+        TravauxExceptionnels.objects.create(salarie=salarie, date_travail=date(2024, 3, 2),
+                                            heure_debut=time(10), heure_fin=time(11))
+        DocumentSalarie.objects.create(salarie=salarie, fichier=ContentFile(b'x', name=f'doc{n}.txt'))
+
+        fiche = FichePoste.objects.create(titre=f'Fiche {n}', service=service, grade=grade, responsable_service=responsable)
+        outil = OutilTravail.objects.create(nom=f'Outil {n}')
+        OutilFichePoste.objects.create(fiche_poste=fiche, outil_travail=outil)
+        AmeliorationProposee.objects.create(fiche_poste=fiche, salarie_proposant=salarie, examinee_par=user)
+
+        FicheParametresUser.objects.create(user=user)
+        ImportLog.objects.create(api_name='salarie', cree_par=user)
+    for nom, _ in Role.ROLE_CHOICES[:rows]:
+        Role.objects.get_or_create(nom=nom)[0].utilisateurs.add(User.objects.last())
+
+
+def list_routes():
+    """(préfixe, basename) des routes du routeur qui ont une action list"""
+    return [
+        (prefix, basename) for prefix, viewset, basename in router.registry
+        if hasattr(viewset, 'list')
+    ]
+
+
+TEST_DIR = tempfile.mkdtemp(prefix='msi-tests-')
+# Caches propres aux tests : versions de tables et paquets ne se mélangent pas avec ceux du serveur de dev
+TEST_CACHES = {
+    alias: {**config, 'BACKEND': 'api.cache_backends.SQLiteCache',
+            'LOCATION': os.path.join(TEST_DIR, 'cache', f'{alias}.sqlite3')}
+    for alias, config in settings.CACHES.items()
+}
+
+
+def grant(user, codename):
+    """Permission métier sur Salarie (créées en production par api/create_permissions_groups.py)"""
+    permission, _ = Permission.objects.get_or_create(
+        codename=codename, content_type=ContentType.objects.get_for_model(Salarie), defaults={'name': codename},
+    )
+    user.user_permissions.add(permission)
+    return User.objects.get(pk=user.pk)
+
+
+def tearDownModule():
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@override_settings(MEDIA_ROOT=os.path.join(TEST_DIR, 'media'), CACHES=TEST_CACHES)
+class APITestCase(TestCase):
+    """Client API authentifié en superutilisateur, médias et caches isolés"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin-tests', 'admin@example.com', 'x')
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+
+class ListQueryCountTest(APITestCase):
+    """
+    Chaque route de liste de api/urls.py doit coûter le même nombre de
+    requêtes avec 2 ou 5 lignes par modèle : aucune relation chargée
+    ligne par ligne (voir api/eager_loading.py).
+    """
+
+    def query_counts(self):
+        counts = {}
+        for prefix, basename in list_routes():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(f'/api/{prefix}/')
+            self.assertEqual(response.status_code, 200, f'/api/{prefix}/: {response.content[:200]}')
+            counts[prefix] = len(queries)
+        return counts
+
+    def test_list_routes_constant_queries(self):
+        seed(2)
+        few = self.query_counts()
+        seed(3)
+        many = self.query_counts()
+        for prefix in few:
+            with self.subTest(route=prefix):
+                self.assertEqual(few[prefix], many[prefix], f'/api/{prefix}/: requêtes par ligne')
+
+
+# ============================================================================
+# CHAMPS À LA DEMANDE : ?fields= / ?omit= SUR CHAQUE ROUTE DE LISTE
+# ============================================================================
+
+def rows_of(response):
+    data = response.json()
+    return data['results'] if isinstance(data, dict) and 'results' in data else data
+
+
+class SparseFieldsTest(APITestCase):
+    """?fields= / ?omit= sur chaque route de liste (api/sparse_fields.py), SQL réduit compris"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        seed(2)
+
+    def test_fields_and_omit_on_every_list_route(self):
+        for prefix, _ in list_routes():
+            with self.subTest(route=prefix):
+                full = rows_of(self.client.get(f'/api/{prefix}/'))
+                if not isinstance(full, list) or not full:
+                    continue
+                first, *others = full[0]
+
+                response = self.client.get(f'/api/{prefix}/?fields={first}')
+                self.assertEqual(response.status_code, 200, f'/api/{prefix}/?fields={first}: {response.content[:300]}')
+                self.assertEqual([list(row) for row in rows_of(response)], [[first]] * len(full))
+
+                response = self.client.get(f'/api/{prefix}/?omit={first}')
+                self.assertEqual(response.status_code, 200, f'/api/{prefix}/?omit={first}: {response.content[:300]}')
+                self.assertEqual(list(rows_of(response)[0]), others)
+
+    def test_joined_relation_kept_with_only(self):
+        # ImportLogViewSet joint cree_par dans get_queryset : only() doit le garder
+        response = self.client.get('/api/import-logs/?fields=id')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(rows_of(response)[0]), ['id'])
+
+    def test_unknown_fields_ignored(self):
+        full = rows_of(self.client.get('/api/salaries/'))
+        self.assertEqual(rows_of(self.client.get('/api/salaries/?fields=inconnu')), full)
+
+    def test_fields_trim_queries(self):
+        with CaptureQueriesContext(connection) as full:
+            self.client.get('/api/salaries/')
+        with CaptureQueriesContext(connection) as sparse:
+            self.client.get('/api/salaries/?fields=id,nom')
+        self.assertLess(len(sparse), len(full))
+
+    def test_writes_ignore_fields(self):
+        societe = Societe.objects.first()
+        response = self.client.patch(f'/api/societes/{societe.pk}/?fields=id', {'nom': 'Renommée'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('nom', response.json())
+
+
+# ============================================================================
+# PROVISIONNEMENT DES COMPTES SALARIÉS
+# ============================================================================
+
+class ProvisioningTest(APITestCase):
+    """Comptes créés en masse sans mot de passe utilisable, activés par invitation (api/provisioning.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.societe = Societe.objects.create(nom='MSI')
+
+    def salaries(self, count, prefix):
+        return Salarie.objects.bulk_create([
+            Salarie(nom=f'Nom{i}', prenom=f'Prénom{i}', matricule=f'{prefix}{i}', genre='M', societe=self.societe)
+            for i in range(count)
+        ])
+
+    def test_created_salarie_gets_account_without_usable_password(self):
+        salarie = Salarie.objects.create(nom='Durand', prenom='Élodie', matricule='P1', genre='F', societe=self.societe)
+        salarie.refresh_from_db()
+        self.assertEqual(salarie.user.username, 'P1')
+        self.assertEqual(salarie.user.last_name, 'Durand')
+        self.assertFalse(salarie.user.has_usable_password())
+
+    def test_bulk_provisioning_constant_queries(self):
+        few, many = self.salaries(3, 'A'), self.salaries(12, 'B')
+        with CaptureQueriesContext(connection) as few_queries:
+            self.assertEqual(provision_users(few), 3)
+        with CaptureQueriesContext(connection) as many_queries:
+            self.assertEqual(provision_users(many), 12)
+        self.assertEqual(len(few_queries), len(many_queries))
+        self.assertEqual(User.objects.filter(username__startswith='B', profil_salarie__isnull=False).count(), 12)
+
+    def test_deferred_provisioning_syncs_changes_once(self):
+        with deferred_provisioning():
+            salarie = Salarie.objects.create(nom='Martin', prenom='Paul', matricule='D1', genre='M', societe=self.societe)
+            salarie.nom = 'Martin-Durand'
+            salarie.save()
+        self.assertEqual(User.objects.get(username='D1').last_name, 'Martin-Durand')
+
+    def test_invitation_sets_first_password_once(self):
+        salarie = Salarie.objects.create(nom='Petit', prenom='Lou', matricule='I1', genre='F', societe=self.societe)
+        lien = self.client.post(f'/api/salaries/{salarie.pk}/invitation/').json()
+        anonyme = APIClient()
+
+        faible = anonyme.post('/api/invitation/activer/', {**lien, 'password': '123'}, format='json')
+        self.assertEqual(faible.status_code, 400)
+        self.assertIn('password', faible.json())
+
+        ok = anonyme.post('/api/invitation/activer/', {**lien, 'password': 'Horizon-Bleu-42'}, format='json')
+        self.assertEqual(ok.status_code, 200)
+        self.assertTrue(User.objects.get(username='I1').check_password('Horizon-Bleu-42'))
+
+        rejoue = anonyme.post('/api/invitation/activer/', {**lien, 'password': 'Autre-Chose-99'}, format='json')
+        self.assertEqual(rejoue.status_code, 400)
+
+    def activer(self, lien, password='Horizon-Bleu-42'):
+        return APIClient().post('/api/invitation/activer/', {**lien, 'password': password}, format='json')
+
+    def test_invitation_expired(self):
+        salarie = Salarie.objects.create(nom='Blanc', prenom='Noé', matricule='I3', genre='M', societe=self.societe)
+        lien = self.client.post(f'/api/salaries/{salarie.pk}/invitation/').json()
+        plus_tard = datetime.now() + timedelta(seconds=settings.PASSWORD_RESET_TIMEOUT + 60)
+        with mock.patch.object(PasswordResetTokenGenerator, '_now', return_value=plus_tard):
+            response = self.activer(lien)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(User.objects.get(username='I3').has_usable_password())
+
+    def test_invitation_reused_after_login(self):
+        # Jeton lié au dernier login : un lien ancien ne sert plus une fois le compte utilisé
+        salarie = Salarie.objects.create(nom='Leroy', prenom='Ana', matricule='I4', genre='F', societe=self.societe)
+        lien = self.client.post(f'/api/salaries/{salarie.pk}/invitation/').json()
+        self.assertEqual(self.activer(lien).status_code, 200)
+        update_last_login(None, User.objects.get(username='I4'))
+        self.assertEqual(self.activer(lien, 'Autre-Chose-99').status_code, 400)
+        self.assertTrue(User.objects.get(username='I4').check_password('Horizon-Bleu-42'))
+
+    def test_invitation_activation_throttled(self):
+        lien = {'uid': 'MQ', 'token': 'faux-jeton'}
+        with mock.patch.object(InvitationRateThrottle, 'THROTTLE_RATES', {'invitation': '3/hour'}):
+            statuts = [self.activer(lien).status_code for _ in range(4)]
+        self.assertEqual(statuts, [400, 400, 400, 429])
+
+    def test_invitation_admin_only(self):
+        salarie = Salarie.objects.create(nom='Roux', prenom='Max', matricule='I2', genre='M', societe=self.societe)
+        self.client.force_authenticate(salarie.user)
+        self.assertEqual(self.client.post(f'/api/salaries/{salarie.pk}/invitation/').status_code, 403)
+
+
+# ============================================================================
+# VERSIONS DE TABLES
+# ============================================================================
+
+class TableVersionsTest(APITestCase):
+    """Versions incrémentées à la validation, seulement pour les tables lues (api/table_versions.py)"""
+
+    def version(self, Model):
+        return table_versions([Model])[Model]
+
+    def test_bump_after_commit(self):
+        before = self.version(Societe)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Societe.objects.create(nom='MSI')
+            self.assertEqual(self.version(Societe), before)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.version(Societe), before + 1)
+
+    def test_rolled_back_write_keeps_version(self):
+        before = self.version(Societe)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    Societe.objects.create(nom='Annulée')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.version(Societe), before)
+
+    def test_login_and_unversioned_tables_do_not_bump(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            update_last_login(None, self.admin)
+            Group.objects.create(name='Lecteurs')
+        self.assertEqual(callbacks, [])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.admin.first_name = 'Admin'
+            self.admin.save()
+        self.assertEqual(len(callbacks), 1)
+
+
+# ============================================================================
+# IMPORT : FICHIER IDENTIQUE NON REJOUÉ
+# ============================================================================
+
+def csv_upload(name, lines):
+    return SimpleUploadedFile(name, '\n'.join(lines).encode(), content_type='text/csv')
+
+
+class ImportIdempotencyTest(APITestCase):
+    """Empreinte du fichier (api/import_views.py) : un import réussi n'est pas rejoué, un partiel l'est"""
+
+    LINES = ['numero,nom,societe', '01,Ain,MSI', '02,Aisne,MSI']
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Societe.objects.create(nom='MSI')
+
+    def upload(self, lines):
+        return self.client.post('/api/import/upload/', {
+            'model': 'departement', 'file': csv_upload('departements.csv', lines),
+        }, format='multipart').json()
+
+    def test_identical_file_writes_nothing(self):
+        first = self.upload(self.LINES)
+        self.assertEqual(first['inserted'], 2)
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.upload(self.LINES)
+        self.assertTrue(second['deja_importe'])
+        self.assertEqual(second['log_id'], first['log_id'])
+        writes = [q['sql'] for q in queries if q['sql'].split()[0] in ('INSERT', 'UPDATE', 'DELETE')]
+        self.assertEqual(writes, [])
+
+        # Date affichée dans le fuseau local, pas en UTC
+        log = ImportLog.objects.get(pk=first['log_id'])
+        self.assertIn(f"{timezone.localtime(log.date_creation):%d/%m/%Y %H:%M}", second['warnings'][0]['warning'])
+
+    def test_partial_import_is_reapplied(self):
+        lines = self.LINES + ['03,Allier,Inconnue']
+        first = self.upload(lines)
+        self.assertEqual((first['inserted'], len(first['errors'])), (2, 1))
+        self.assertEqual(ImportLog.objects.get(pk=first['log_id']).statut, 'partiel')
+
+        Societe.objects.create(nom='Inconnue')
+        second = self.upload(lines)
+        self.assertNotIn('deja_importe', second)
+        self.assertEqual((second['inserted'], second['updated'], second['unchanged']), (1, 0, 2))
+        self.assertIn('partiellement', second['warnings'][-1]['warning'])
+        self.assertTrue(self.upload(lines)['deja_importe'])
+
+
+class ImportErrorsSummaryTest(APITestCase):
+    """Réponse d'upload bornée : erreurs regroupées par message, liste complète sur /errors/"""
+
+    def test_upload_returns_grouped_errors_and_link(self):
+        Societe.objects.create(nom='MSI')
+        lines = ['numero,nom,societe,nombre_circuits', '001,Ain,MSI,1']
+        lines += [f'{n:03d},Dép {n},Inconnue,1' for n in range(2, 32)]
+        lines += [f'{n:03d},Dép {n},MSI,beaucoup' for n in range(32, 35)]
+        response = self.client.post('/api/import/upload/', {
+            'model': 'departement', 'file': csv_upload('departements.csv', lines),
+        }, format='multipart').json()
+
+        self.assertEqual(response['inserted'], 1)
+        self.assertEqual(response['error_count'], 33)
+        self.assertEqual(len(response['errors']), ImportLogErreur.APERCU)
+        self.assertEqual(response['error_class_count'], 2)
+        self.assertEqual([(c['nombre'], c['lignes']) for c in response['error_classes']],
+                         [(30, [[3, 32]]), (3, [[33, 35]])])
+
+        self.assertTrue(response['errors_url'].endswith(f"/api/import-logs/{response['log_id']}/errors/"))
+        classes = rows_of(self.client.get(response['errors_url']))
+        self.assertEqual([c['nombre'] for c in classes], [30, 3])
+        self.assertEqual(ImportLogErreur.objects.filter(import_log_id=response['log_id']).count(), 2)
+
+
+# ============================================================================
+# DONNÉES DE RÉFÉRENCE : manage.py loadreference
+# ============================================================================
+
+class LoadReferenceTest(APITestCase):
+    """Société des lignes de référence explicite ou unique, version déjà appliquée non rejouée"""
+
+    def load(self, *args):
+        out = StringIO()
+        call_command('loadreference', *args, stdout=out)
+        return out.getvalue()
+
+    def test_societe_required_unless_single(self):
+        with self.assertRaisesMessage(CommandError, 'Aucune société'):
+            self.load()
+        Societe.objects.create(nom='MSI')
+        Societe.objects.create(nom='Autre')
+        with self.assertRaisesMessage(CommandError, 'Plusieurs sociétés'):
+            self.load()
+        self.assertFalse(Departement.objects.exists())
+        self.assertFalse(ImportLog.objects.exists())
+
+    def test_single_societe_default_and_replay(self):
+        societe = Societe.objects.create(nom='MSI')
+        self.load()
+        loaded = Departement.objects.count()
+        self.assertGreater(loaded, 90)
+        self.assertEqual(Departement.objects.filter(societe=societe).count(), loaded)
+
+        self.assertIn('déjà appliqué', self.load())
+        self.assertEqual(ImportLog.objects.count(), 1)
+
+# ============================================================================
+# MESURES PAR REQUÊTE : Server-Timing et percentiles par route
+# ============================================================================
+
+class PerformanceTest(APITestCase):
+    """Server-Timing (api/middleware.py), cumul par route versé hors requête (api/route_stats.py)"""
+
+    def setUp(self):
+        super().setUp()
+        # Caches vidés : les routes déjà inscrites par ce processus doivent l'être à nouveau
+        route_stats._registered.clear()
+
+    def test_server_timing_header(self):
+        Societe.objects.create(nom='MSI')
+        timing = self.client.get('/api/societes/')['Server-Timing']
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="SQL x\d+"')
+        self.assertIn('ser;dur=', timing)
+        self.assertRegex(timing, r'total;dur=[\d.]+$')
+
+    def test_record_does_not_touch_cache(self):
+        with mock.patch.object(route_stats, 'caches') as cache:
+            route_stats.record('GET:test-memoire', 12.0, 3, False)
+        self.assertFalse(cache.mock_calls)
+
+    def test_routes_aggregated_by_flush(self):
+        for _ in range(3):
+            self.client.get('/api/societes/')
+        route_stats.flush()
+        rows = {row['route']: row for row in self.client.get('/api/performance/').json()['routes']}
+        self.assertEqual(rows['GET:societe-list']['count'], 3)
+
+    def test_register_does_not_wait_for_lock(self):
+        cache = caches[HOT]
+        lock = LOCK_KEY.format(f"{route_stats._day_prefix(date.today())}:routes")
+        cache.add(lock, 1, 5)
+        route_stats.record('GET:test-verrou', 12.0, 1, False)
+        started = time_module.perf_counter()
+        route_stats.flush()
+        self.assertLess(time_module.perf_counter() - started, 0.2)
+        self.assertNotIn('GET:test-verrou', [row['route'] for row in route_stats.stats()])
+
+        # Verrou libéré : inscrite au versement suivant, compteurs déjà versés compris
+        cache.delete(lock)
+        route_stats.record('GET:test-verrou', 12.0, 1, False)
+        rows = {row['route']: row for row in route_stats.stats()}
+        self.assertEqual(rows['GET:test-verrou']['count'], 2)
+
+# ============================================================================
+# RECHERCHE ET AUTOCOMPLÉTION DES SALARIÉS
+# ============================================================================
+
+class SalarieSearchTest(APITestCase):
+    """?search= et /suggest/ (api/search.py, repli LIKE hors PostgreSQL)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        societe = Societe.objects.create(nom='MSI')
+        for nom, prenom, matricule in [
+            ('Dupont', 'Jean', 'M100'), ('Dupond', 'Élodie', 'M101'),
+            ('Martin', 'Jean-Pierre', 'DUPONT'), ('Bernard', 'Lucie', 'M103'),
+        ]:
+            Salarie.objects.create(nom=nom, prenom=prenom, matricule=matricule, genre='M', societe=societe)
+
+    def search(self, query, **params):
+        response = self.client.get('/api/salaries/', {'search': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row['matricule'] for row in rows_of(response)]
+
+    def test_normalization(self):
+        self.assertEqual(normalize_search_text('  Élodie ', None, 'DUPOND'), 'elodie dupond')
+        self.assertEqual(tokenize('Jean-Pierre  é.martin@msi.fr'), ['jean-pierre', 'e.martin@msi.fr'])
+
+    def test_accents_and_case_ignored(self):
+        self.assertEqual(self.search('elodie'), ['M101'])
+        self.assertEqual(self.search('ÉLODIE dupond'), ['M101'])
+
+    def test_every_term_required(self):
+        self.assertEqual(self.search('jean dupont'), ['M100', 'DUPONT'])
+        self.assertEqual(self.search('elodie dupont'), [])
+
+    def test_ranked_by_relevance_unless_ordering(self):
+        # Matricule exact, puis nom commençant par le terme
+        self.assertEqual(self.search('dupont'), ['DUPONT', 'M100'])
+        self.assertEqual(self.search('dupont', ordering='nom'), ['M100', 'DUPONT'])
+        self.assertEqual(self.search('dupont', ordering='-nom'), ['DUPONT', 'M100'])
+
+    def test_suggest(self):
+        rows = self.client.get('/api/salaries/suggest/', {'q': 'dup'}).json()
+        self.assertEqual({row['matricule'] for row in rows}, {'M100', 'M101', 'DUPONT'})
+        self.assertEqual(set(rows[0]), set(SUGGEST_FIELDS))
+
+    def test_trigram_threshold_applied_on_postgresql(self):
+        # Requête seulement construite : l'opérateur % lit pg_trgm.similarity_threshold, fixé avant
+        with mock.patch.object(search, '_is_postgresql', return_value=True), \
+                mock.patch.object(search, 'connection') as fake_connection:
+            fake_connection.in_atomic_block = True
+            search.search_salaries(Salarie.objects.all(), 'dupnt')
+        execute = fake_connection.cursor.return_value.__enter__.return_value.execute
+        execute.assert_called_once_with(
+            "SELECT set_config('pg_trgm.similarity_threshold', %s, %s)", [str(search.TRIGRAM_THRESHOLD), True])
+
+        self.assertEqual(len(self.client.get('/api/salaries/suggest/', {'q': 'dup', 'limit': 1}).json()), 1)
+        self.assertEqual(self.client.get('/api/salaries/suggest/', {'q': 'd'}).json(), [])
+        self.assertEqual(self.client.get('/api/salaries/suggest/', {'q': 'dup', 'limit': 'x'}).status_code, 400)
+
+    def test_suggest_within_team_scope(self):
+        responsable = Salarie.objects.get(matricule='M100')
+        subordonne = Salarie.objects.get(matricule='M101')
+        subordonne.responsable_direct = responsable
+        subordonne.save()
+        self.client.force_authenticate(grant(responsable.user, 'view_team_salaries'))
+        rows = self.client.get('/api/salaries/suggest/', {'q': 'dup'}).json()
+        self.assertEqual({row['matricule'] for row in rows}, {'M100', 'M101'})
+
+
+# ============================================================================
+# ORGANIGRAMME ET TABLE DE FERMETURE
+# ============================================================================
+
+class OrgChartTest(APITestCase):
+    """Organigramme / chaîne hiérarchique (CTE récursives) et table de fermeture (api/hierarchy.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        societe = Societe.objects.create(nom='MSI')
+
+        def salarie(matricule, responsable=None):
+            return Salarie.objects.create(nom=matricule, prenom='X', matricule=matricule, genre='M',
+                                          societe=societe, responsable_direct=responsable)
+
+        # R -> A -> C, R -> B -> D -> E
+        cls.r = salarie('R')
+        cls.a, cls.b = salarie('A', cls.r), salarie('B', cls.r)
+        cls.c, cls.d = salarie('C', cls.a), salarie('D', cls.b)
+        cls.e = salarie('E', cls.d)
+
+    def organigramme(self, salarie, **params):
+        response = self.client.get(f'/api/salaries/{salarie.pk}/organigramme/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_tree_and_headcounts(self):
+        chart = self.organigramme(self.r)
+        self.assertEqual((chart['effectif'], chart['profondeur_max'], chart['cycles']), (5, 3, []))
+        racine = chart['racine']
+        self.assertEqual(racine['effectif_direct'], 2)
+        branches = {node['matricule']: node for node in racine['subordonnes']}
+        self.assertEqual((branches['A']['effectif_total'], branches['B']['effectif_total']), (1, 2))
+
+    def test_depth_limit(self):
+        chart = self.organigramme(self.r, profondeur=1)
+        self.assertEqual((chart['effectif'], chart['profondeur_max']), (2, 1))
+        self.assertTrue(all(not node['subordonnes'] for node in chart['racine']['subordonnes']))
+        self.assertEqual(self.client.get(f'/api/salaries/{self.r.pk}/organigramme/?profondeur=x').status_code, 400)
+
+    def test_single_query_whatever_the_size(self):
+        with CaptureQueriesContext(connection) as queries:
+            build_org_chart(self.r.pk)
+        self.assertEqual(len(queries), 1)
+
+    def test_cycle_is_cut_and_reported(self):
+        # Cycle R -> ... -> E -> R créé sans passer par les signals
+        Salarie.objects.filter(pk=self.r.pk).update(responsable_direct=self.e)
+        chart = self.organigramme(self.r)
+        self.assertEqual(chart['cycles'], [{'responsable': self.e.pk, 'salarie': self.r.pk}])
+        self.assertEqual(chart['effectif'], 5)
+
+        chaine = self.client.get(f'/api/salaries/{self.c.pk}/chaine_hierarchique/').json()
+        self.assertTrue(chaine['cycle_detecte'])
+        self.assertEqual([node['matricule'] for node in chaine['chaine']], ['C', 'A', 'R', 'E', 'D', 'B'])
+
+    def test_closure_follows_moves(self):
+        self.assertEqual(set(get_all_reports_ids(self.b.pk)), {self.d.pk, self.e.pk})
+        self.d.responsable_direct = self.a
+        self.d.save()
+        self.assertEqual(set(get_all_reports_ids(self.a.pk)), {self.c.pk, self.d.pk, self.e.pk})
+        self.assertEqual(set(get_all_reports_ids(self.b.pk)), set())
+        self.assertTrue(is_in_subtree(self.r.pk, self.e.pk))
+
+        def closure():
+            return set(SalarieHierarchie.objects.values_list('ancetre_id', 'descendant_id', 'profondeur'))
+
+        avant = closure()
+        rebuild_closure()
+        self.assertEqual(closure(), avant)
+
+    def test_closure_refuses_cycle(self):
+        # A sous E (son propre subordonné) : sous-arbre de A laissé détaché, pas de boucle
+        self.a.responsable_direct = self.c
+        self.a.save()
+        self.assertFalse(is_in_subtree(self.r.pk, self.a.pk))
+        self.assertEqual(set(get_all_reports_ids(self.a.pk)), {self.c.pk})
+        self.assertFalse(SalarieHierarchie.objects.filter(ancetre_id=F('descendant_id'), profondeur__gt=0).exists())
+
+    def closure(self):
+        return set(SalarieHierarchie.objects.values_list('ancetre_id', 'descendant_id', 'profondeur'))
+
+    def assert_rebuild_cuts_cycle(self, rebuild):
+        avant = self.closure()
+        # Cycle R -> B -> D -> E -> R hors signals : le lien du plus petit id (R) est ignoré
+        Salarie.objects.filter(pk=self.r.pk).update(responsable_direct=self.e)
+        with self.assertLogs('api.hierarchy', 'WARNING'):
+            rebuild()
+        self.assertEqual(self.closure(), avant)
+        liens = {(ancetre, descendant) for ancetre, descendant, profondeur in self.closure() if profondeur}
+        self.assertFalse({(descendant, ancetre) for ancetre, descendant in liens} & liens)
+
+    def test_rebuild_cuts_cycles(self):
+        self.assert_rebuild_cuts_cycle(rebuild_closure)
+
+    def test_migration_cuts_cycles(self):
+        migration = importlib.import_module('api.migrations.0008_salarie_hierarchie')
+
+        def populate():
+            SalarieHierarchie.objects.all().delete()
+            migration.populate_hierarchie(django_apps, None)
+
+        self.assert_rebuild_cuts_cycle(populate)
+
+
+# ============================================================================
+# PÉRIMÈTRE ÉQUIPE DES RESPONSABLES
+# ============================================================================
+
+class TeamScopeTest(APITestCase):
+    """view_team_salaries : hiérarchie tous niveaux + services dirigés + propre service (api/team_scope.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        societe = Societe.objects.create(nom='MSI')
+        cls.service, cls.dirige = (Service.objects.create(nom=nom, societe=societe) for nom in ('Exploitation', 'Paie'))
+
+        def salarie(matricule, **fields):
+            return Salarie.objects.create(nom=matricule, prenom='X', matricule=matricule, genre='M',
+                                          societe=societe, **fields)
+
+        cls.lead = salarie('LEAD', service=cls.service)
+        cls.sub1 = salarie('SUB1', responsable_direct=cls.lead)
+        cls.sub2 = salarie('SUB2', responsable_direct=cls.sub1)
+        cls.collegue = salarie('COLL', service=cls.service)
+        cls.paie = salarie('PAIE', service=cls.dirige)
+        cls.autre = salarie('AUTRE')
+        cls.dirige.responsable = cls.lead
+        cls.dirige.save()
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(grant(self.lead.user, 'view_team_salaries'))
+
+    def visible(self):
+        return {row['matricule'] for row in rows_of(self.client.get('/api/salaries/'))}
+
+    def test_scope(self):
+        self.assertEqual(self.visible(), {'LEAD', 'SUB1', 'SUB2', 'COLL', 'PAIE'})
+        self.assertEqual(self.client.get(f'/api/salaries/{self.autre.pk}/').status_code, 404)
+
+    def test_scope_follows_hierarchy_and_service_changes(self):
+        self.visible()
+        self.sub1.responsable_direct = None
+        self.sub1.save()
+        self.assertEqual(self.visible(), {'LEAD', 'COLL', 'PAIE'})
+
+        self.dirige.responsable = None
+        self.dirige.save()
+        self.assertEqual(self.visible(), {'LEAD', 'COLL'})
+
+    def test_scope_cached_per_user(self):
+        self.visible()
+        with CaptureQueriesContext(connection) as queries:
+            ids = get_team_salarie_ids(self.lead.user)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(len(ids), 5)
+
+    def test_scope_applies_to_related_lists(self):
+        for salarie in (self.sub2, self.autre):
+            DemandeConge.objects.create(salarie=salarie, date_debut=date(2024, 2, 1), date_fin=date(2024, 2, 2))
+        response = self.client.get('/api/demandes-conge/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['salarie'] for row in rows_of(response)], [self.sub2.pk])
+
+    def test_documents_outside_team_scope(self):
+        # Fiches de paie, contrats : réservés à view_all_documents, pas au responsable
+        document = DocumentSalarie.objects.create(salarie=self.sub1, type_document='fiche_paie',
+                                                  fichier=ContentFile(b'%PDF', name='paie.pdf'))
+        self.assertEqual(self.client.get('/api/documents-salarie/').status_code, 403)
+        self.assertEqual(self.client.get(f'/api/documents-salarie/{document.pk}/').status_code, 403)
+
+
+# ============================================================================
+# CALENDRIER : ANNIVERSAIRES ET ANCIENNETÉ
+# ============================================================================
+
+class CalendrierTest(APITestCase):
+    """/api/salaries/calendrier/ : clés jour/mois, passage d'année, 29 février (api/calendrier.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        societe = Societe.objects.create(nom='MSI')
+        for matricule, naissance, embauche, statut in [
+            ('NOEL', date(1990, 12, 25), None, 'actif'),
+            ('JANV', date(1985, 1, 5), None, 'actif'),
+            ('ETE', date(1980, 6, 1), None, 'actif'),
+            ('ANC', None, date(2020, 12, 31), 'actif'),
+            ('NOUV', None, date(2026, 12, 28), 'actif'),
+            ('BISS', date(2000, 2, 29), None, 'actif'),
+            ('PARTI', date(1990, 12, 26), None, 'inactif'),
+        ]:
+            Salarie.objects.create(nom=matricule, prenom='X', matricule=matricule, genre='M', societe=societe,
+                                   date_naissance=naissance, date_embauche=embauche, statut=statut)
+
+    def calendrier(self, **params):
+        response = self.client.get('/api/salaries/calendrier/', params)
+        self.assertEqual(response.status_code, 200)
+        return [(row['matricule'], row['type_evenement'], row['date'], row['jours_restants'], row['annees'])
+                for row in rows_of(response)]
+
+    def test_year_wrap_around(self):
+        self.assertEqual(self.calendrier(debut='2026-12-20', jours=30), [
+            ('NOEL', 'anniversaire', '2026-12-25', 5, 36),
+            ('ANC', 'anciennete', '2026-12-31', 11, 6),
+            ('JANV', 'anniversaire', '2027-01-05', 16, 42),
+        ])
+
+    def test_type_filter(self):
+        self.assertEqual([row[0] for row in self.calendrier(debut='2026-12-20', jours=30, type='anciennete')], ['ANC'])
+        self.assertEqual(self.client.get('/api/salaries/calendrier/', {'type': 'fete'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/salaries/calendrier/', {'debut': '20/12/2026'}).status_code, 400)
+
+    def test_29_february(self):
+        self.assertEqual(self.calendrier(debut='2027-02-20', jours=10),
+                         [('BISS', 'anniversaire', '2027-02-28', 8, 27)])
+        self.assertEqual(self.calendrier(debut='2028-02-20', jours=10),
+                         [('BISS', 'anniversaire', '2028-02-29', 9, 28)])
+
+    def test_keys_follow_updates(self):
+        salarie = Salarie.objects.get(matricule='ETE')
+        salarie.date_naissance = date(1980, 12, 22)
+        salarie.save(update_fields=['date_naissance'])
+        self.assertEqual(Salarie.objects.get(pk=salarie.pk).cle_naissance, 1222)
+        self.assertIn('ETE', [row[0] for row in self.calendrier(debut='2026-12-20', jours=5)])
+
+
+# ============================================================================
+# MOTEUR D'IMPORT COMMUN
+# ============================================================================
+
+def xlsx_bytes(sheets):
+    """
+    Contenu d'un classeur {feuille: [lignes]}. openpyxl date chaque
+    enregistrement : deux appels peuvent différer (empreinte d'import).
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for title, rows in sheets.items():
+        sheet = workbook.create_sheet(title)
+        for row in rows:
+            sheet.append(row)
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def xlsx_upload(name, sheets):
+    return SimpleUploadedFile(name, xlsx_bytes(sheets))
+
+
+class ImportEngineTest(APITestCase):
+    """Un seul moteur (api/import_engine.py) pour tous les formats : upsert en masse, références internes"""
+
+    ROWS = [['numero', 'nom', 'societe'], ['01', 'Ain', 'MSI'], ['02', 'Aisne', 'MSI'], ['03', 'Allier', 'MSI']]
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.societe = Societe.objects.create(nom='MSI')
+
+    def run_file(self, key, upload, **kwargs):
+        return ImportEngine(IMPORT_REGISTRY.get(key), **kwargs).run_file(upload)
+
+    def counts(self, result):
+        return result.inserted, result.updated, result.unchanged, len(result.errors)
+
+    def test_every_format_same_result(self):
+        header, *rows = self.ROWS
+        csv_file = csv_upload('departements.csv', [','.join(row) for row in self.ROWS])
+        json_file = SimpleUploadedFile('departements.json', json.dumps([dict(zip(header, row)) for row in rows]).encode())
+        xlsx_file = xlsx_upload('departements.xlsx', {'Departement': self.ROWS})
+
+        self.assertEqual(self.counts(self.run_file('departement', csv_file)), (3, 0, 0, 0))
+        self.assertEqual(self.counts(self.run_file('departement', json_file)), (0, 0, 3, 0))
+        self.assertEqual(self.counts(self.run_file('departement', xlsx_file)), (0, 0, 3, 0))
+        self.assertEqual(Departement.objects.filter(societe=self.societe).count(), 3)
+
+    def test_upsert_whatever_the_batch_size(self):
+        self.run_file('departement', csv_upload('d.csv', [','.join(row) for row in self.ROWS]))
+        lines = [','.join(row) for row in self.ROWS[:3]] + ['03,Allier (03),MSI', '04,Alpes,Inconnue']
+        for batch_size in (1000, 1):
+            with self.subTest(batch_size=batch_size), transaction.atomic():
+                result = self.run_file('departement', csv_upload('d.csv', lines), batch_size=batch_size)
+                self.assertEqual(self.counts(result), (0, 1, 2, 1))
+                self.assertEqual(result.errors[0]['row'], 5)
+                transaction.set_rollback(True)
+
+    def test_salaries_with_internal_references(self):
+        lines = [
+            'matricule,nom,prenom,genre,societe,responsable_direct',
+            'S1,Durand,Paul,M,MSI,S2',
+            'S2,Martin,Léa,F,MSI,',
+        ]
+        result = self.run_file('salarie', csv_upload('salaries.csv', lines))
+        self.assertEqual(self.counts(result), (2, 0, 0, 0))
+        s1, s2 = Salarie.objects.get(matricule='S1'), Salarie.objects.get(matricule='S2')
+        self.assertEqual(s1.responsable_direct_id, s2.pk)
+        self.assertTrue(is_in_subtree(s2.pk, s1.pk))
+        self.assertEqual(s1.nom_recherche, 'durand paul s1')
+        self.assertEqual(User.objects.get(username='S2').profil_salarie, s2)
+
+    def test_csv_encoding_checked_beyond_sample(self):
+        # Export Windows : premier accent au-delà de l'échantillon de détection
+        lines = ['numero,nom,societe'] + [f'{n:05d},Departement {n},MSI' for n in range(3000)] + ['99999,Évry,MSI']
+        content = '\r\n'.join(lines).encode('cp1252')
+        self.assertGreater(content.index('É'.encode('cp1252')), SNIFF_SIZE)
+        rows = list(TabularReader(SimpleUploadedFile('d.csv', content)).iter_dicts())
+        self.assertEqual(rows[-1][1]['nom'], 'Évry')
+
+    def test_csv_undecodable_is_import_error(self):
+        content = codecs.BOM_UTF8 + 'numero,nom,societe\r\n01,Évry,MSI'.encode('cp1252')
+        with self.assertRaisesMessage(ValueError, 'Fichier illisible en utf-8-sig'):
+            self.run_file('departement', SimpleUploadedFile('d.csv', content))
+
+
+class WorkbookImportTest(APITestCase):
+    """Classeur multi-feuilles chargé dans l'ordre des FK, FK nullables reportées (api/import_engine.py)"""
+
+    # Feuilles dans l'ordre inverse des dépendances
+    SHEETS = {
+        'Salarié': [
+            ['matricule', 'nom', 'prenom', 'genre', 'societe', 'service', 'responsable_direct'],
+            ['S1', 'Durand', 'Paul', 'M', 'Nouvelle', 'Paie', 'S2'],
+            ['S2', 'Martin', 'Léa', 'F', 'Nouvelle', 'Paie', None],
+        ],
+        'Service': [['nom', 'societe', 'responsable'], ['Paie', 'Nouvelle', 'S2']],
+        'Société': [['nom'], ['Nouvelle']],
+        'Notes': [['texte'], ['ignorée']],
+    }
+
+    def setUp(self):
+        super().setUp()
+        # Mêmes octets à chaque envoi : le second envoi est reconnu comme déjà importé
+        self.content = xlsx_bytes(self.SHEETS)
+
+    def post(self, **data):
+        return self.client.post('/api/import/workbook/', {
+            'file': SimpleUploadedFile('onboarding.xlsx', self.content), **data,
+        }, format='multipart').json()
+
+    def test_load_order(self):
+        specs = [IMPORT_REGISTRY.get(key) for key in ('salarie', 'service', 'societe')]
+        registry_order = [spec for spec in IMPORT_REGISTRY.importable() if spec in specs]
+        ordered, deferred = load_order(registry_order)
+        self.assertEqual([spec.key for spec in ordered], ['societe', 'service', 'salarie'])
+        self.assertEqual(deferred, {'service': ['responsable']})
+
+    def test_workbook_in_dependency_order(self):
+        response = self.post()
+        self.assertTrue(response['success'], response)
+        self.assertEqual([sheet['model'] for sheet in response['sheets']], ['societe', 'service', 'salarie'])
+        self.assertIn("Feuille 'Notes' ignorée: aucun modèle importable correspondant", response['warnings'])
+
+        paie = Service.objects.get(nom='Paie')
+        s1, s2 = Salarie.objects.get(matricule='S1'), Salarie.objects.get(matricule='S2')
+        self.assertEqual((paie.societe.nom, paie.responsable_id), ('Nouvelle', s2.pk))
+        self.assertEqual((s1.service_id, s1.responsable_direct_id), (paie.pk, s2.pk))
+
+        self.assertTrue(self.post()['deja_importe'])
+
+    def test_dry_run_writes_nothing(self):
+        response = self.post(dry_run='true')
+        self.assertEqual([(sheet['model'], sheet['inserted'], sheet['errors']) for sheet in response['sheets']],
+                         [('societe', 1, []), ('service', 1, []), ('salarie', 2, [])])
+        self.assertFalse(Societe.objects.filter(nom='Nouvelle').exists())
+        self.assertFalse(Salarie.objects.exists())
+        self.assertFalse(ImportLog.objects.exists())
+
+
+# ============================================================================
+# TEMPLATES D'IMPORT
+# ============================================================================
+
+class ImportTemplateTest(APITestCase):
+    """Listes en feuille masquée, une validation par colonne, cache par versions de tables (api/import_templates.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Societe.objects.create(nom='MSI')
+
+    def template(self, model='departement'):
+        response = self.client.get('/api/import/template/', {'model': model})
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    def workbook(self, content):
+        from openpyxl import load_workbook
+
+        return load_workbook(BytesIO(content))
+
+    def test_lists_in_hidden_sheet(self):
+        from openpyxl.utils import get_column_letter
+
+        workbook = self.workbook(self.template())
+        self.assertEqual(workbook.sheetnames, ['Données', 'Listes', 'Instructions'])
+        self.assertEqual(workbook['Listes'].sheet_state, 'hidden')
+
+        headers = [cell.value for cell in workbook['Données'][1]]
+        validations = workbook['Données'].data_validations.dataValidation
+        self.assertEqual(len(validations), 1)
+        self.assertEqual(validations[0].formula1, "'Listes'!$A$2:$A$2")
+        column = get_column_letter(headers.index('societe') + 1)
+        self.assertEqual(str(validations[0].sqref), f'{column}2:{column}1048576')
+        self.assertEqual([cell.value for cell in workbook['Listes']['A']], ['societe', 'MSI'])
+
+    def test_cached_until_referenced_table_changes(self):
+        from .import_templates import TemplateBuilder
+
+        with mock.patch.object(TemplateBuilder, 'build', autospec=True, side_effect=TemplateBuilder.build) as build:
+            first = self.template()
+            self.assertEqual(self.template(), first)
+            self.assertEqual(build.call_count, 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Societe.objects.create(nom='Nouvelle')
+            listes = self.workbook(self.template())['Listes']
+            self.assertEqual(build.call_count, 2)
+        self.assertEqual([cell.value for cell in listes['A']], ['societe', 'MSI', 'Nouvelle'])
+
+
+# ============================================================================
+# APERÇU D'IMPORT (DRY RUN)
+# ============================================================================
+
+class ImportPreviewTest(APITestCase):
+    """/api/import/preview/ : diff ligne par ligne et par colonne, rien n'est écrit"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        societe = Societe.objects.create(nom='MSI')
+        Departement.objects.create(numero='01', nom='Ain', region='ARA', societe=societe)
+        Departement.objects.create(numero='02', nom='Aisne', region='Picardie', societe=societe)
+
+    def preview(self, **params):
+        upload = csv_upload('departements.csv', [
+            'numero,nom,region,societe',
+            '01,Ain,ARA,MSI',
+            '02,Aisne,Hauts-de-France,MSI',
+            '03,Allier,ARA,MSI',
+            '04,Alpes,PACA,Inconnue',
+        ])
+        return self.client.post(f'/api/import/preview/?{urlencode(params)}',
+                                {'model': 'departement', 'file': upload}, format='multipart').json()
+
+    def test_diff_summary_and_rows(self):
+        preview = self.preview()
+        self.assertEqual(preview['stats'], {
+            'new': 1, 'changed': 1, 'unchanged': 1, 'columns': [{'column': 'region', 'rows': 1}],
+        })
+        self.assertEqual(preview['errors'], 1)
+        self.assertEqual([c['lignes'] for c in preview['error_classes']], [[[5, 5]]])
+        rows = {row['row']: row for row in preview['results']}
+        self.assertEqual(rows[3]['changes'], {'region': ['Picardie', 'Hauts-de-France']})
+        self.assertEqual([rows[n]['status'] for n in (2, 3, 4)], ['unchanged', 'updated', 'created'])
+
+        self.assertEqual(Departement.objects.count(), 2)
+        self.assertEqual(Departement.objects.get(numero='02').region, 'Picardie')
+        self.assertFalse(ImportLog.objects.exists())
+
+    def test_pages_by_token(self):
+        preview = self.preview(page_size=1)
+        self.assertEqual((preview['count'], len(preview['results'])), (3, 1))
+        self.assertIn(f"token={preview['token']}", preview['next'])
+        self.assertEqual(len(self.client.get(preview['next']).json()['results']), 1)
+
+        updated = self.client.get('/api/import/preview/', {'token': preview['token'], 'status': 'updated'}).json()
+        self.assertEqual([row['row'] for row in updated['results']], [3])
+        self.assertEqual(self.client.get('/api/import/preview/', {'token': 'inconnu'}).status_code, 404)
+
+
+# ============================================================================
+# IMPORT PARALLÈLE
+# ============================================================================
+
+class ParallelImportTest(APITestCase):
+    """Conversion des lots dans un pool de processus : même résultat et même base qu'en séquentiel"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        societe = Societe.objects.create(nom='MSI')
+        Service.objects.create(nom='Paie', societe=societe)
+
+    def lines(self):
+        lines = ['matricule,nom,prenom,genre,societe,service,responsable_direct,date_embauche']
+        for n in range(1, 26):
+            responsable = f'P{n + 1}' if n < 25 else ''
+            lines.append(f'P{n},Nom {n},Prénom,M,MSI,Paie,{responsable},2020-01-{n:02d}')
+        lines.append('P99,Nom,Prénom,M,MSI,Inconnu,,2020-13-01')
+        return lines
+
+    def run_import(self, workers):
+        with transaction.atomic():
+            result = ImportEngine(IMPORT_REGISTRY.get('salarie'), batch_size=4, workers=workers).run_file(
+                csv_upload('salaries.csv', self.lines()))
+            state = list(Salarie.objects.order_by('matricule').values_list(
+                'matricule', 'service__nom', 'responsable_direct__matricule', 'date_embauche', 'cle_embauche'))
+            transaction.set_rollback(True)
+        return (result.inserted, result.updated, result.unchanged, result.errors), state
+
+    def test_parallel_equals_sequential(self):
+        sequential = self.run_import(workers=1)
+        self.assertEqual(sequential[0][:3], (25, 0, 0))
+        self.assertEqual(len(sequential[0][3]), 1)
+        self.assertEqual(self.run_import(workers=2), sequential)
+
+
+# ============================================================================
+# PAQUET DE RÉFÉRENCE
+# ============================================================================
+
+class ReferenceBundleTest(APITestCase):
+    """GET /api/reference/ : ETag des versions de tables, 304 jusqu'à la prochaine écriture (api/reference.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.societe = Societe.objects.create(nom='MSI')
+        Equipement.objects.create(nom='Portable', type_equipement='pc')
+
+    def test_not_modified_until_write(self):
+        first = self.client.get('/api/reference/')
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+        self.assertEqual(json.loads(first.content)['societes']['rows'], [[self.societe.pk, 'MSI', True]])
+
+        self.assertEqual(self.client.get('/api/reference/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get('/api/reference/', HTTP_IF_NONE_MATCH=f'W/{etag}').status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Societe.objects.create(nom='MSI Sud')
+        changed = self.client.get('/api/reference/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+        self.assertEqual(len(json.loads(changed.content)['societes']['rows']), 2)
+
+    def test_write_to_other_table_keeps_etag(self):
+        etag = self.client.get('/api/reference/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Salarie.objects.create(nom='Durand', prenom='Élodie', matricule='R1', genre='F', societe=self.societe)
+        self.assertEqual(self.client.get('/api/reference/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_permission_tables_hidden(self):
+        admin_etag = self.client.get('/api/reference/')['ETag']
+        salarie = Salarie.objects.create(nom='Petit', prenom='Lou', matricule='R2', genre='F', societe=self.societe)
+        self.client.force_authenticate(salarie.user)
+        response = self.client.get('/api/reference/')
+        self.assertEqual(response.status_code, 200)
+        bundle = json.loads(response.content)
+        self.assertIn('societes', bundle)
+        self.assertNotIn('equipements', bundle)
+        self.assertNotEqual(response['ETag'], admin_etag)
+
+
+# ============================================================================
+# JSON : ORJSON
+# ============================================================================
+
+class ORJSONTest(SimpleTestCase):
+    """ORJSONRenderer / ORJSONParser : même JSON que les classes DRF (api/renderers.py)"""
+
+    data = {
+        'nom': 'Élodie\u2028Durand',
+        'montant': Decimal('12.50'),
+        'libelle': gettext_lazy('Congé'),
+        'ids': (1, 2, 3),
+        1: [None, True, 1.5, {'imbrique': 'oui'}],
+    }
+
+    def test_render_matches_drf(self):
+        self.assertEqual(ORJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_render_line_separators_escaped(self):
+        self.assertIn(b'\\u2028', ORJSONRenderer().render(self.data))
+
+    def test_render_indent(self):
+        content = ORJSONRenderer().render({'a': [1]}, 'application/json; indent=2')
+        self.assertEqual(json.loads(content), {'a': [1]})
+        self.assertIn(b'\n  ', content)
+
+    def test_dates_follow_drf_formats(self):
+        moment = timezone.make_aware(datetime(2026, 3, 1, 8, 30, 15, 123456))
+        content = json.loads(ORJSONRenderer().render({'quand': moment, 'jour': date(2026, 3, 1), 'heure': time(8, 30)}))
+        self.assertEqual(content, {
+            'quand': serializers.DateTimeField().to_representation(moment),
+            'jour': '2026-03-01',
+            'heure': '08:30:00',
+        })
+
+    def test_parse_matches_drf(self):
+        body = json.dumps({'nom': 'Élodie', 'valeurs': [1, 2.5, None]}).encode()
+        self.assertEqual(ORJSONParser().parse(BytesIO(body)), JSONParser().parse(BytesIO(body)))
+
+    def test_parse_error(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"nom": '))
+
+
+# ============================================================================
+# COMPRESSION ET GET CONDITIONNEL DES LISTES
+# ============================================================================
+
+class CompressionTest(APITestCase):
+    """CompressionMiddleware : gzip / brotli des réponses textuelles (api/middleware.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Societe.objects.bulk_create([Societe(nom=f'Société {n:03d}') for n in range(60)])
+
+    def test_large_json_gzipped(self):
+        response = self.client.get('/api/societes/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.content))['count'], 60)
+
+    def test_small_or_unaccepted_left_alone(self):
+        small = self.client.get('/api/societes/?nom=Société 001', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(small.status_code, 200)
+        self.assertFalse(small.has_header('Content-Encoding'))
+        plain = self.client.get('/api/societes/')
+        self.assertFalse(plain.has_header('Content-Encoding'))
+
+    def test_brotli_preferred_when_available(self):
+        fake = SimpleNamespace(compress=lambda data, quality: b'br:' + gzip.compress(data))
+        with mock.patch('api.middleware.brotli', fake):
+            response = self.client.get('/api/societes/', HTTP_ACCEPT_ENCODING='gzip, br')
+            refused = self.client.get('/api/societes/', HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertTrue(response.content.startswith(b'br:'))
+        self.assertEqual(refused['Content-Encoding'], 'gzip')
+
+
+class ConditionalListTest(APITestCase):
+    """ConditionalListMixin : ETag des listes sans sérialiser, 304 si rien n'a changé (api/conditional.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.societe = Societe.objects.create(nom='MSI')
+        cls.responsable = Salarie.objects.create(nom='Durand', prenom='Élodie', matricule='C1', genre='F',
+                                                 societe=cls.societe)
+        Service.objects.create(nom='Paie', societe=cls.societe, responsable=cls.responsable)
+
+    def test_not_modified_until_row_changes(self):
+        etag = self.client.get('/api/services/')['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get('/api/services/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Une requête d'agrégat (hors SAVEPOINT d'ATOMIC_REQUESTS)
+        self.assertEqual([q['sql'].split()[0] for q in queries if 'SAVEPOINT' not in q['sql']], ['SELECT'])
+
+        Service.objects.create(nom='Achats', societe=self.societe)
+        changed = self.client.get('/api/services/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+    def test_related_table_change_invalidates(self):
+        # ServiceSerializer lit le responsable (responsable_info) : la table des salariés compte dans l'ETag
+        etag = self.client.get('/api/services/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.responsable.nom = 'Durand-Martin'
+            self.responsable.save()
+        self.assertEqual(self.client.get('/api/services/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_depends_on_filter_and_page(self):
+        base = self.client.get('/api/services/')['ETag']
+        self.assertNotEqual(self.client.get('/api/services/?search=Paie')['ETag'], base)
+        self.assertNotEqual(self.client.get('/api/services/?page=1')['ETag'], base)
+
+
+# ============================================================================
+# PROFILAGE À LA DEMANDE
+# ============================================================================
+
+@override_settings(PROFILER_ENABLED=True)
+class ProfilerTest(APITestCase):
+    """ProfilerMiddleware : profils réservés au staff, tampon circulaire sur disque (api/profiling.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.societe = Societe.objects.create(nom='MSI')
+        cls.salarie = Salarie.objects.create(nom='Petit', prenom='Lou', matricule='PR1', genre='F', societe=cls.societe)
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.mkdtemp(dir=TEST_DIR)
+        patcher = mock.patch.object(profiling, 'PROFILER_DIR', directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.login(self.admin)
+
+    def login(self, user):
+        """Jeton JWT réel : le middleware authentifie avant DRF (force_authenticate ne lui parvient pas)"""
+        self.client.force_authenticate(None)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+    def test_staff_request_profiled(self):
+        response = self.client.get('/api/societes/?_profile=1')
+        self.assertEqual(response.status_code, 200)
+        profile_id = response['X-Profile-Id']
+        self.assertEqual([profile['id'] for profile in profiling.list_profiles()], [profile_id])
+
+        with open(profiling.profile_file(profile_id, 'json'), encoding='utf-8') as handle:
+            summary = json.load(handle)
+        self.assertEqual(summary['user'], self.admin.username)
+        self.assertGreaterEqual(summary['sql_count'], 1)
+        # SQL sans paramètres (données personnelles)
+        self.assertTrue(all(set(query) == {'sql', 'many', 'duration_ms', 'stack'} for query in summary['queries']))
+
+    def test_unmarked_request_not_profiled(self):
+        self.assertFalse(self.client.get('/api/societes/').has_header('X-Profile-Id'))
+        self.assertFalse(self.client.get('/api/societes/?_profile=0').has_header('X-Profile-Id'))
+
+    def test_non_staff_not_profiled(self):
+        self.login(self.salarie.user)
+        response = self.client.get('/api/societes/?_profile=1', HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(profiling.list_profiles(), [])
+
+    def test_profile_pages_staff_only(self):
+        profile_id = self.client.get('/api/societes/?_profile=1')['X-Profile-Id']
+        download = f'/admin/profiles/{profile_id}.json'
+
+        self.client.credentials()
+        self.client.force_login(self.salarie.user)
+        self.assertEqual(self.client.get('/admin/profiles/').status_code, 302)
+        self.assertEqual(self.client.get(download).status_code, 302)
+
+        self.client.force_login(self.admin)
+        self.assertContains(self.client.get('/admin/profiles/'), profile_id)
+        self.assertEqual(self.client.get(download).status_code, 200)
+        self.assertEqual(self.client.get('/admin/profiles/../etc.json').status_code, 404)
+        self.assertEqual(self.client.get(f'/admin/profiles/{profile_id}.txt').status_code, 404)
+
+    def test_oldest_profiles_pruned(self):
+        with mock.patch.object(profiling, 'PROFILER_MAX_PROFILES', 2):
+            ids = [self.client.get('/api/societes/?_profile=1')['X-Profile-Id'] for _ in range(3)]
+        self.assertEqual([profile['id'] for profile in profiling.list_profiles()], ids[:0:-1])
+        self.assertIsNone(profiling.profile_file(ids[0], 'prof'))
+
+    @override_settings(PROFILER_ENABLED=False)
+    def test_disabled_middleware_removed(self):
+        self.assertFalse(self.client.get('/api/societes/?_profile=1').has_header('X-Profile-Id'))
+
+
+# ============================================================================
+# DÉMARRAGE : IMPORT / EXPORT CHARGÉS À LA PREMIÈRE UTILISATION
+# ============================================================================
+
+class StartupImportsTest(SimpleTestCase):
+    """Un worker (msi_backend.wsgi : URLconf, vues, admin) ne charge ni pandas ni openpyxl"""
+
+    HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl')
+
+    def test_wsgi_does_not_load_heavy_modules(self):
+        code = (
+            "import sys, msi_backend.wsgi; "
+            f"print('HEAVY:' + ','.join(m for m in {self.HEAVY_MODULES!r} if m in sys.modules))"
+        )
+        env = dict(os.environ, PRELOAD_IMPORT_MODULES='False')
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=env, check=True)
+        heavy = [line[len('HEAVY:'):] for line in output.stdout.splitlines() if line.startswith('HEAVY:')]
+        self.assertEqual(heavy, [''], f"Chargés au démarrage : {heavy}")
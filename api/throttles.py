@@ -0,0 +1,29 @@
+# api/throttles.py - THROTTLES DRF SUR LE CACHE PARTAGÉ
+#
+# Les throttles DRF comptent dans le cache 'default' ; ceux-ci utilisent le
+# cache THROTTLE (api/caching.py), commun à tous les workers gunicorn.
+
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+from rest_framework import throttling
+
+from .caching import THROTTLE
+
+throttle_cache = ConnectionProxy(caches, THROTTLE)
+
+
+class AnonRateThrottle(throttling.AnonRateThrottle):
+    cache = throttle_cache
+
+
+class UserRateThrottle(throttling.UserRateThrottle):
+    cache = throttle_cache
+
+
+class InvitationRateThrottle(throttling.SimpleRateThrottle):
+    """POST /api/invitation/activer/ (sans authentification) : essais de jetons bornés par IP"""
+    cache = throttle_cache
+    scope = 'invitation'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import user_me
+from .views import user_me, activer_compte
 
 # ============================================================================
 # IMPORTATION DE TOUS LES VIEWSETS
@@ -22,6 +22,8 @@ from .views import (
 
 # ✅ IMPORT DU VIEWSET D'IMPORT (NOUVEAU - MODERNE)
 from .import_views import ImportViewSet
+from .reference import reference_bundle
+from .route_stats import performance_stats
 
 # ============================================================================
 # CRÉER LE ROUTEUR
@@ -103,4 +105,13 @@ urlpatterns = [
     # ✅ ROUTE POUR L'UTILISATEUR CONNECTÉ - SANS PRÉFIXE 'api/'
     # Car msi_backend/urls.py inclut déjà path('api/', include('api.urls'))
     path('me/', user_me, name='user-me'),
+
+    # Premier mot de passe d'un compte provisionné (lien d'invitation)
+    path('invitation/activer/', activer_compte, name='invitation-activer'),
+
+    # Tables de paramétrage en un appel, versionnées (ETag / 304)
+    path('reference/', reference_bundle, name='reference-bundle'),
+
+    # Latences par route (p50 / p95 / p99), administrateurs
+    path('performance/', performance_stats, name='performance-stats'),
 ]
@@ -10,18 +10,17 @@
 
 
 from rest_framework import viewsets, status
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes, throttle_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django.shortcuts import get_object_or_404
 from datetime import datetime, date
-import io, json, pandas as pd
 from django.http import HttpResponse
 from django.utils.encoding import smart_str
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
 from .serializers import UserMeSerializer
 from django.contrib.auth.models import User
 from rest_framework.decorators import api_view, permission_classes
@@ -40,6 +39,30 @@ from .models import (
     TypeApplicationAcces, AccesApplication, FicheParametresUser, Role,
     DemandeAcompte, DemandeSortie, ImportLog
 )
+from .throttles import AnonRateThrottle, InvitationRateThrottle
+
+
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@throttle_classes([AnonRateThrottle, InvitationRateThrottle])
+def activer_compte(request):
+    """
+    Premier mot de passe d'un compte invité (voir SalarieViewSet.invitation)
+
+    POST /api/invitation/activer/ {uid, token, password}
+    """
+    user = user_from_invitation(request.data.get('uid', ''), request.data.get('token', ''))
+    if user is None:
+        return Response({'error': 'Lien invalide ou expiré'}, status=status.HTTP_400_BAD_REQUEST)
+    password = request.data.get('password', '')
+    try:
+        validate_password(password, user)
+    except ValidationError as e:
+        return Response({'password': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+    user.set_password(password)
+    user.save(update_fields=['password'])
+    return Response({'detail': 'Mot de passe enregistré'})
 
 
 @api_view(['GET'])
@@ -70,7 +93,8 @@ from .serializers import (
     AccesSalarieSerializer, TypeApplicationAccesSerializer, AccesApplicationSerializer,
     FicheParametresUserSerializer, CircuitSerializer, RoleSerializer,
     DemandeAcompteSerializer, DemandeSortieSerializer, TravauxExceptionnelsSerializer,
-    FichePosteDetailSerializer, AmeliorationProposeeSerializer, ImportLogSerializer
+    FichePosteDetailSerializer, AmeliorationProposeeSerializer, ImportLogSerializer,
+    ImportLogListSerializer, ImportLogErreurSerializer
 )
 
 
@@ -111,10 +135,13 @@ from .permissions import (
 )
 
 
-from .utils import (
-    IMPORT_CONFIG, parse_value, get_current_data,
-    generate_template_dataframe
-)
+from .search import SalarieSearchFilter, suggest_salaries, SUGGEST_DEFAULT_LIMIT
+from .calendrier import upcoming_events, decorate_event, JOURS_DEFAUT, TYPES_EVENEMENT
+from .hierarchy import build_org_chart, get_chain_of_command
+from .provisioning import invitation, user_from_invitation
+from .team_scope import TeamScopeMixin, has_team_scope
+from .eager_loading import EagerLoadingMixin
+from .conditional import ConditionalListMixin
 
 
 
@@ -123,7 +150,7 @@ from .utils import (
 # ============================================================================
 
 
-class SocieteViewSet(viewsets.ModelViewSet):
+class SocieteViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour Societes - Lecture pour tous, Modif pour Admin"""
     queryset = Societe.objects.all()
     serializer_class = SocieteSerializer
@@ -141,7 +168,7 @@ class SocieteViewSet(viewsets.ModelViewSet):
 
 
 
-class DepartementViewSet(viewsets.ModelViewSet):
+class DepartementViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour Departements"""
     queryset = Departement.objects.all()
     serializer_class = DepartementSerializer
@@ -157,7 +184,7 @@ class DepartementViewSet(viewsets.ModelViewSet):
 
 
 
-class CircuitViewSet(viewsets.ModelViewSet):
+class CircuitViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour Circuits - Nouveau"""
     queryset = Circuit.objects.all()
     serializer_class = CircuitSerializer
@@ -172,7 +199,7 @@ class CircuitViewSet(viewsets.ModelViewSet):
 
 
 
-class ServiceViewSet(viewsets.ModelViewSet):
+class ServiceViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour Services"""
     queryset = Service.objects.all()
     serializer_class = ServiceSerializer
@@ -187,7 +214,7 @@ class ServiceViewSet(viewsets.ModelViewSet):
 
 
 
-class GradeViewSet(viewsets.ModelViewSet):
+class GradeViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour Grades"""
     queryset = Grade.objects.all()
     serializer_class = GradeSerializer
@@ -202,7 +229,7 @@ class GradeViewSet(viewsets.ModelViewSet):
 
 
 
-class TypeAccesViewSet(viewsets.ModelViewSet):
+class TypeAccesViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour Types d'accès"""
     queryset = TypeAcces.objects.all()
     serializer_class = TypeAccesSerializer
@@ -216,7 +243,7 @@ class TypeAccesViewSet(viewsets.ModelViewSet):
 
 
 
-class OutilTravailViewSet(viewsets.ModelViewSet):
+class OutilTravailViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour Outils de travail"""
     queryset = OutilTravail.objects.all()
     serializer_class = OutilTravailSerializer
@@ -230,7 +257,7 @@ class OutilTravailViewSet(viewsets.ModelViewSet):
 
 
 
-class CreneauTravailViewSet(viewsets.ModelViewSet):
+class CreneauTravailViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour Créneaux de travail"""
     queryset = CreneauTravail.objects.all()
     serializer_class = CreneauTravailSerializer
@@ -249,7 +276,7 @@ class CreneauTravailViewSet(viewsets.ModelViewSet):
 # ============================================================================
 
 
-class EquipementViewSet(viewsets.ModelViewSet):
+class EquipementViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour Équipements"""
     queryset = Equipement.objects.all()
     serializer_class = EquipementSerializer
@@ -302,7 +329,7 @@ class EquipementViewSet(viewsets.ModelViewSet):
 
 
 
-class TypeApplicationAccesViewSet(viewsets.ModelViewSet):
+class TypeApplicationAccesViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour Types d'applications"""
     queryset = TypeApplicationAcces.objects.all()
     serializer_class = TypeApplicationAccesSerializer
@@ -321,23 +348,27 @@ class TypeApplicationAccesViewSet(viewsets.ModelViewSet):
 # ============================================================================
 
 
-class SalarieViewSet(viewsets.ModelViewSet):
+class SalarieViewSet(EagerLoadingMixin, ConditionalListMixin, TeamScopeMixin, viewsets.ModelViewSet):
     """ViewSet pour Salariés - Avec permissions granulaires"""
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    # SalarieSearchFilter après OrderingFilter : tri par pertinence si pas de ?ordering=
+    filter_backends = [DjangoFilterBackend, OrderingFilter, SalarieSearchFilter]
     filterset_fields = ['societe', 'service', 'grade', 'statut']
     search_fields = ['nom', 'prenom', 'matricule', 'mail_professionnel']
     ordering_fields = ['nom', 'prenom', 'date_embauche', 'date_creation']
     ordering = ['nom', 'prenom']
+    team_scope_field = 'id'
 
 
     def get_permissions(self):
         """Permissions selon action"""
-        if self.action in ['list', 'retrieve']:
-            return [IsAuthenticated(), CanViewAllSalaries()]
+        if self.action in ['list', 'retrieve', 'suggest', 'organigramme', 'chaine_hierarchique', 'calendrier']:
+            return [IsAuthenticated(), (CanViewAllSalaries | CanViewTeamSalaries)()]
         elif self.action in ['update', 'partial_update']:
             return [IsAuthenticated(), CanEditAllSalaries()]
         elif self.action == 'ma_fiche':
             return [IsAuthenticated(), CanViewOwnSalary()]
+        elif self.action == 'invitation':
+            return [IsAuthenticated(), IsAdmin()]
         return [IsAuthenticated()]
 
 
@@ -353,11 +384,9 @@ class SalarieViewSet(viewsets.ModelViewSet):
         if user.has_perm('api.view_all_salaries'):
             return Salarie.objects.all()
         
-        # Team leaders voient leur équipe
-        if user.has_perm('api.view_team_salaries'):
-            if hasattr(user, 'profil_salarie'):
-                service = user.profil_salarie.service
-                return Salarie.objects.filter(service=service)
+        # Team leaders voient leur équipe (hiérarchie + services dont ils sont responsables)
+        if has_team_scope(user):
+            return self.filter_team_scope(Salarie.objects.all())
         
         # User normal voit sa fiche
         if user.has_perm('api.view_own_salary'):
@@ -413,6 +442,93 @@ class SalarieViewSet(viewsets.ModelViewSet):
         })
 
 
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        """
+        GET /api/salaries/suggest/?q=dup&limit=10
+        Autocomplétion : id, nom, prenom, matricule, poste (sans pagination)
+        """
+        query = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', SUGGEST_DEFAULT_LIMIT))
+        except ValueError:
+            return Response({'error': 'Paramètre "limit" invalide'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        return Response(suggest_salaries(self.get_queryset(), query, limit))
+
+
+    @action(detail=False, methods=['get'])
+    def calendrier(self, request):
+        """
+        GET /api/salaries/calendrier/?debut=2026-12-20&jours=30&type=anniversaire
+        Anniversaires (naissance) et ancienneté (embauche) à venir, paginés,
+        triés chronologiquement (passage d'année géré). type : anniversaire|anciennete
+        """
+        try:
+            debut_param = request.query_params.get('debut')
+            debut = date.fromisoformat(debut_param) if debut_param else date.today()
+            jours = int(request.query_params.get('jours', JOURS_DEFAUT))
+        except ValueError:
+            return Response({'error': 'Paramètres "debut" (AAAA-MM-JJ) ou "jours" invalides'},
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        type_param = request.query_params.get('type')
+        if type_param and type_param not in TYPES_EVENEMENT:
+            return Response({'error': f'Type invalide. Valeurs: {", ".join(TYPES_EVENEMENT)}'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        types = (type_param,) if type_param else TYPES_EVENEMENT
+
+        salaries = self.get_queryset().exclude(statut='inactif')
+        evenements = upcoming_events(salaries, debut, jours, types)
+
+        page = self.paginate_queryset(evenements)
+        if page is not None:
+            return self.get_paginated_response([decorate_event(row, debut) for row in page])
+        return Response([decorate_event(row, debut) for row in evenements])
+
+
+    @action(detail=True, methods=['get'])
+    def organigramme(self, request, pk=None):
+        """
+        GET /api/salaries/<id>/organigramme/?profondeur=3
+        Sous-arbre complet (une requête récursive) avec effectifs par nœud
+        """
+        salarie = self.get_object()
+        max_depth = request.query_params.get('profondeur')
+        try:
+            max_depth = int(max_depth) if max_depth else None
+        except ValueError:
+            return Response({'error': 'Paramètre "profondeur" invalide'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        return Response(build_org_chart(salarie.id, max_depth))
+
+
+    @action(detail=True, methods=['get'])
+    def chaine_hierarchique(self, request, pk=None):
+        """
+        GET /api/salaries/<id>/chaine_hierarchique/
+        Du salarié jusqu'au sommet de la hiérarchie
+        """
+        salarie = self.get_object()
+        chaine, cycle = get_chain_of_command(salarie.id)
+        return Response({'chaine': chaine, 'cycle_detecte': cycle})
+
+
+    @action(detail=True, methods=['post'])
+    def invitation(self, request, pk=None):
+        """
+        POST /api/salaries/<id>/invitation/
+        Lien pour que le salarié choisisse son mot de passe (comptes
+        provisionnés sans mot de passe utilisable). Un nouveau lien reste
+        valable tant que le mot de passe n'a pas changé.
+        """
+        salarie = self.get_object()
+        if salarie.user_id is None:
+            return Response({'error': "Aucun compte utilisateur lié à ce salarié"},
+                          status=status.HTTP_400_BAD_REQUEST)
+        return Response(invitation(salarie.user))
+
+
     @action(detail=False, methods=['get'])
     def annuaire(self, request):
         """Liste complète pour annuaire (infos publiques)"""
@@ -422,7 +538,7 @@ class SalarieViewSet(viewsets.ModelViewSet):
 
 
 
-class EquipementInstanceViewSet(viewsets.ModelViewSet):
+class EquipementInstanceViewSet(EagerLoadingMixin, ConditionalListMixin, TeamScopeMixin, viewsets.ModelViewSet):
     """ViewSet pour instances équipements affectés"""
     queryset = EquipementInstance.objects.all()
     serializer_class = EquipementInstanceSerializer
@@ -434,7 +550,7 @@ class EquipementInstanceViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         """Permissions selon action"""
         if self.action in ['list', 'retrieve']:
-            return [IsAuthenticated(), CanViewAllEquipment()]
+            return [IsAuthenticated(), (CanViewAllEquipment | CanViewTeamSalaries)()]
         elif self.action in ['create', 'update', 'partial_update']:
             return [IsAuthenticated(), CanCreateEquipmentRequests()]
         elif self.action in ['destroy']:
@@ -449,6 +565,9 @@ class EquipementInstanceViewSet(viewsets.ModelViewSet):
         if user.is_staff or user.has_perm('api.view_all_equipment'):
             return EquipementInstance.objects.all()
         
+        if has_team_scope(user):
+            return self.filter_team_scope(EquipementInstance.objects.all())
+        
         if user.has_perm('api.view_own_equipment'):
             if hasattr(user, 'profil_salarie'):
                 return EquipementInstance.objects.filter(salarie=user.profil_salarie)
@@ -457,7 +576,7 @@ class EquipementInstanceViewSet(viewsets.ModelViewSet):
 
 
 
-class AccesApplicationViewSet(viewsets.ModelViewSet):
+class AccesApplicationViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour accès applicatifs"""
     queryset = AccesApplication.objects.all()
     serializer_class = AccesApplicationSerializer
@@ -471,7 +590,7 @@ class AccesApplicationViewSet(viewsets.ModelViewSet):
 
 
 
-class AccesSalarieViewSet(viewsets.ModelViewSet):
+class AccesSalarieViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour accès physiques"""
     queryset = AccesSalarie.objects.all()
     serializer_class = AccesSalarieSerializer
@@ -484,7 +603,7 @@ class AccesSalarieViewSet(viewsets.ModelViewSet):
 
 
 
-class HoraireSalarieViewSet(viewsets.ModelViewSet):
+class HoraireSalarieViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour horaires supplémentaires"""
     queryset = HoraireSalarie.objects.all()
     serializer_class = HoraireSalarieSerializer
@@ -497,7 +616,7 @@ class HoraireSalarieViewSet(viewsets.ModelViewSet):
 
 
 
-class HistoriqueSalarieViewSet(viewsets.ModelViewSet):
+class HistoriqueSalarieViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour historique salariés"""
     queryset = HistoriqueSalarie.objects.all()
     serializer_class = HistoriqueSalarieSerializer
@@ -525,7 +644,7 @@ class HistoriqueSalarieViewSet(viewsets.ModelViewSet):
 # ============================================================================
 
 
-class DemandeCongeViewSet(viewsets.ModelViewSet):
+class DemandeCongeViewSet(EagerLoadingMixin, ConditionalListMixin, TeamScopeMixin, viewsets.ModelViewSet):
     """ViewSet pour demandes de congé - Avec validations multi-niveaux"""
     queryset = DemandeConge.objects.all()
     serializer_class = DemandeCongeSerializer
@@ -537,7 +656,7 @@ class DemandeCongeViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         """Permissions selon action"""
         if self.action in ['list', 'retrieve']:
-            return [IsAuthenticated(), CanViewAllLeaveRequests()]
+            return [IsAuthenticated(), (CanViewAllLeaveRequests | CanViewTeamSalaries)()]
         elif self.action == 'create':
             return [IsAuthenticated(), CanCreateLeaveRequests()]
         elif self.action in ['valider_direct']:
@@ -559,6 +678,10 @@ class DemandeCongeViewSet(viewsets.ModelViewSet):
         if user.has_perm('api.view_all_leave_requests'):
             return DemandeConge.objects.all()
         
+        # Responsables voient les demandes de leur équipe
+        if has_team_scope(user):
+            return self.filter_team_scope(DemandeConge.objects.all())
+        
         # User normal voit ses demandes
         if user.has_perm('api.view_own_leave_requests'):
             if hasattr(user, 'profil_salarie'):
@@ -628,7 +751,7 @@ class DemandeCongeViewSet(viewsets.ModelViewSet):
 
 
 
-class SoldeCongeViewSet(viewsets.ReadOnlyModelViewSet):
+class SoldeCongeViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet lecture-seule pour solde congés"""
     queryset = SoldeConge.objects.all()
     serializer_class = SoldeCongeSerializer
@@ -654,7 +777,7 @@ class SoldeCongeViewSet(viewsets.ReadOnlyModelViewSet):
 
 
 
-class DemandeAcompteViewSet(viewsets.ModelViewSet):
+class DemandeAcompteViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour demandes d'acompte"""
     queryset = DemandeAcompte.objects.all()
     serializer_class = DemandeAcompteSerializer
@@ -697,7 +820,7 @@ class DemandeAcompteViewSet(viewsets.ModelViewSet):
 
 
 
-class DemandeSortieViewSet(viewsets.ModelViewSet):
+class DemandeSortieViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour demandes de sortie"""
     queryset = DemandeSortie.objects.all()
     serializer_class = DemandeSortieSerializer
@@ -712,7 +835,7 @@ class DemandeSortieViewSet(viewsets.ModelViewSet):
 
 
 
-class TravauxExceptionnelsViewSet(viewsets.ModelViewSet):
+class TravauxExceptionnelsViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour travaux exceptionnels"""
     queryset = TravauxExceptionnels.objects.all()
     serializer_class = TravauxExceptionnelsSerializer
@@ -732,7 +855,7 @@ class TravauxExceptionnelsViewSet(viewsets.ModelViewSet):
 # ============================================================================
 
 
-class DocumentSalarieViewSet(viewsets.ModelViewSet):
+class DocumentSalarieViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour documents - Avec permissions de visibilité"""
     queryset = DocumentSalarie.objects.all()
     serializer_class = DocumentSalarieSerializer
@@ -778,7 +901,7 @@ class DocumentSalarieViewSet(viewsets.ModelViewSet):
 # ============================================================================
 
 
-class FichePosteViewSet(viewsets.ModelViewSet):
+class FichePosteViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour fiches de poste"""
     queryset = FichePoste.objects.all()
     serializer_class = FichePosteDetailSerializer
@@ -803,7 +926,7 @@ class FichePosteViewSet(viewsets.ModelViewSet):
 
 
 
-class AmeliorationProposeeViewSet(viewsets.ModelViewSet):
+class AmeliorationProposeeViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour améliorations proposées"""
     queryset = AmeliorationProposee.objects.all()
     serializer_class = AmeliorationProposeeSerializer
@@ -848,7 +971,7 @@ class AmeliorationProposeeViewSet(viewsets.ModelViewSet):
 # ============================================================================
 
 
-class FicheParametresUserViewSet(viewsets.ModelViewSet):
+class FicheParametresUserViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ModelViewSet):
     """ViewSet pour paramètres utilisateur"""
     queryset = FicheParametresUser.objects.all()
     serializer_class = FicheParametresUserSerializer
@@ -860,7 +983,7 @@ class FicheParametresUserViewSet(viewsets.ModelViewSet):
 
 
 
-class RoleViewSet(viewsets.ReadOnlyModelViewSet):
+class RoleViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet lecture-seule pour rôles"""
     queryset = Role.objects.all()
     serializer_class = RoleSerializer
@@ -877,7 +1000,7 @@ class RoleViewSet(viewsets.ReadOnlyModelViewSet):
 # ============================================================================
 
 
-class ImportLogViewSet(viewsets.ReadOnlyModelViewSet):
+class ImportLogViewSet(EagerLoadingMixin, ConditionalListMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet pour logs d'import - Lecture seule"""
     queryset = ImportLog.objects.all()
     serializer_class = ImportLogSerializer
@@ -891,8 +1014,34 @@ class ImportLogViewSet(viewsets.ReadOnlyModelViewSet):
         return [IsAuthenticated(), IsAdmin()]
 
 
+    def get_serializer_class(self):
+        """Liste sans details_erreurs (voir l'action errors)"""
+        if self.action == 'list':
+            return ImportLogListSerializer
+        return ImportLogSerializer
+
     def get_queryset(self):
         """Admin seulement"""
         if self.request.user.is_staff:
-            return ImportLog.objects.all()
+            queryset = ImportLog.objects.select_related('cree_par')
+            if self.action == 'list':
+                queryset = queryset.defer('details_erreurs')
+            return queryset
         return ImportLog.objects.none()
+
+    @action(detail=True, methods=['get'])
+    def errors(self, request, pk=None):
+        """
+        GET /api/import-logs/<id>/errors/?search=<texte>
+        Classes d'erreurs de l'import (message + plages de lignes), paginées
+        """
+        import_log = self.get_object()
+        erreurs = import_log.erreurs.all()
+        search = request.query_params.get('search')
+        if search:
+            erreurs = erreurs.filter(message__icontains=search)
+
+        page = self.paginate_queryset(erreurs)
+        if page is not None:
+            return self.get_paginated_response(ImportLogErreurSerializer(page, many=True).data)
+        return Response(ImportLogErreurSerializer(erreurs, many=True).data)
@@ -0,0 +1,73 @@
+# benchmarks/bench_import_workers.py - IMPORT PARALLÈLE (POOL DE CONVERSION)
+#
+# USAGE: python benchmarks/bench_import_workers.py [nb_lignes] [max_workers]
+# Importe un fichier CSV Salarie synthétique (200k lignes par défaut) avec
+# 1, 2, 4... processus de conversion. Chaque passe écrit réellement puis
+# est annulée (rollback) : la base est laissée intacte.
+
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'msi_backend.settings')
+
+import django
+
+django.setup()
+
+from django.db import transaction
+
+from api.import_engine import IMPORT_REGISTRY, ImportEngine
+from api.import_readers import open_reader
+from api.models import Societe
+
+SOCIETE = 'BENCH-SOCIETE'
+
+
+def build_file(n, path):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow(['matricule', 'nom', 'prenom', 'genre', 'societe', 'date_naissance',
+                         'date_embauche', 'telephone', 'en_poste'])
+        for i in range(n):
+            writer.writerow([
+                f'B{i:07d}', f'Nom{i % 997}', 'Prénom', 'M' if i % 2 else 'F', SOCIETE,
+                ('1990-05-17', '03/11/1985', '')[i % 3], '06/01/2020', 21600000000 + i,
+                ('oui', 'non', 'true', '')[i % 4],
+            ])
+
+
+def run(path, workers):
+    spec = IMPORT_REGISTRY.get('salarie')
+    with open(path, 'rb') as f, transaction.atomic():
+        Societe.objects.get_or_create(nom=SOCIETE)
+        start = time.perf_counter()
+        result = ImportEngine(spec, workers=workers).run(open_reader(f, filename='bench.csv'))
+        elapsed = time.perf_counter() - start
+        transaction.set_rollback(True)
+    return elapsed, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'salaries.csv')
+        build_file(n, path)
+        print(f"{n} lignes, {os.path.getsize(path) / 1e6:.1f} Mo, {os.cpu_count()} coeurs")
+
+        workers, baseline = 1, None
+        while workers <= max_workers:
+            elapsed, result = run(path, workers)
+            baseline = baseline or elapsed
+            print(f"  {workers:>2} processus : {elapsed:7.2f} s  x{baseline / elapsed:.2f}  "
+                  f"({result.inserted} insérés, {len(result.errors)} erreurs)")
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_json_renderer.py - RENDU / LECTURE JSON DES LISTES
+#
+# USAGE: python benchmarks/bench_json_renderer.py [nb_lignes] [répétitions]
+# Sérialise une liste de salariés (5000 par défaut, SalarieDetailSerializer
+# comme /api/salaries/) puis compare JSONRenderer / JSONParser de DRF aux
+# versions orjson (api/renderers.py). Les lignes sont créées dans une
+# transaction annulée : la base est laissée intacte.
+
+import io
+import json
+import os
+import sys
+import time
+from datetime import date, time as heure
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'msi_backend.settings')
+
+import django
+
+django.setup()
+
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.eager_loading import apply_eager_loading
+from api.models import CreneauTravail, Grade, Salarie, Service, Societe
+from api.renderers import ORJSONParser, ORJSONRenderer, orjson
+from api.serializers import SalarieDetailSerializer
+
+
+def build_rows(n):
+    societe = Societe.objects.create(nom='BENCH-JSON')
+    grade = Grade.objects.create(nom='Bench', societe=societe)
+    creneau = CreneauTravail.objects.create(nom='Bench', societe=societe, heure_debut=heure(8), heure_fin=heure(17))
+    responsable = Salarie.objects.create(nom='Resp', prenom='Bench', matricule='BJ-R', genre='M', societe=societe)
+    service = Service.objects.create(nom='Bench', societe=societe, responsable=responsable)
+    Salarie.objects.bulk_create([
+        Salarie(nom=f'Nom{i}', prenom='Prénom « accentué »', matricule=f'BJ{i:06d}', genre='MF'[i % 2],
+                societe=societe, service=service, grade=grade, creneau_travail=creneau,
+                responsable_direct=responsable, date_naissance=date(1990, 1, 1 + i % 28),
+                date_embauche=date(2020, 1, 6))
+        for i in range(n)
+    ])
+    queryset = Salarie.objects.filter(societe=societe).exclude(pk=responsable.pk)
+    return SalarieDetailSerializer(apply_eager_loading(queryset, SalarieDetailSerializer), many=True).data
+
+
+def timed(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    if orjson is None:
+        print("orjson non installé : ORJSONRenderer retombe sur JSONRenderer")
+
+    with transaction.atomic():
+        start = time.perf_counter()
+        data = build_rows(n)
+        print(f"{n} salariés sérialisés en {time.perf_counter() - start:.2f} s (serializer, hors rendu)")
+        transaction.set_rollback(True)
+
+    results = {}
+    for name, renderer, parser in (('DRF', JSONRenderer(), JSONParser()),
+                                   ('orjson', ORJSONRenderer(), ORJSONParser())):
+        render_time, content = timed(lambda: renderer.render(data), repeat)
+        parse_time, parsed = timed(lambda: parser.parse(io.BytesIO(content)), repeat)
+        results[name] = (render_time, parse_time, content, parsed)
+        print(f"  {name:<7} rendu {render_time * 1000:7.1f} ms ({n / render_time:>9,.0f} lignes/s, "
+              f"{len(content) / 1e6:.1f} Mo)   lecture {parse_time * 1000:7.1f} ms")
+
+    drf, fast = results['DRF'], results['orjson']
+    print(f"  gain : rendu x{drf[0] / fast[0]:.1f}, lecture x{drf[1] / fast[1]:.1f}")
+    print(f"  contenu identique : {json.loads(drf[2]) == json.loads(fast[2]) and drf[3] == fast[3]}")
+
+
+if __name__ == '__main__':
+    main()
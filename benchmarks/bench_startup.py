@@ -0,0 +1,98 @@
+# benchmarks/bench_startup.py - DÉMARRAGE D'UN WORKER / D'UNE COMMANDE
+#
+# USAGE: python benchmarks/bench_startup.py [répétitions] [--budget-ms N]
+# 1. Profil `python -X importtime` du chargement de msi_backend.wsgi
+#    (django.setup + URLconf + vues) : modules les plus coûteux.
+# 2. Temps jusqu'au worker prêt : import de msi_backend.wsgi puis première
+#    réponse à /api/ (médiane sur N processus neufs).
+# Code de sortie 1 si pandas / numpy / openpyxl sont chargés au démarrage
+# (ils doivent l'être au premier import de fichier) ou si le budget est dépassé.
+
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pandas', 'numpy', 'openpyxl')
+TOP = 15
+
+BOOT = """
+import sys, time
+start = time.perf_counter()
+from msi_backend.wsgi import application
+ready = time.perf_counter()
+from django.test import Client
+Client(raise_request_exception=False).get('/api/')
+served = time.perf_counter()
+print(ready - start, served - start, ','.join(m for m in {heavy!r} if m in sys.modules), sep='|')
+"""
+
+
+def _env():
+    env = dict(os.environ, PYTHONPATH=ROOT, DJANGO_SETTINGS_MODULE='msi_backend.settings', PYTHONDONTWRITEBYTECODE='1')
+    # Le test client s'annonce en testserver
+    hosts = env.get('ALLOWED_HOSTS', 'localhost,127.0.0.1')
+    if 'testserver' not in hosts.split(','):
+        env['ALLOWED_HOSTS'] = hosts + ',testserver'
+    return env
+
+
+def importtime_profile():
+    """[(cumul µs, module)] des imports déclenchés par msi_backend.wsgi"""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import msi_backend.wsgi'],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Un espace de colonne puis deux par niveau d'imbrication
+        rows.append((int(cumulative), name[1:].rstrip()))
+    return rows
+
+
+def boot_once():
+    proc = subprocess.run(
+        [sys.executable, '-c', BOOT.format(heavy=HEAVY_MODULES)],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    ready, served, heavy = proc.stdout.strip().splitlines()[-1].split('|')
+    return float(ready), float(served), [m for m in heavy.split(',') if m]
+
+
+def main():
+    args = sys.argv[1:]
+    budget = None
+    if '--budget-ms' in args:
+        index = args.index('--budget-ms')
+        budget = float(args[index + 1])
+        del args[index:index + 2]
+    repeat = int(args[0]) if args else 5
+
+    rows = importtime_profile()
+    top_level = [(us, name) for us, name in rows if not name.startswith(' ')]
+    print(f"Imports de msi_backend.wsgi : {sum(us for us, _ in top_level) / 1000:.0f} ms cumulés")
+    for us, name in sorted(rows, reverse=True)[:TOP]:
+        print(f"  {us / 1000:8.1f} ms  {name.strip()}")
+
+    runs = [boot_once() for _ in range(repeat)]
+    ready = statistics.median(r for r, _, _ in runs) * 1000
+    served = statistics.median(s for _, s, _ in runs) * 1000
+    heavy = sorted({m for _, _, modules in runs for m in modules})
+    print(f"Worker prêt : {ready:.0f} ms (médiane sur {repeat}), première réponse : {served:.0f} ms")
+
+    failed = False
+    if heavy:
+        print(f"RÉGRESSION : modules lourds chargés au démarrage : {', '.join(heavy)}")
+        failed = True
+    if budget is not None and ready > budget:
+        print(f"RÉGRESSION : démarrage {ready:.0f} ms > budget {budget:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
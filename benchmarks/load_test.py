@@ -0,0 +1,190 @@
+# benchmarks/load_test.py - TEST DE CHARGE LOCAL
+#
+# USAGE:
+#   python benchmarks/load_test.py --url http://localhost:8000 --user admin --password ...
+#   python benchmarks/load_test.py --compare --user admin --password ...
+# Sans --compare : charge un serveur déjà lancé (C clients concurrents pendant
+# D secondes sur les chemins donnés) et affiche débit et latences p50/p95/p99.
+# Avec --compare : lance successivement sur un port local l'ancienne commande
+# (4 workers sync, Dockerfile d'origine) et gunicorn.conf.py (profil web),
+# mesure chacun dans les mêmes conditions et affiche la comparaison.
+# Bibliothèque standard uniquement ; base et utilisateur : ceux de l'environnement
+# (hors --compare, lever THROTTLE_USER_RATE sur le serveur mesuré).
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PATHS = ('/api/salaries/', '/api/equipements/', '/api/reference/', '/api/salaries/?fields=id,nom,prenom')
+
+CONFIGS = {
+    'sync x4 (avant)': ['--workers', '4', '--timeout', '120'],
+    'gunicorn.conf.py': ['-c', 'gunicorn.conf.py'],
+}
+
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+def obtain_token(url, user, password):
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    body = json.dumps({'username': user, 'password': password})
+    conn.request('POST', '/api/token/', body, {'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    payload = response.read()
+    if response.status != 200:
+        raise SystemExit(f"Authentification refusée ({response.status}): {payload[:200]!r}")
+    return json.loads(payload)['access']
+
+
+def _client(url, token, paths, deadline, results, index):
+    """Un client : connexion keep-alive, chemins en rotation jusqu'à l'échéance"""
+    parts = urlsplit(url)
+    headers = {'Authorization': f'Bearer {token}', 'Accept-Encoding': 'gzip'}
+    conn = None
+    latencies, errors = [], 0
+    i = index
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+            if response.getheader('Connection', '').lower() == 'close':
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            if conn is not None:
+                conn.close()
+            conn = None
+            continue
+        latencies.append(time.perf_counter() - start)
+    if conn is not None:
+        conn.close()
+    results[index] = (latencies, errors)
+
+
+def run_load(url, token, paths, concurrency, duration):
+    results = [None] * concurrency
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_client, args=(url, token, paths, deadline, results, i))
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(l for r, _ in results for l in r)
+    errors = sum(e for _, e in results)
+    if not latencies:
+        return {'requests': 0, 'errors': errors, 'rps': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed,
+        'p50': quantiles[49] * 1000,
+        'p95': quantiles[94] * 1000,
+        'p99': quantiles[98] * 1000,
+    }
+
+
+def report(label, stats):
+    print(
+        f"{label:<20} {stats['rps']:8.1f} req/s  p50 {stats['p50']:7.1f} ms  "
+        f"p95 {stats['p95']:7.1f} ms  p99 {stats['p99']:7.1f} ms  "
+        f"({stats['requests']} requêtes, {stats['errors']} erreurs)"
+    )
+
+
+# ============================================================================
+# SERVEURS LOCAUX (--compare)
+# ============================================================================
+
+def _wait_ready(url, timeout=60):
+    parts = urlsplit(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=2)
+            conn.request('GET', '/api/')
+            conn.getresponse().read()
+            conn.close()
+            return
+        except (OSError, http.client.HTTPException):
+            time.sleep(0.3)
+    raise SystemExit(f"Serveur non joignable sur {url}")
+
+
+def start_server(arguments, port):
+    # Limitation de débit levée : on mesure le serveur, pas le throttling
+    env = dict(os.environ, GUNICORN_BIND=f'127.0.0.1:{port}', GUNICORN_PROFILE='web', GUNICORN_LOGLEVEL='warning',
+               THROTTLE_USER_RATE='1000000/hour', THROTTLE_ANON_RATE='1000000/hour')
+    command = [sys.executable, '-m', 'gunicorn', *arguments, '--bind', f'127.0.0.1:{port}',
+               '--access-logfile', '/dev/null', 'msi_backend.wsgi:application']
+    return subprocess.Popen(command, cwd=ROOT, env=env)
+
+
+def stop_server(proc):
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=40)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test de charge local")
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--user', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--paths', nargs='+', default=list(DEFAULT_PATHS))
+    parser.add_argument('-c', '--concurrency', type=int, default=16)
+    parser.add_argument('-d', '--duration', type=float, default=15)
+    parser.add_argument('--compare', action='store_true', help="lance et compare les configurations gunicorn")
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    if not args.compare:
+        token = obtain_token(args.url, args.user, args.password)
+        report(args.url, run_load(args.url, token, args.paths, args.concurrency, args.duration))
+        return
+
+    url = f'http://127.0.0.1:{args.port}'
+    print(f"{args.concurrency} clients, {args.duration:.0f} s par configuration, {len(args.paths)} chemins")
+    for label, arguments in CONFIGS.items():
+        proc = start_server(arguments, args.port)
+        try:
+            _wait_ready(url)
+            token = obtain_token(url, args.user, args.password)
+            # Échauffement : caches, workers tous démarrés
+            run_load(url, token, args.paths, args.concurrency, min(3, args.duration))
+            report(label, run_load(url, token, args.paths, args.concurrency, args.duration))
+        finally:
+            stop_server(proc)
+
+
+if __name__ == '__main__':
+    main()
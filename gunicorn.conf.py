@@ -0,0 +1,103 @@
+# gunicorn.conf.py - PROFILS DE PRODUCTION GUNICORN
+#
+# USAGE: gunicorn -c gunicorn.conf.py msi_backend.wsgi:application
+# GUNICORN_PROFILE choisit le profil :
+# - web    : API courante. Workers gthread (threads pendant les requêtes SQL),
+#            app préchargée dans le maître (msi_backend.wsgi.create_app) puis
+#            partagée par fork ; recyclage périodique.
+# - import : imports / templates Excel (/api/import/, /admin/import/, voir
+#            deploy/nginx.conf). Peu de workers, longs délais, pandas /
+#            openpyxl préchargés et recyclage fréquent (mémoire des DataFrames).
+# Toute valeur peut être surchargée par variable d'environnement (.env).
+
+import multiprocessing
+import os
+
+from decouple import config as env
+
+# ============================================================================
+# PROFILS
+# ============================================================================
+
+CPUS = multiprocessing.cpu_count()
+
+PROFILES = {
+    'web': {
+        'workers': min(CPUS + 1, 9),
+        'threads': 4,
+        'timeout': 30,
+        'max_requests': 2000,
+        'max_requests_jitter': 200,
+        'preload_imports': False,
+    },
+    'import': {
+        'workers': max(2, CPUS // 2),
+        # 2 threads : la page d'import admin appelle l'API du même serveur
+        'threads': 2,
+        'timeout': 600,
+        'max_requests': 50,
+        'max_requests_jitter': 10,
+        'preload_imports': True,
+    },
+}
+
+profile = env('GUNICORN_PROFILE', default='web')
+if profile not in PROFILES:
+    raise ValueError(f"GUNICORN_PROFILE inconnu: {profile} (attendu: {', '.join(PROFILES)})")
+defaults = PROFILES[profile]
+
+# ============================================================================
+# SERVEUR
+# ============================================================================
+
+bind = env('GUNICORN_BIND', default='0.0.0.0:8000')
+proc_name = f'msi-{profile}'
+
+worker_class = 'gthread'
+workers = env('WEB_CONCURRENCY', default=defaults['workers'], cast=int)
+threads = env('GUNICORN_THREADS', default=defaults['threads'], cast=int)
+
+# gthread : le timeout surveille le worker (battement du thread principal),
+# pas la durée d'une requête ; le profil import le relève pour les gros fichiers
+timeout = env('GUNICORN_TIMEOUT', default=defaults['timeout'], cast=int)
+graceful_timeout = env('GUNICORN_GRACEFUL_TIMEOUT', default=30, cast=int)
+keepalive = env('GUNICORN_KEEPALIVE', default=5, cast=int)
+
+# Recyclage : contient la croissance mémoire (pandas, openpyxl, caches Python)
+max_requests = env('GUNICORN_MAX_REQUESTS', default=defaults['max_requests'], cast=int)
+max_requests_jitter = env('GUNICORN_MAX_REQUESTS_JITTER', default=defaults['max_requests_jitter'], cast=int)
+
+# Rechargement du code (développement) incompatible avec le préchargement
+reload = env('GUNICORN_RELOAD', default=False, cast=bool)
+preload_app = not reload
+
+# Battements des workers en mémoire (le /tmp d'un conteneur peut bloquer)
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = '-'
+errorlog = '-'
+loglevel = env('GUNICORN_LOGLEVEL', default='info')
+access_log_format = '%(h)s "%(r)s" %(s)s %(b)s %(L)ss'
+
+# Lu par msi_backend.wsgi.create_app() au chargement de l'application
+os.environ.setdefault('PRELOAD_IMPORT_MODULES', str(defaults['preload_imports']))
+
+
+# ============================================================================
+# HOOKS
+# ============================================================================
+
+def when_ready(server):
+    server.log.info(
+        f"Profil {profile}: {workers} workers x {threads} threads, timeout {timeout}s, "
+        f"recyclage {max_requests}+{max_requests_jitter} requêtes, préchargement {preload_app}"
+    )
+
+
+def worker_abort(worker):
+    # SIGABRT sur timeout : pile du worker bloqué dans le journal
+    import faulthandler
+    import sys
+
+    worker.log.warning(f"Worker {worker.pid} interrompu (timeout), pile :")
+    faulthandler.dump_traceback(file=sys.stderr, all_threads=True)
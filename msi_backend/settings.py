@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
@@ -20,6 +21,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites',
+    'django.contrib.postgres',
 
     'rest_framework',
     'rest_framework_simplejwt',
@@ -31,12 +33,19 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    # En premier : la durée mesurée couvre tous les autres middlewares
+    'api.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    # Compression puis GET conditionnel : l'ETag / le 304 portent sur le contenu non compressé
+    'api.middleware.CompressionMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Retiré au démarrage sauf si PROFILER_ENABLED (voir api/profiling.py)
+    'api.middleware.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -96,6 +105,11 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Invitation des salariés provisionnés (api/provisioning.py) : page du frontend
+# qui reçoit uid et token et appelle POST /api/invitation/activer/
+INVITATION_URL = config('INVITATION_URL', default='http://localhost:3000/activation/{uid}/{token}/')
+PASSWORD_RESET_TIMEOUT = config('PASSWORD_RESET_TIMEOUT', default=7 * 24 * 3600, cast=int)
+
 
 LANGUAGE_CODE = 'fr-FR'
 TIME_ZONE = 'Europe/Paris'
@@ -136,9 +150,15 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 50,
+    # JSON via orjson (api/renderers.py) ; interface navigable seulement en DEBUG
+    # (formulaires HTML et listes de choix FK requêtées à chaque affichage)
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
+        'api.renderers.ORJSONRenderer',
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DATETIME_FORMAT': '%Y-%m-%dT%H:%M:%S',
     'DATE_FORMAT': '%Y-%m-%d',
@@ -147,12 +167,14 @@ REST_FRAMEWORK = {
         '%d/%m/%Y',
     ],
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'api.throttles.AnonRateThrottle',
+        'api.throttles.UserRateThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
-        'anon': '100/hour',
-        'user': '1000/hour'
+        'anon': config('THROTTLE_ANON_RATE', default='100/hour'),
+        'user': config('THROTTLE_USER_RATE', default='1000/hour'),
+        # Activation de compte par lien d'invitation (api/throttles.py)
+        'invitation': config('THROTTLE_INVITATION_RATE', default='10/hour'),
     },
 }
 
@@ -224,6 +246,9 @@ LOGGING = {
             'format': '{levelname} {asctime} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'api.instrumentation.JSONFormatter',
+        },
     },
     'filters': {
         'require_debug_true': {
@@ -247,6 +272,15 @@ LOGGING = {
             'backupCount': 10,
             'formatter': 'verbose',
         },
+        # Requêtes lentes : une ligne JSON par requête (api/middleware.py)
+        'slow_requests': {
+            'level': 'WARNING',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': os.path.join(BASE_DIR, 'logs/slow_requests.log'),
+            'maxBytes': 1024 * 1024 * 15,
+            'backupCount': 5,
+            'formatter': 'json',
+        },
     },
     'root': {
         'handlers': ['console', 'file'],
@@ -263,22 +297,71 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': False,
         },
+        'api.performance': {
+            'handlers': ['console', 'slow_requests'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
 
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880
-FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880
+# Au-delà, les uploads sont écrits dans un fichier temporaire et lus en flux
+# par les imports (api/import_readers.py) au lieu de rester en mémoire
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1048576
+FILE_UPLOAD_TEMP_DIR = config('FILE_UPLOAD_TEMP_DIR', default=None)
+# Processus de conversion des imports volumineux (api/import_engine.py), 1 = désactivé
+IMPORT_WORKERS = config('IMPORT_WORKERS', default=1, cast=int)
+# Charger pandas / openpyxl avant le fork des workers (gunicorn --preload, voir msi_backend/wsgi.py)
+PRELOAD_IMPORT_MODULES = config('PRELOAD_IMPORT_MODULES', default=False, cast=bool)
+# Taille minimale (octets) d'une réponse compressée par api/middleware.py
+COMPRESS_MIN_SIZE = config('COMPRESS_MIN_SIZE', default=1024, cast=int)
+# En-tête Server-Timing (SQL, serializer, cache, total) et seuil des requêtes lentes (api/middleware.py)
+SERVER_TIMING = config('SERVER_TIMING', default=True, cast=bool)
+SLOW_REQUEST_MS = config('SLOW_REQUEST_MS', default=1000, cast=int)
+# Profilage à la demande du staff (?_profile=1 / X-Profile: 1), profils dans /admin/profiles/
+PROFILER_ENABLED = config('PROFILER_ENABLED', default=False, cast=bool)
+PROFILER_DIR = config('PROFILER_DIR', default=None)
+PROFILER_MAX_PROFILES = config('PROFILER_MAX_PROFILES', default=20, cast=int)
 
 
 ALLOWED_UPLOAD_EXTENSIONS = ['pdf', 'doc', 'docx', 'xls', 'xlsx', 'csv', 'txt', 'jpg', 'jpeg', 'png']
 
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'msi-cache',
+# Caches partagés par tous les workers (voir api/caching.py) :
+# - CACHE_URL=redis://redis:6379/0 en production (un préfixe de clé par cache) ;
+#   politique d'éviction volatile-* pour garder les versions de tables (sans expiration)
+# - sinon un fichier SQLite par cache dans CACHE_DIR (un seul hôte, tests)
+# CACHE_VERSION : à incrémenter quand le format des valeurs en cache change, ou après
+# restauration d'une sauvegarde (les clés dérivent des versions de tables, pas du contenu)
+CACHE_URL = config('CACHE_URL', default='')
+CACHE_DIR = config('CACHE_DIR', default=os.path.join(tempfile.gettempdir(), 'msi-cache'))
+CACHE_VERSION = config('CACHE_VERSION', default=1, cast=int)
+
+
+def _cache(name, timeout, max_entries=10000):
+    if CACHE_URL:
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': f'msi:{name}',
+            'VERSION': CACHE_VERSION,
+            'TIMEOUT': timeout,
+        }
+    return {
+        'BACKEND': 'api.cache_backends.SQLiteCache',
+        'LOCATION': os.path.join(CACHE_DIR, f'{name}.sqlite3'),
+        'VERSION': CACHE_VERSION,
+        'TIMEOUT': timeout,
+        'OPTIONS': {'MAX_ENTRIES': max_entries},
     }
+
+
+CACHES = {
+    'default': _cache('default', 300),
+    'throttle': _cache('throttle', 24 * 60 * 60, max_entries=100000),
+    'templates': _cache('templates', 60 * 60, max_entries=500),
 }
 
 
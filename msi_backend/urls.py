@@ -13,6 +13,8 @@ from api.admin_views import (
     admin_download_template,
     get_model_structure_ajax,
     admin_import_history,
+    admin_profiles,
+    admin_profile_download,
 )
 
 urlpatterns = [
@@ -23,6 +25,10 @@ urlpatterns = [
     path('admin/import/download-template/', admin_download_template, name='admin_download_template'),
     path('admin/import/api/structure/', get_model_structure_ajax, name='admin_import_structure_ajax'),
     path('admin/import/history/', admin_import_history, name='admin_import_history'),
+
+    # Profils de requêtes à la demande (api/profiling.py)
+    path('admin/profiles/', admin_profiles, name='admin_profiles'),
+    path('admin/profiles/<str:profile_id>.<str:kind>', admin_profile_download, name='admin_profile_download'),
     
     # Django Admin
     path('admin/', admin.site.urls),
@@ -5,12 +5,56 @@ It exposes the WSGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
+
+create_app() prépare tout ce qui peut l'être avant la première requête :
+URLconf et vues importées, analyse des serializers en cache, et sur demande
+(PRELOAD_IMPORT_MODULES) pandas / openpyxl. Avec gunicorn --preload, c'est
+fait une fois dans le parent et partagé par les workers (copie sur écriture).
+
+    gunicorn --preload msi_backend.wsgi:application
 """
 
+import importlib
 import os
 
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'msi_backend.settings')
 
-application = get_wsgi_application()
+# Sous-systèmes chargés à la première utilisation, préchargeables dans le parent
+IMPORT_MODULES = ('api.import_converters', 'api.import_templates')
+
+
+def warm_up(preload_imports=False):
+    """Charge URLconf, vues et analyse des serializers ; ferme les connexions ouvertes"""
+    from django.db import connections
+    from django.urls import get_resolver
+    from rest_framework import serializers as drf_serializers
+
+    from api import serializers
+    from api.eager_loading import eager_loading_paths
+
+    get_resolver().url_patterns
+    for name in dir(serializers):
+        cls = getattr(serializers, name)
+        if isinstance(cls, type) and issubclass(cls, drf_serializers.ModelSerializer) and hasattr(cls, 'Meta'):
+            eager_loading_paths(cls)
+
+    if preload_imports:
+        for module in IMPORT_MODULES:
+            importlib.import_module(module)
+
+    # Une connexion ouverte avant le fork serait partagée par tous les workers
+    connections.close_all()
+
+
+def create_app(preload_imports=None):
+    app = get_wsgi_application()
+
+    from django.conf import settings
+
+    warm_up(settings.PRELOAD_IMPORT_MODULES if preload_imports is None else preload_imports)
+    return app
+
+
+application = create_app()